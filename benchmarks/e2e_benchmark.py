@@ -0,0 +1,370 @@
+"""
+End-to-end benchmark of the three crews against local fake services
+
+Starts the fakes from fake_services.py, then runs JobScreenerCrew,
+CompanyResearchCrew and the daily assistant (ComposioAgentCrew with calendar
+analysis, storage and Docs publishing) at each concurrency level. Every level
+runs in a fresh process in the crew's project directory. It reports wall time,
+throughput, run and per-task latency, peak RSS, tokens and call counts. With
+--stream, task results and the report are streamed as they are generated (see
+crew_runtime/streaming.py) and the time to the first useful output (first task
+result) and to the first report text are reported next to run latency.
+
+Results are compared with the stored baseline for the profile
+(benchmarks/baselines/<profile>.json); the exit code is 1 when a metric
+regresses beyond the tolerance or a run fails.
+
+Usage (from the repository root):
+    python -m benchmarks.e2e_benchmark --profile fast --concurrency 1 4 8
+    python -m benchmarks.e2e_benchmark --crews job_screener --update-baseline
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from benchmarks.fake_services import FakeServices, PROFILES
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+WORKER = Path(__file__).resolve().parent / "e2e_worker.py"
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+# Crew name -> project directory
+CREWS = {
+    "job_screener": "crewai_basic",
+    "company_research": "crewai_company_research",
+    "daily_assistant": "crewai_with_tools",
+}
+
+# The fakes have no quotas: keep the rate limiter in the call path without letting it bind
+BENCH_RATE_LIMITS = {
+    provider: {"rpm": None, "tpm": None, "max_concurrency": 64}
+    for provider in ("anthropic", "openrouter", "serper", "parallel", "composio")
+}
+
+# Metric -> direction that counts as a regression (1: higher is worse, -1: lower is worse)
+REGRESSION_METRICS = {
+    "wall_time_s": 1,
+    "run_latency_p95_s": 1,
+    "peak_rss_mb": 1,
+    "total_tokens": 1,
+    "llm_calls": 1,
+    "throughput_runs_per_min": -1,
+}
+
+
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percentile / 100 * len(ordered)) - 1))
+    return round(ordered[index], 3)
+
+
+def crew_python(project_dir: Path, python: Optional[str] = None) -> str:
+    """Interpreter for a crew: the given one, the project's .venv, or the current one"""
+    if python:
+        return python
+    venv_python = project_dir / ".venv" / "bin" / "python"
+    return str(venv_python) if venv_python.exists() else sys.executable
+
+
+def crew_env(
+    services: FakeServices,
+    project_dir: Path,
+    work_dir: Path,
+    name: str,
+    rate_limits: Optional[Dict[str, Any]] = None
+) -> Dict[str, str]:
+    """Environment for a crew process pointed at the fakes, with its metrics and traces under work_dir"""
+    env = {k: v for k, v in os.environ.items() if k != "AGENTOPS_API_KEY"}
+    env.update(services.env())
+    env.update({
+        "CREW_METRICS_PATH": str(work_dir / f"{name}.calls.jsonl"),
+        "CREW_TRACE_DIR": str(work_dir / "traces" / name),
+        "COMPOSIO_CACHE_DIR": str(work_dir / "composio_cache"),
+        "CREW_COMPANY_STORE": str(work_dir / "company_profiles"),
+        "CREW_RATE_LIMITS": json.dumps(rate_limits or BENCH_RATE_LIMITS),
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "CREWAI_TRACING_ENABLED": "false",
+        "OTEL_SDK_DISABLED": "true",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(project_dir), str(REPO_ROOT / "crew_runtime"), env.get("PYTHONPATH")])),
+    })
+    return env
+
+
+def run_level(
+    services: FakeServices,
+    crew: str,
+    concurrency: int,
+    runs: int,
+    work_dir: Path,
+    python: Optional[str] = None,
+    rate_limits: Optional[Dict[str, Any]] = None,
+    stream: bool = False,
+    env_overrides: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Run one crew at one concurrency level in a fresh worker process
+
+    Args:
+        services: Running fake services
+        crew: Crew name in CREWS
+        concurrency: Crews executing at the same time
+        runs: Total crew runs
+        work_dir: Directory for the worker's result, log, metrics and caches
+        python: Interpreter override
+        rate_limits: CREW_RATE_LIMITS for the crews (default: BENCH_RATE_LIMITS)
+        stream: Stream task results and the report
+        env_overrides: Extra environment variables for the worker
+
+    Returns:
+        Measurements for the level
+    """
+    project_dir = REPO_ROOT / CREWS[crew]
+    name = f"{crew}@{concurrency}"
+    result_path = work_dir / f"{name}.json"
+    env = crew_env(services, project_dir, work_dir, name, rate_limits)
+    env.update(env_overrides or {})
+    services.reset_stats()
+    # Every level starts with a cold prompt cache
+    services.clear_prompt_cache()
+
+    with open(work_dir / f"{name}.log", 'w', encoding='utf-8') as log:
+        process = subprocess.Popen(
+            [crew_python(project_dir, python), str(WORKER), crew,
+             "--concurrency", str(concurrency), "--runs", str(runs), "--result", str(result_path)]
+            + (["--stream"] if stream else []),
+            cwd=project_dir, env=env, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+        )
+        # wait4 reports the resource usage of this worker only
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+    if not result_path.exists():
+        return {
+            "crew": crew, "concurrency": concurrency, "runs": runs, "failed": runs,
+            "error": f"worker exited with {process.returncode}, see {work_dir / f'{name}.log'}",
+        }
+    with open(result_path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    return summarize(raw, peak_rss_kb=usage.ru_maxrss, service_calls=services.reset_stats())
+
+
+def summarize(raw: Dict[str, Any], peak_rss_kb: int, service_calls: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """Aggregate a worker report into the benchmark measurements"""
+    calls = raw["call_metrics"]
+    tasks = {}
+    for task, latencies in raw["task_latencies_s"].items():
+        stats = calls.get(task, {})
+        tasks[task] = {
+            "latency_p50_s": _percentile(latencies, 50),
+            "latency_p95_s": _percentile(latencies, 95),
+            "llm_calls": stats.get("llm_calls", 0),
+            "tool_calls": stats.get("tool_calls", 0),
+            "total_tokens": stats.get("total_tokens", 0),
+            "conversion_llm_calls": stats.get("conversion_llm_calls", 0),
+            "conversion_latency_s": stats.get("conversion_latency_s", 0.0),
+            "local_repairs": stats.get("local_repairs", 0),
+        }
+
+    prompt_tokens = sum(s["prompt_tokens"] for s in calls.values())
+    completion_tokens = sum(s["completion_tokens"] for s in calls.values())
+    wall_time_s = raw["wall_time_s"]
+    succeeded = raw["runs"] - len(raw["failed"])
+    return {
+        "crew": raw["crew"],
+        "concurrency": raw["concurrency"],
+        "runs": raw["runs"],
+        "failed": len(raw["failed"]),
+        "errors": sorted({f["error"].splitlines()[0][:200] for f in raw["failed"]}),
+        "wall_time_s": wall_time_s,
+        "throughput_runs_per_min": round(succeeded / wall_time_s * 60, 2) if wall_time_s else None,
+        "run_latency_p50_s": _percentile(raw["run_latencies_s"], 50),
+        "run_latency_p95_s": _percentile(raw["run_latencies_s"], 95),
+        "streamed": raw.get("streamed", False),
+        "first_output_p50_s": _percentile(raw.get("first_output_s", raw["run_latencies_s"]), 50),
+        "first_output_p95_s": _percentile(raw.get("first_output_s", raw["run_latencies_s"]), 95),
+        "first_token_p50_s": _percentile(raw.get("first_token_s", raw["run_latencies_s"]), 50),
+        "first_token_p95_s": _percentile(raw.get("first_token_s", raw["run_latencies_s"]), 95),
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_cache": raw.get("prompt_cache", {}),
+        "llm_calls": sum(s["llm_calls"] for s in calls.values()),
+        "tool_calls": sum(s["tool_calls"] for s in calls.values()),
+        "service_calls": {service: stats["calls"] for service, stats in sorted(service_calls.items())},
+        "service_throttled": sum(stats.get("throttled", 0) for stats in service_calls.values()),
+        "rate_limits": raw.get("rate_limits", {}),
+        "model_routes": raw.get("model_routes", {}),
+        "task_budgets": raw.get("task_budgets", {}),
+        "telemetry": raw.get("telemetry", {}),
+        "tasks": tasks,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    List the metrics that regressed beyond the tolerance
+
+    Args:
+        results: Measurements keyed by crew@concurrency
+        baseline: Stored measurements keyed the same way
+        tolerance: Allowed relative change (0.2 = 20%)
+
+    Returns:
+        Human-readable regressions
+    """
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        for metric, direction in REGRESSION_METRICS.items():
+            now, before = current.get(metric), reference.get(metric)
+            if now is None or not before:
+                continue
+            change = (now - before) / before
+            if change * direction > tolerance:
+                regressions.append(f"{key} {metric}: {before} → {now} ({change:+.0%})")
+    return regressions
+
+
+def load_baseline(profile: str) -> Dict[str, Any]:
+    path = BASELINE_DIR / f"{profile}.json"
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(profile: str, time_scale: float, results: Dict[str, Any]) -> Path:
+    """Merge results into the stored baseline for a profile"""
+    baseline = load_baseline(profile)
+    baseline.update({
+        "profile": profile,
+        "time_scale": time_scale,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    baseline.setdefault("results", {}).update(results)
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = BASELINE_DIR / f"{profile}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the three crews")
+    parser.add_argument("--crews", nargs="+", choices=sorted(CREWS), default=sorted(CREWS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--runs-per-slot", type=int, default=1, help="Crew runs per concurrent slot")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for the simulated latencies")
+    parser.add_argument("--llm-concurrency-limit", type=int, default=None,
+                        help="Fake LLMs answer 429 beyond this many requests in flight")
+    parser.add_argument("--outage", nargs="+", choices=["anthropic", "openai"], default=[],
+                        help="Fake LLM services that answer as overloaded")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of fake LLM calls delayed by --slow-s")
+    parser.add_argument("--slow-s", type=float, default=0.0, help="Extra latency of a slow fake LLM call")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Share of fake final answers sent with a JSON defect")
+    parser.add_argument("--rate-limits", type=json.loads, default=None,
+                        help="CREW_RATE_LIMITS JSON for the crews (default: limits that never bind)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream task results and reports, and report the time to the first output")
+    parser.add_argument("--python", help="Interpreter for the crews (default: each project's .venv)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--output", help="Also write the full results to this JSON file")
+    args = parser.parse_args(argv)
+
+    services = FakeServices(
+        args.profile, args.time_scale, llm_concurrency_limit=args.llm_concurrency_limit,
+        outages=args.outage, slow_rate=args.slow_rate, slow_s=args.slow_s, malformed_rate=args.malformed_rate,
+    )
+    services.start()
+    work_dir = Path(tempfile.mkdtemp(prefix="e2e_benchmark_"))
+    print(f"🧪 Fake services ({args.profile}) on {services.url}, worker output in {work_dir}")
+
+    results = {}
+    try:
+        for crew in args.crews:
+            for concurrency in args.concurrency:
+                m = run_level(services, crew, concurrency, concurrency * args.runs_per_slot, work_dir, args.python, args.rate_limits, args.stream)
+                results[f"{crew}@{concurrency}"] = m
+                if "error" in m:
+                    print(f"❌ {crew} x{concurrency}: {m['error']}")
+                    continue
+                icon = "✅" if not m["failed"] else "❌"
+                print(
+                    f"{icon} {crew} x{concurrency}: {m['wall_time_s']}s wall, "
+                    f"{m['throughput_runs_per_min']} runs/min, p95 {m['run_latency_p95_s']}s, "
+                    f"{m['peak_rss_mb']} MB RSS, {m['total_tokens']} tokens, {m['failed']} failed"
+                )
+                if m["streamed"]:
+                    print(f"   🌊 first output p50 {m['first_output_p50_s']}s (p95 {m['first_output_p95_s']}s), "
+                          f"first report text p50 {m['first_token_p50_s']}s (p95 {m['first_token_p95_s']}s), "
+                          f"run p50 {m['run_latency_p50_s']}s")
+                cache = m["prompt_cache"]
+                if cache.get("cache_hits"):
+                    print(f"   💾 {cache['cached_prompt_ratio']:.0%} of prompt tokens cached, "
+                          f"{cache['cache_hits']}/{cache['llm_calls']} LLM calls hit")
+                if m["service_throttled"]:
+                    print(f"   🚦 {m['service_throttled']} requests answered 429")
+                for route, stats in m["model_routes"].items():
+                    if stats["hedges"] or stats["failovers"] or stats["errors"]:
+                        print(f"   🔀 {route}: {stats['calls']} calls, {stats['errors']} errors, "
+                              f"{stats['hedges']} hedges ({stats['hedge_wins']} won), {stats['failovers']} failovers")
+                for task, stats in m["task_budgets"].items():
+                    if stats["wrap_ups"] or stats["partial"]:
+                        print(f"   ⏱️  {task}: {stats['wrap_ups']}/{stats['runs']} runs wrapped up early, "
+                              f"{stats['partial']} partial results ({'; '.join(stats['reasons']) or 'tool calls used up'})")
+                for task, stats in m["tasks"].items():
+                    print(f"   {task}: p50 {stats['latency_p50_s']}s, p95 {stats['latency_p95_s']}s, "
+                          f"{stats['llm_calls']} LLM / {stats['tool_calls']} tool calls"
+                          + (f", {stats['conversion_llm_calls']} conversion calls (+{stats['conversion_latency_s']}s)"
+                             if stats["conversion_llm_calls"] else "")
+                          + (f", {stats['local_repairs']} repaired locally" if stats["local_repairs"] else ""))
+                for error in m["errors"]:
+                    print(f"   ⚠️  {error}")
+    finally:
+        services.stop()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failed = any(m.get("failed") for m in results.values())
+    if args.update_baseline:
+        if failed:
+            print("❌ Not updating the baseline: some runs failed")
+            return 1
+        print(f"💾 Baseline saved to {save_baseline(args.profile, args.time_scale, results)}")
+        return 0
+
+    baseline = load_baseline(args.profile)
+    if baseline and baseline.get("time_scale") != args.time_scale:
+        print(f"⚠️  Baseline was recorded with --time-scale {baseline.get('time_scale')}, skipping comparison")
+        return int(failed)
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+    for regression in regressions:
+        print(f"📉 {regression}")
+    if not baseline:
+        print(f"ℹ️  No baseline for profile '{args.profile}'; run with --update-baseline to store one")
+    elif not regressions:
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against the '{args.profile}' baseline")
+    return int(failed or bool(regressions))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Runs one crew end to end at a fixed concurrency and writes the measurements
+
+Started by e2e_benchmark.py with a crew project directory as the working
+directory and the environment pointing at the fake services; not meant to be
+run by hand.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import tempfile
+import importlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
+
+# The crew package lives in the working directory (the crew project)
+sys.path.insert(0, os.getcwd())
+# Traces of every run are written here; task latencies are read back from them
+os.environ.setdefault("CREW_TRACE_DIR", tempfile.mkdtemp(prefix="e2e_traces_"))
+
+from crew_runtime.instrumentation import metrics  # noqa: E402
+from crew_runtime.tracing import tracer  # noqa: E402
+from crew_runtime.rate_limiter import limiter  # noqa: E402
+from crew_runtime.streaming import CrewStream  # noqa: E402
+from crew_runtime.telemetry import telemetry  # noqa: E402
+
+
+def _read_input(filename: str) -> str:
+    with open(os.path.join(os.getcwd(), "input", filename), 'r') as f:
+        return f.read()
+
+
+def job_screener_runner() -> Callable[[int, Optional[CrewStream]], Any]:
+    """Run JobScreenerCrew with the inputs from crewai_basic/input"""
+    from crew_agent.job_screener_crew import JobScreenerCrew
+
+    inputs = {
+        "job_title": _read_input("job_role.txt"),
+        "job_description": _read_input("job_description.txt"),
+        "company_website": _read_input("company.txt"),
+        "candidate_resume": _read_input("resume.txt"),
+    }
+
+    def run(index: int, stream: Optional[CrewStream] = None):
+        crew = JobScreenerCrew().crew()
+        if stream:
+            stream.attach(crew)
+        return crew.kickoff(inputs=inputs)
+    return run
+
+
+def company_research_runner() -> Callable[[int, Optional[CrewStream]], Any]:
+    """Run CompanyResearchCrew for a rotating set of companies"""
+    from crew_agent.company_research_crew import CompanyResearchCrew
+
+    companies = ["HubSpot hubspot.com", "Stripe stripe.com", "Notion notion.so", "Figma figma.com"]
+
+    def run(index: int, stream: Optional[CrewStream] = None):
+        crew = CompanyResearchCrew().crew()
+        if stream:
+            stream.attach(crew)
+        return crew.kickoff(inputs={"company_name": companies[index % len(companies)]})
+    return run
+
+
+def daily_assistant_runner() -> Callable[[int, Optional[CrewStream]], Any]:
+    """Run the full daily assistant (calendar, crew, storage, Docs publish) for one entity per run"""
+    from app import run_crew_agent
+
+    output_dir = tempfile.mkdtemp(prefix="e2e_daily_assistant_")
+
+    def run(index: int, stream: Optional[CrewStream] = None):
+        # Entities the fake Composio has connected accounts for (see fake_services.BENCH_ENTITY)
+        entity_id = f"bench-user-{index % 512}@example.com"
+        return run_crew_agent(entity_id=entity_id, base_output_dir=os.path.join(output_dir, str(index)))
+    return run
+
+
+RUNNERS = {
+    "job_screener": job_screener_runner,
+    "company_research": company_research_runner,
+    "daily_assistant": daily_assistant_runner,
+}
+
+# Output field streamed with --stream (the daily assistant app builds its crew itself)
+STREAM_FIELDS = {
+    "job_screener": "summary",
+    "company_research": "markdown_report",
+}
+
+# Module defining each crew's LLM routes and model router
+CREW_MODULES = {
+    "job_screener": "crew_agent.job_screener_crew",
+    "company_research": "crew_agent.company_research_crew",
+    "daily_assistant": "crew_agent.composio_crew",
+}
+
+
+def task_latencies(trace_dir: Path) -> Dict[str, List[float]]:
+    """Task durations from the Chrome traces written during the benchmark"""
+    latencies: Dict[str, List[float]] = {}
+    for path in trace_dir.glob("*.trace.json"):
+        with open(path, 'r', encoding='utf-8') as f:
+            events = json.load(f)["traceEvents"]
+        for event in events:
+            if event.get("cat") == "task":
+                latencies.setdefault(event["name"].removeprefix("task "), []).append(event["dur"] / 1e6)
+    return latencies
+
+
+def run_benchmark(crew: str, concurrency: int, runs: int, stream: bool = False) -> Dict[str, Any]:
+    """
+    Run a crew `runs` times with `concurrency` runs in flight
+
+    Args:
+        crew: Name of a runner in RUNNERS
+        concurrency: Number of crews executing at the same time
+        runs: Total number of crew runs
+        stream: Stream task results and the crew's report (see STREAM_FIELDS)
+
+    Returns:
+        Wall time, per-run and per-task latencies, time to the first output of
+        each run and per-task call metrics
+    """
+    tracer.enable()
+    run = RUNNERS[crew]()
+
+    def timed(index: int) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        record = {"index": index, "status": "success", "error": None}
+        output_stream = CrewStream(field=STREAM_FIELDS[crew]) if stream and crew in STREAM_FIELDS else None
+        try:
+            # Nested runs (the daily assistant) record under their own execution ID
+            with metrics.run(f"bench-{uuid.uuid4()}"):
+                run(index, output_stream)
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            if output_stream:
+                output_stream.close()
+        record["latency_s"] = round(time.perf_counter() - started_at, 3)
+        # Without streaming, nothing is output before the run returns
+        record["first_output_s"] = record["first_token_s"] = record["latency_s"]
+        if output_stream:
+            stats = output_stream.stats()
+            record["first_output_s"] = stats["first_output_s"] or record["latency_s"]
+            record["first_token_s"] = stats["first_token_s"] or record["latency_s"]
+        return record
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as executor:
+        results = list(executor.map(timed, range(runs)))
+    wall_time_s = time.perf_counter() - started_at
+
+    telemetry.flush()
+    # Runs started by the apps export their own trace; write the rest in one file
+    trace_dir = Path(os.environ["CREW_TRACE_DIR"])
+    tracer.export(trace_dir / f"{crew}-{concurrency}.trace.json")
+
+    return {
+        "crew": crew,
+        "concurrency": concurrency,
+        "runs": runs,
+        "wall_time_s": round(wall_time_s, 3),
+        "streamed": bool(stream and crew in STREAM_FIELDS),
+        "run_latencies_s": [r["latency_s"] for r in results],
+        "first_output_s": [r["first_output_s"] for r in results],
+        "first_token_s": [r["first_token_s"] for r in results],
+        "failed": [r for r in results if r["status"] != "success"],
+        "task_latencies_s": task_latencies(trace_dir),
+        "call_metrics": metrics.summary(),
+        "prompt_cache": metrics.cache_summary(),
+        "rate_limits": limiter.stats(),
+        "model_routes": importlib.import_module(CREW_MODULES[crew]).router.stats(),
+        "task_budgets": importlib.import_module(CREW_MODULES[crew]).budgets.stats(),
+        "telemetry": telemetry.stats(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("crew", choices=sorted(RUNNERS))
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=None, help="Total runs (default: one per concurrent slot)")
+    parser.add_argument("--result", required=True, help="File to write the JSON measurements to")
+    parser.add_argument("--stream", action="store_true", help="Stream task results and the report")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.crew, args.concurrency, args.runs or args.concurrency, args.stream)
+    with open(args.result, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
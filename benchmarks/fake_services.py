@@ -0,0 +1,895 @@
+"""
+Local stand-ins for every external service used by the three crews
+
+A single HTTP server answers as:
+- an OpenAI-compatible chat completions API (OpenRouter models via litellm)
+- the Anthropic Messages API (the native claude_base LLM)
+- Serper and Parallel search
+- Composio (client info, action schemas, connected accounts and the Google
+  Calendar, Gmail and Google Docs actions the assistant uses)
+
+The fake LLM follows crewai's ReAct prompt: it calls each listed tool a
+configurable number of times, then returns a final answer generated from the
+task's output schema, so every task produces valid structured output without a
+conversion retry. Latency follows a profile (time to first token, tokens per
+second, prompt processing rate and search/Composio round trips). With
+llm_concurrency_limit set, LLM requests beyond that many in flight get a 429 with
+Retry-After, like a saturated provider key. `outages` makes whole LLM services
+answer 503/529, and `slow_rate` delays that share of LLM calls by `slow_s` to
+simulate tail latency. Prompt prefixes marked with cache_control are cached like
+Anthropic does (from 1024 tokens): later requests sharing a marked prefix report
+it as cache reads and skip its prompt processing time. `malformed_rate` gives that
+share of final answers a JSON defect (code fence, trailing comma, truncation,
+Python literals or a string where a list belongs) to exercise output conversion.
+Requests that force a tool (Anthropic tool_choice, OpenAI function tool_choice)
+are answered with a tool call whose input matches the tool's schema.
+Requests with "stream": true are answered with server-sent events in the
+provider's format: the first chunk comes after the time to first token and
+prompt processing, then the text follows at the profile's tokens per second.
+
+Usage (from the repository root):
+    python -m benchmarks.fake_services --port 8900 --profile realistic
+"""
+import re
+import ast
+import json
+import time
+import uuid
+import hashlib
+import random
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlparse, parse_qs
+
+
+# Latency profiles; tokens_per_s=None streams the completion instantly
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "instant": {
+        "ttft_s": 0.0,
+        "tokens_per_s": None,
+        "prefill_tokens_per_s": None,
+        "search_latency_s": 0.0,
+        "composio_latency_s": 0.0,
+        "tool_calls_per_task": 1,
+        "words_per_field": 12,
+    },
+    "fast": {
+        "ttft_s": 0.15,
+        "tokens_per_s": 400,
+        "prefill_tokens_per_s": 50000,
+        "search_latency_s": 0.15,
+        "composio_latency_s": 0.08,
+        "tool_calls_per_task": 1,
+        "words_per_field": 12,
+    },
+    "realistic": {
+        "ttft_s": 0.8,
+        "tokens_per_s": 70,
+        "prefill_tokens_per_s": 8000,
+        "search_latency_s": 0.7,
+        "composio_latency_s": 0.35,
+        "tool_calls_per_task": 2,
+        "words_per_field": 20,
+    },
+}
+
+FAKE_API_KEY = "fake-benchmark-key"
+
+# Shortest prompt prefix Anthropic caches for Sonnet models
+MIN_CACHE_TOKENS = 1024
+
+# Composio entities with connected accounts (e2e_worker.py runs user i as BENCH_ENTITY.format(i))
+BENCH_ENTITY = "bench-user-{}@example.com"
+MAX_BENCH_ENTITIES = 512
+
+EMAIL_FIXTURE = Path(__file__).resolve().parent.parent / "crewai_with_tools" / "benchmarks" / "fixtures" / "labeled_emails.json"
+
+TOOL_PATTERN = re.compile(r"Tool Name: (.+?)\nTool Arguments: (.+?)\nTool Description:", re.S)
+ACTION_PATTERN = re.compile(r"^Action Input: \{", re.M)
+SCHEMA_MARKER = "adheres to the following OpenAPI schema:"
+FINAL_ANSWER = "Final Answer: "
+
+# JSON defects of malformed final answers, used in turn
+DEFECTS = ("fenced", "trailing_comma", "truncated", "python_literals", "string_for_list")
+
+WORDS = (
+    "the team reviewed quarterly revenue growth product launch hiring plan customer retention "
+    "market expansion pricing strategy platform reliability roadmap priorities partner program "
+    "engineering velocity security review onboarding feedback analytics pipeline"
+).split()
+
+
+def stream_pieces(text: str, words: int = 4) -> List[str]:
+    """Split text into streamed chunks of a few words each"""
+    tokens = re.findall(r"\s*\S+", text) or [text]
+    pieces = ["".join(tokens[i:i + words]) for i in range(0, len(tokens), words)]
+    pieces[-1] += text[len("".join(pieces)):]
+    return pieces
+
+
+def anthropic_stream_events(message: Dict[str, Any]) -> List[tuple[str, Dict[str, Any]]]:
+    """Server-sent events of a Messages API stream that ends in `message`"""
+    usage = message["usage"]
+    events = [("message_start", {"type": "message_start", "message": {
+        **message, "content": [], "stop_reason": None, "usage": {**usage, "output_tokens": 1},
+    }})]
+    for index, block in enumerate(message["content"]):
+        if block["type"] == "tool_use":
+            start, key, text = {**block, "input": {}}, "partial_json", json.dumps(block["input"])
+            delta_type = "input_json_delta"
+        else:
+            start, key, text, delta_type = {"type": "text", "text": ""}, "text", block["text"], "text_delta"
+        events.append(("content_block_start", {"type": "content_block_start", "index": index, "content_block": start}))
+        for piece in stream_pieces(text):
+            events.append(("content_block_delta", {
+                "type": "content_block_delta", "index": index, "delta": {"type": delta_type, key: piece},
+            }))
+        events.append(("content_block_stop", {"type": "content_block_stop", "index": index}))
+    events.append(("message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+        "usage": {"output_tokens": usage["output_tokens"]},
+    }))
+    events.append(("message_stop", {"type": "message_stop"}))
+    return events
+
+
+def openai_stream_events(completion: Dict[str, Any], include_usage: bool) -> List[tuple[Optional[str], Any]]:
+    """Server-sent events of a chat completions stream that ends in `completion`"""
+    choice = completion["choices"][0]
+    message = choice["message"]
+    chunk = {key: completion[key] for key in ("id", "created", "model")}
+    chunk["object"] = "chat.completion.chunk"
+
+    def delta(payload: Dict[str, Any], finish_reason: Optional[str] = None) -> tuple[None, Dict[str, Any]]:
+        return None, {**chunk, "choices": [{"index": 0, "delta": payload, "finish_reason": finish_reason}]}
+
+    events = [delta({"role": "assistant", "content": ""})]
+    for call in message.get("tool_calls") or []:
+        for number, piece in enumerate(stream_pieces(call["function"]["arguments"])):
+            function = {"arguments": piece}
+            if not number:
+                function["name"] = call["function"]["name"]
+            tool_call = {"index": 0, "function": function}
+            if not number:
+                tool_call.update(id=call["id"], type="function")
+            events.append(delta({"tool_calls": [tool_call]}))
+    if message.get("content"):
+        events.extend(delta({"content": piece}) for piece in stream_pieces(message["content"]))
+    events.append(delta({}, choice["finish_reason"]))
+    if include_usage:
+        events.append((None, {**chunk, "choices": [], "usage": completion["usage"]}))
+    events.append((None, "[DONE]"))
+    return events
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def filler(words: int, seed: int = 0) -> str:
+    """Deterministic filler text of the given number of words"""
+    return " ".join(WORDS[(seed + i * 7) % len(WORDS)] for i in range(words)).capitalize()
+
+
+def schema_instance(schema: Dict[str, Any], defs: Optional[Dict[str, Any]] = None,
+                    words: int = 12, seed: int = 0) -> Any:
+    """
+    Generate a value that validates against a JSON schema
+
+    Args:
+        schema: JSON schema (pydantic model_json_schema output)
+        defs: Definitions referenced by $ref (default: the schema's $defs)
+        words: Number of words in generated strings
+        seed: Varies the generated text
+
+    Returns:
+        A JSON-compatible value
+    """
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return schema_instance(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, words, seed)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return schema_instance(options[0], defs, words, seed)
+    if "allOf" in schema:
+        return schema_instance(schema["allOf"][0], defs, words, seed)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        return {
+            name: schema_instance(prop, defs, words, seed + i)
+            for i, (name, prop) in enumerate(schema.get("properties", {}).items())
+        }
+    if kind == "array":
+        count = max(schema.get("minItems", 0), 3)
+        return [schema_instance(schema.get("items", {}), defs, words, seed + i) for i in range(count)]
+    if kind == "integer":
+        return max(schema.get("minimum", 0), min(schema.get("maximum", 7), 7))
+    if kind == "number":
+        return float(max(schema.get("minimum", 0), min(schema.get("maximum", 7.5), 7.5)))
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    if schema.get("format") == "date-time":
+        return datetime.now(timezone.utc).isoformat()
+    if schema.get("format") == "date":
+        return datetime.now(timezone.utc).date().isoformat()
+    return filler(words, seed)
+
+
+def tool_input(arguments: str) -> Dict[str, Any]:
+    """Build an Action Input for the first (primary) argument of crewai's 'Tool Arguments'"""
+    try:
+        spec = ast.literal_eval(arguments.strip())
+    except (ValueError, SyntaxError):
+        return {}
+    for name, info in spec.items():
+        kind = str(info.get("type", "str")) if isinstance(info, dict) else "str"
+        if kind.startswith("list") or kind.startswith("array"):
+            return {name: ["latest company news"]}
+        if kind in ("int", "integer"):
+            return {name: 10}
+        return {name: "latest company news"}
+    return {}
+
+
+def react_response(prompt: str, profile: Dict[str, Any]) -> str:
+    """
+    Answer a crewai agent prompt
+
+    Calls every listed tool tool_calls_per_task times (in order), then returns
+    a final answer that matches the task's output schema.
+
+    Args:
+        prompt: All message contents of the request joined together
+        profile: Latency profile
+
+    Returns:
+        Completion text
+    """
+    tools = TOOL_PATTERN.findall(prompt)
+    # The format instructions mention Observation too, so count executed actions
+    actions = len(ACTION_PATTERN.findall(prompt))
+    if tools and actions < len(tools) * profile["tool_calls_per_task"]:
+        name, arguments = tools[actions % len(tools)]
+        return (
+            f"Thought: I should gather more information\n"
+            f"Action: {name.strip()}\n"
+            f"Action Input: {json.dumps(tool_input(arguments))}"
+        )
+
+    answer = structured_answer(prompt, profile)
+    if "Final Answer:" in prompt or tools:
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+    return answer
+
+
+def structured_answer(prompt: str, profile: Dict[str, Any]) -> str:
+    """JSON matching the last schema in the prompt, or plain text without one"""
+    position = prompt.rfind(SCHEMA_MARKER)
+    if position == -1:
+        position = prompt.rfind('"properties"')
+        position = prompt.rfind("{", 0, position) if position != -1 else -1
+    else:
+        position = prompt.find("{", position)
+    if position != -1:
+        try:
+            schema, _ = json.JSONDecoder().raw_decode(prompt, position)
+            return json.dumps(schema_instance(schema, words=profile["words_per_field"]))
+        except (ValueError, KeyError, IndexError):
+            pass
+    return filler(profile["words_per_field"] * 10)
+
+
+def malform(answer: str, defect: str) -> str:
+    """Give a JSON answer one of the DEFECTS"""
+    try:
+        data = json.loads(answer)
+    except ValueError:
+        return answer
+    if defect == "fenced":
+        return f"Here is the result:\n```json\n{answer}\n```\nLet me know if anything is missing."
+    if defect == "trailing_comma":
+        return answer[:answer.rfind("}")].rstrip() + ",\n}"
+    if defect == "truncated":
+        return answer[:int(len(answer) * 0.9)]
+    if defect == "python_literals":
+        return repr(data)
+    if defect == "string_for_list" and isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, list) and value and all(isinstance(v, str) for v in value):
+                data[key] = "\n".join(f"- {v}" for v in value)
+                break
+        return json.dumps(data)
+    return answer
+
+
+def forced_tool(body: Dict[str, Any]) -> Optional[tuple[str, Dict[str, Any]]]:
+    """Name and input schema of the tool a request forces (Anthropic or OpenAI style), if any"""
+    choice = body.get("tool_choice")
+    if not isinstance(choice, dict):
+        return None
+    name = choice.get("name") or (choice.get("function") or {}).get("name")
+    for tool in body.get("tools") or []:
+        function = tool.get("function") or {}
+        if tool.get("name") == name:
+            return name, tool.get("input_schema") or {}
+        if function.get("name") == name:
+            return name, function.get("parameters") or {}
+    return None
+
+
+def message_text(content: Any) -> str:
+    """Flatten OpenAI/Anthropic message content into text"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    return ""
+
+
+def content_blocks(content: Any) -> List[tuple]:
+    """(text, has cache_control) for each part of OpenAI/Anthropic message content"""
+    if isinstance(content, list):
+        return [
+            (part.get("text", ""), "cache_control" in part) if isinstance(part, dict) else (str(part), False)
+            for part in content
+        ]
+    return [(message_text(content), False)]
+
+
+def calendar_events(time_min: Optional[str]) -> List[Dict[str, Any]]:
+    """A few days of meetings, including one overlap, starting at time_min"""
+    try:
+        start = datetime.fromisoformat((time_min or "").replace("Z", "+00:00"))
+    except ValueError:
+        start = datetime.now(timezone.utc)
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    events = []
+    for offset in range(3):
+        base = day + timedelta(days=offset)
+        for i, (hour, minutes, title) in enumerate([
+            (9, 30, "Daily standup"),
+            (11, 60, "Design review"),
+            (11, 30, "Customer call"),
+            (15, 45, "1:1 with manager"),
+        ]):
+            begin = base + timedelta(hours=hour, minutes=30 if i == 2 else 0)
+            events.append({
+                "id": f"evt{offset}{i}",
+                "summary": title,
+                "start": {"dateTime": begin.isoformat()},
+                "end": {"dateTime": (begin + timedelta(minutes=minutes)).isoformat()},
+                "attendees": [{"email": "me@example.com"}, {"email": f"colleague{i}@example.com"}],
+                "status": "confirmed",
+            })
+    return events
+
+
+def composio_action_schema(action: str) -> Dict[str, Any]:
+    """Minimal Composio v2 action model"""
+    app = action.split("_", 1)[0].lower()
+    return {
+        "name": action,
+        "description": f"{action.replace('_', ' ').title()} (benchmark stand-in)",
+        "parameters": {
+            "title": "Request",
+            "type": "object",
+            "properties": {
+                "max_results": {"type": "integer", "description": "Maximum number of results", "default": 10},
+                "query": {"type": "string", "description": "Search query", "default": ""},
+            },
+            "required": [],
+        },
+        "response": {
+            "title": "Response",
+            "type": "object",
+            "properties": {
+                "data": {"type": "object", "title": "Data"},
+                "successful": {"type": "boolean", "title": "Successful"},
+                "error": {"type": "string", "title": "Error"},
+            },
+            "required": ["data", "successful"],
+        },
+        "appName": app,
+        "appId": app,
+        "version": "latest",
+        "available_versions": ["latest"],
+        "tags": [],
+        "enabled": True,
+    }
+
+
+class FakeServices:
+    """Runs the fake LLM, search and Composio APIs in a background thread"""
+
+    def __init__(
+        self,
+        profile: str = "fast",
+        time_scale: float = 1.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        llm_concurrency_limit: Optional[int] = None,
+        outages: Optional[List[str]] = None,
+        slow_rate: float = 0.0,
+        slow_s: float = 0.0,
+        malformed_rate: float = 0.0
+    ):
+        """
+        Initialize the services
+
+        Args:
+            profile: Name of a latency profile in PROFILES
+            time_scale: Multiplier for every simulated latency
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            llm_concurrency_limit: LLM requests in flight before answering 429 (None: unlimited)
+            outages: LLM services ("anthropic", "openai") that answer as overloaded
+            slow_rate: Share of LLM calls delayed by slow_s
+            slow_s: Extra latency of a slow LLM call (before time_scale)
+            malformed_rate: Share of final answers sent with a JSON defect
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile: {profile}")
+        self.profile_name = profile
+        self.profile = PROFILES[profile]
+        self.time_scale = time_scale
+        self.host = host
+        self.port = port
+        self.llm_concurrency_limit = llm_concurrency_limit
+        self.outages = set(outages or [])
+        self.slow_rate = slow_rate
+        self.slow_s = slow_s
+        self.malformed_rate = malformed_rate
+        self._malformed = 0
+        self._random = random.Random(0)
+        self._llm_in_flight = 0
+        self._prompt_cache: set = set()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.emails = json.loads(EMAIL_FIXTURE.read_text(encoding='utf-8')) if EMAIL_FIXTURE.exists() else []
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point all three crews at these services"""
+        return {
+            "OPENROUTER_API_KEY": FAKE_API_KEY,
+            "OPENROUTER_BASE_URL": f"{self.url}/openrouter/v1",
+            # Structured output through instructor calls litellm without the LLM's base_url
+            "OPENROUTER_API_BASE": f"{self.url}/openrouter/v1",
+            "ANTHROPIC_API_KEY": FAKE_API_KEY,
+            "ANTHROPIC_BASE_URL": f"{self.url}/anthropic",
+            "SERPER_API_KEY": FAKE_API_KEY,
+            "SERPER_BASE_URL": f"{self.url}/serper",
+            "PARALLEL_API_KEY": FAKE_API_KEY,
+            "PARALLEL_SEARCH_URL": f"{self.url}/parallel/v1beta/search",
+            "COMPOSIO_API_KEY": FAKE_API_KEY,
+            "COMPOSIO_BASE_URL": f"{self.url}/composio/api",
+            "COMPOSIO_NO_CACHE_REFRESH": "true",
+        }
+
+    def _count(self, service: str, prompt_tokens: int = 0, completion_tokens: int = 0, cached_tokens: int = 0):
+        with self._lock:
+            stats = self.stats.setdefault(service, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            if cached_tokens:
+                stats["cached_prompt_tokens"] = stats.get("cached_prompt_tokens", 0) + cached_tokens
+
+    def prompt_cache(self, blocks: List[tuple]) -> tuple[int, int]:
+        """
+        Look up and store the cache breakpoints of a request
+
+        Args:
+            blocks: (text, has cache_control) for the system prompt and every message part, in order
+
+        Returns:
+            Prompt tokens read from the cache and written to it
+        """
+        prefix, breakpoints = "", []
+        for text, marked in blocks:
+            prefix += text + "\n"
+            if marked and count_tokens(prefix) >= MIN_CACHE_TOKENS:
+                breakpoints.append((hashlib.sha256(prefix.encode('utf-8')).hexdigest(), count_tokens(prefix)))
+        if not breakpoints:
+            return 0, 0
+        with self._lock:
+            read = max((tokens for key, tokens in breakpoints if key in self._prompt_cache), default=0)
+            self._prompt_cache.update(key for key, _ in breakpoints)
+        return read, max(breakpoints[-1][1] - read, 0)
+
+    def _enter_llm(self, service: str) -> bool:
+        """Admit an LLM request, or count it as throttled when over the concurrency limit"""
+        with self._lock:
+            if self.llm_concurrency_limit and self._llm_in_flight >= self.llm_concurrency_limit:
+                stats = self.stats.setdefault(service, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+                stats["throttled"] = stats.get("throttled", 0) + 1
+                return False
+            self._llm_in_flight += 1
+            return True
+
+    def _exit_llm(self):
+        with self._lock:
+            self._llm_in_flight -= 1
+
+    def _sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def complete(
+        self,
+        prompt: str,
+        cached_tokens: int = 0,
+        schema: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> tuple[str, int, int]:
+        """
+        Generate a completion and wait for the profile's latency
+
+        Args:
+            prompt: All message contents of the request joined together
+            cached_tokens: Prompt tokens read from the cache, which skip prompt processing
+            schema: Input schema of a forced tool; the completion is JSON matching it
+            stream: Only wait until the first token; generation time is spent
+                while the chunks are sent (see stream_delay)
+
+        Returns:
+            Completion text, prompt tokens and completion tokens
+        """
+        if schema is not None:
+            text = json.dumps(schema_instance(schema, words=self.profile["words_per_field"]))
+        else:
+            text = react_response(prompt, self.profile)
+            if self.malformed_rate and FINAL_ANSWER in text:
+                with self._lock:
+                    defect = None
+                    if self._random.random() < self.malformed_rate:
+                        defect = DEFECTS[self._malformed % len(DEFECTS)]
+                        self._malformed += 1
+                if defect:
+                    head, answer = text.split(FINAL_ANSWER, 1)
+                    text = head + FINAL_ANSWER + malform(answer, defect)
+                    self._count("malformed_answers")
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(text)
+        latency = self.profile["ttft_s"]
+        if self.profile["prefill_tokens_per_s"]:
+            latency += max(prompt_tokens - cached_tokens, 0) / self.profile["prefill_tokens_per_s"]
+        if self.profile["tokens_per_s"] and not stream:
+            latency += completion_tokens / self.profile["tokens_per_s"]
+        with self._lock:
+            slow = self.slow_rate and self._random.random() < self.slow_rate
+        if slow:
+            latency += self.slow_s
+        self._sleep(latency)
+        return text, prompt_tokens, completion_tokens
+
+    def openai_chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        messages = body.get("messages", [])
+        prompt = "\n".join(message_text(m.get("content")) for m in messages)
+        # OpenRouter passes cache_control through to Anthropic models
+        cached, _ = self.prompt_cache([block for m in messages for block in content_blocks(m.get("content"))])
+        tool = forced_tool(body)
+        text, prompt_tokens, completion_tokens = self.complete(
+            prompt, cached, tool[1] if tool else None, bool(body.get("stream"))
+        )
+        cached = min(cached, prompt_tokens)
+        self._count("openai", prompt_tokens, completion_tokens, cached)
+        message = {"role": "assistant", "content": text}
+        if tool:
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": tool[0], "arguments": text},
+            }]}
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached},
+            },
+        }
+
+    def anthropic_messages(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        system = body.get("system", "")
+        parts = [message_text(system)] + [message_text(m.get("content")) for m in body.get("messages", [])]
+        blocks = content_blocks(system) + [block for m in body.get("messages", []) for block in content_blocks(m.get("content"))]
+        read, written = self.prompt_cache(blocks)
+        tool = forced_tool(body)
+        text, prompt_tokens, completion_tokens = self.complete(
+            "\n".join(parts), read, tool[1] if tool else None, bool(body.get("stream"))
+        )
+        read, written = min(read, prompt_tokens), min(written, max(prompt_tokens - read, 0))
+        self._count("anthropic", prompt_tokens, completion_tokens, read)
+        content = [{"type": "text", "text": text}]
+        if tool:
+            content = [{"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:12]}", "name": tool[0], "input": json.loads(text)}]
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": content,
+            "stop_reason": "tool_use" if tool else "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                # Like Anthropic, input_tokens leaves out cache reads and writes
+                "input_tokens": prompt_tokens - read - written,
+                "output_tokens": completion_tokens,
+                "cache_creation_input_tokens": written,
+                "cache_read_input_tokens": read,
+            },
+        }
+
+    def stream_delay(self, data: Any) -> float:
+        """Generation time of a streamed chunk at the profile's tokens per second"""
+        if not self.profile["tokens_per_s"] or not isinstance(data, dict):
+            return 0.0
+        text = ""
+        for choice in data.get("choices", []):
+            delta = choice["delta"]
+            text += delta.get("content") or ""
+            text += "".join(call["function"].get("arguments", "") for call in delta.get("tool_calls") or [])
+        delta = data.get("delta") or {}
+        text += delta.get("text") or delta.get("partial_json") or ""
+        return count_tokens(text) / self.profile["tokens_per_s"] if text else 0.0
+
+    def serper(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._sleep(self.profile["search_latency_s"])
+        self._count("serper")
+        query = body.get("q", "")
+        return {
+            "searchParameters": {"q": query, "type": "search"},
+            "knowledgeGraph": {"title": query, "type": "Company", "description": filler(25)},
+            "organic": [
+                {
+                    "title": f"{query} result {i + 1}",
+                    "link": f"https://example.com/{i + 1}",
+                    "snippet": filler(30, seed=i),
+                    "position": i + 1,
+                }
+                for i in range(body.get("num", 10))
+            ],
+        }
+
+    def parallel(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._sleep(self.profile["search_latency_s"])
+        self._count("parallel")
+        return {
+            "search_id": f"search_{uuid.uuid4().hex[:12]}",
+            "results": [
+                {"url": f"https://example.com/p{i + 1}", "title": f"Result {i + 1}", "excerpts": [filler(40, seed=i)]}
+                for i in range(min(body.get("max_results", 5), 5))
+            ],
+        }
+
+    def composio(self, method: str, path: str, query: Dict[str, List[str]], body: Dict[str, Any]) -> tuple[int, Any]:
+        """Answer the Composio endpoints used by ComposioToolSet and the assistant"""
+        self._count("composio")
+        if path.endswith("/v1/client/auth/client_info"):
+            return 200, {"client": {"id": "benchmark", "name": "benchmark"}, "apiKey": {"key": FAKE_API_KEY}}
+        if "/v1/connectedAccounts" in path:
+            apps = (query.get("appNames") or ["gmail,googlecalendar,googledocs"])[0].lower()
+            entities = query.get("user_uuid") or ["default"] + [BENCH_ENTITY.format(i) for i in range(MAX_BENCH_ENTITIES)]
+            now = datetime.now(timezone.utc).isoformat()
+            items = [
+                {
+                    "id": f"ca_{app}_{entity}",
+                    "status": "ACTIVE",
+                    "createdAt": now,
+                    "updatedAt": now,
+                    "appUniqueId": app,
+                    "appName": app,
+                    "integrationId": f"int_{app}",
+                    "connectionParams": {},
+                    "clientUniqueUserId": entity,
+                    "entityId": entity,
+                }
+                for entity in entities
+                for app in apps.split(",")
+            ]
+            return 200, {"items": items, "totalPages": 1, "page": 1}
+        match = re.search(r"/v2/actions/([A-Z0-9_]+)/execute$", path)
+        if match and method == "POST":
+            self._sleep(self.profile["composio_latency_s"])
+            return 200, self.execute_action(match.group(1), body.get("input") or {})
+        match = re.search(r"/v2/actions/([A-Z0-9_]+)$", path)
+        if match:
+            return 200, composio_action_schema(match.group(1))
+        if path.endswith("/v2/actions"):
+            apps = (query.get("apps") or [""])[0].lower()
+            actions = {
+                "gmail": ["GMAIL_FETCH_EMAILS"],
+                "googlecalendar": ["GOOGLECALENDAR_FIND_EVENT", "GOOGLECALENDAR_GET_CALENDAR"],
+                "googledocs": ["GOOGLEDOCS_CREATE_DOCUMENT", "GOOGLEDOCS_UPDATE_EXISTING_DOCUMENT"],
+            }
+            items = [composio_action_schema(a) for app in apps.split(",") for a in actions.get(app, [])]
+            return 200, {"items": items, "totalPages": 1, "page": 1}
+        return 404, {"message": f"Not implemented in the benchmark stand-in: {method} {path}"}
+
+    def execute_action(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a Calendar, Gmail or Docs action"""
+        if action == "GOOGLECALENDAR_GET_CALENDAR":
+            data = {"calendar": {"id": "primary", "timeZone": "UTC"}}
+        elif action == "GOOGLECALENDAR_FIND_EVENT":
+            data = {"items": calendar_events(params.get("timeMin"))}
+        elif action == "GMAIL_FETCH_EMAILS":
+            data = {"messages": [{k: v for k, v in m.items() if k != "llm_label"} for m in self.emails]}
+        elif action in ("GOOGLEDOCS_CREATE_DOCUMENT", "GOOGLEDOCS_UPDATE_EXISTING_DOCUMENT"):
+            data = {"documentId": params.get("document_id") or f"doc-{uuid.uuid4().hex[:12]}"}
+        else:
+            return {"data": {}, "successful": False, "error": f"Unsupported action: {action}"}
+        return {"data": data, "successful": True, "error": None}
+
+    def _handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+                url = urlparse(self.path)
+                path, query = url.path, parse_qs(url.query)
+                try:
+                    if path.startswith("/composio"):
+                        self._reply(*services.composio(self.command, path, query, body))
+                    elif path.endswith("/chat/completions"):
+                        self._llm("openai", services.openai_chat, body)
+                    elif path.endswith("/v1/messages"):
+                        self._llm("anthropic", services.anthropic_messages, body)
+                    elif path.startswith("/serper"):
+                        self._reply(200, services.serper(body))
+                    elif path.startswith("/parallel"):
+                        self._reply(200, services.parallel(body))
+                    else:
+                        self._reply(404, {"error": f"Unknown path: {path}"})
+                except Exception as e:
+                    self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+            def _llm(self, service: str, answer, body: Dict[str, Any]):
+                if service in services.outages:
+                    services._count(f"{service}_outage")
+                    error = {"type": "overloaded_error", "message": "Service unavailable"}
+                    payload = {"type": "error", "error": error} if service == "anthropic" else {"error": error}
+                    self._reply(529 if service == "anthropic" else 503, payload)
+                    return
+                if not services._enter_llm(service):
+                    error = {"type": "rate_limit_error", "message": "Too many concurrent requests"}
+                    payload = {"type": "error", "error": error} if service == "anthropic" else {"error": error}
+                    self._reply(429, payload, {"Retry-After": "1"})
+                    return
+                try:
+                    payload = answer(body)
+                    if not body.get("stream"):
+                        self._reply(200, payload)
+                    elif service == "anthropic":
+                        self._stream(anthropic_stream_events(payload))
+                    else:
+                        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+                        self._stream(openai_stream_events(payload, include_usage))
+                finally:
+                    services._exit_llm()
+
+            def _stream(self, events: List[tuple[Optional[str], Any]]):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                # No length is known up front, so the body ends with the connection
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for event, data in events:
+                    services._sleep(services.stream_delay(data))
+                    lines = f"event: {event}\n" if event else ""
+                    lines += f"data: {data if isinstance(data, str) else json.dumps(data)}\n\n"
+                    self.wfile.write(lines.encode('utf-8'))
+                    self.wfile.flush()
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> str:
+        """Start serving in a daemon thread and return the base URL"""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True).start()
+        return self.url
+
+    def stop(self):
+        """Stop serving"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def reset_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return and clear the per-service call and token counters"""
+        with self._lock:
+            stats, self.stats = self.stats, {}
+        return stats
+
+    def clear_prompt_cache(self):
+        """Forget every cached prompt prefix"""
+        with self._lock:
+            self._prompt_cache.clear()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Serve the fakes until interrupted"""
+    parser = argparse.ArgumentParser(description="Local stand-ins for the LLM, search and Composio APIs")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for the simulated latencies")
+    parser.add_argument("--llm-concurrency-limit", type=int, default=None, help="Answer 429 beyond this many LLM requests")
+    parser.add_argument("--outage", nargs="+", choices=["anthropic", "openai"], default=[], help="LLM services that are down")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of LLM calls delayed by --slow-s")
+    parser.add_argument("--slow-s", type=float, default=0.0, help="Extra latency of a slow LLM call")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of final answers with a JSON defect")
+    args = parser.parse_args(argv)
+
+    services = FakeServices(
+        args.profile, args.time_scale, port=args.port, llm_concurrency_limit=args.llm_concurrency_limit,
+        outages=args.outage, slow_rate=args.slow_rate, slow_s=args.slow_s, malformed_rate=args.malformed_rate,
+    )
+    services.start()
+    print(f"🧪 Fake services ({args.profile}) listening on {services.url}")
+    for key, value in services.env().items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        services.stop()
+
+
+if __name__ == "__main__":
+    main()
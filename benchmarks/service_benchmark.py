@@ -0,0 +1,264 @@
+"""
+Crew service vs. CLI: throughput and latency under concurrent submissions
+
+For each crew, the same jobs are run two ways against the local fakes:
+
+- cli: every job is a fresh `python app.py` process (interpreter start-up,
+  imports, client construction and config parsing included), with up to
+  `concurrency` processes at a time.
+- service: `service_app.py` is started once and warmed up; `concurrency`
+  clients each submit a job and wait for its result, then submit the next.
+
+Job latency is measured from process start or submission to the result, and
+reported with throughput at each concurrency level. The service's start-up
+time is reported separately, since it is paid once.
+
+Usage (from the repository root):
+    python -m benchmarks.service_benchmark --concurrency 1 4 8
+    python -m benchmarks.service_benchmark --crews company_research --processes
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+import urllib.error
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable
+
+from benchmarks.e2e_benchmark import CREWS, REPO_ROOT, _percentile, crew_env, crew_python
+from benchmarks.fake_services import FakeServices, PROFILES, BENCH_ENTITY
+
+
+# Job inputs: the same the CLI app runs with
+JOB_INPUTS = {
+    "job_screener": {},
+    "company_research": {"company_name": "HubSpot hubspot.com"},
+    "daily_assistant": {},
+}
+
+# Port of each crew's service (see the service_app.py defaults)
+SERVICE_PORTS = {
+    "job_screener": 8700,
+    "company_research": 8701,
+    "daily_assistant": 8702,
+}
+
+READY_TIMEOUT_S = 300.0
+JOB_TIMEOUT_S = 600.0
+
+
+def job_dir(work_dir: Path, crew: str) -> Path:
+    """Working directory for a crew's jobs, so outputs stay out of the project"""
+    path = work_dir / crew
+    path.mkdir(parents=True, exist_ok=True)
+    # The job screener reads its inputs from ./input
+    input_dir = REPO_ROOT / CREWS[crew] / "input"
+    if input_dir.exists() and not (path / "input").exists():
+        (path / "input").symlink_to(input_dir)
+    return path
+
+
+def _request(url: str, payload: Optional[Dict[str, Any]] = None, timeout: float = 30.0) -> Dict[str, Any]:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def run_jobs(job: Callable[[int], None], concurrency: int, jobs: int) -> Dict[str, Any]:
+    """Run `jobs` jobs with `concurrency` in flight and measure them"""
+    def timed(index: int) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        error = None
+        try:
+            job(index)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return {"latency_s": time.perf_counter() - started_at, "error": error}
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(jobs)))
+    wall_time_s = time.perf_counter() - started_at
+    latencies = [r["latency_s"] for r in results]
+    succeeded = sum(r["error"] is None for r in results)
+    return {
+        "concurrency": concurrency,
+        "jobs": jobs,
+        "failed": jobs - succeeded,
+        "errors": sorted({r["error"].splitlines()[0][:200] for r in results if r["error"]}),
+        "wall_time_s": round(wall_time_s, 3),
+        "throughput_jobs_per_min": round(succeeded / wall_time_s * 60, 2) if wall_time_s else None,
+        "latency_p50_s": _percentile(latencies, 50),
+        "latency_p99_s": _percentile(latencies, 99),
+    }
+
+
+def cli_job(crew: str, env: Dict[str, str], cwd: Path, python: str, log_path: Path) -> Callable[[int], None]:
+    """A job that runs the crew's app.py in a new process"""
+    app = REPO_ROOT / CREWS[crew] / "app.py"
+
+    def job(index: int):
+        with open(log_path, 'a', encoding='utf-8') as log:
+            returncode = subprocess.run(
+                [python, str(app)], cwd=cwd, env=env, stdin=subprocess.DEVNULL, stdout=log,
+                stderr=subprocess.STDOUT, timeout=JOB_TIMEOUT_S,
+            ).returncode
+        if returncode:
+            raise RuntimeError(f"app.py exited with {returncode}, see {log_path}")
+    return job
+
+
+def service_job(crew: str, base_url: str) -> Callable[[int], None]:
+    """A job submitted to the running service, waiting for its result"""
+    def job(index: int):
+        job_id = _request(f"{base_url}/jobs", {"inputs": JOB_INPUTS[crew]})["job_id"]
+        deadline = time.monotonic() + JOB_TIMEOUT_S
+        while True:
+            try:
+                result = _request(f"{base_url}/jobs/{job_id}/result?wait=60", timeout=90)
+            except urllib.error.HTTPError as e:
+                raise RuntimeError(f"result request answered {e.code}") from e
+            if result["status"] == "failed":
+                raise RuntimeError(result["error"])
+            if result["status"] == "succeeded":
+                return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"job {job_id} still {result['status']} after {JOB_TIMEOUT_S}s")
+    return job
+
+
+def start_service(
+    crew: str,
+    env: Dict[str, str],
+    cwd: Path,
+    python: str,
+    log_path: Path,
+    workers: int,
+    processes: bool
+) -> tuple[subprocess.Popen, float]:
+    """Start the crew's service and wait until it answers; returns the process and its start-up time"""
+    port = SERVICE_PORTS[crew]
+    command = [python, str(REPO_ROOT / CREWS[crew] / "service_app.py"), "--port", str(port),
+               "--workers", str(workers), "--queue-size", str(max(64, workers * 4))]
+    if processes:
+        command.append("--processes")
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+        stdout=open(log_path, 'w', encoding='utf-8'), stderr=subprocess.STDOUT,
+    )
+    while time.perf_counter() - started_at < READY_TIMEOUT_S:
+        if process.poll() is not None:
+            raise RuntimeError(f"service exited with {process.returncode}, see {log_path}")
+        try:
+            _request(f"http://127.0.0.1:{port}/health", timeout=2)
+            return process, round(time.perf_counter() - started_at, 3)
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    process.terminate()
+    raise TimeoutError(f"service not ready after {READY_TIMEOUT_S}s, see {log_path}")
+
+
+def benchmark_crew(
+    services: FakeServices,
+    crew: str,
+    levels: List[int],
+    jobs_per_slot: int,
+    work_dir: Path,
+    python: Optional[str] = None,
+    processes: bool = False
+) -> Dict[str, Any]:
+    """Run a crew's jobs through the CLI and the service at every concurrency level"""
+    project_dir = REPO_ROOT / CREWS[crew]
+    python = crew_python(project_dir, python)
+    cwd = job_dir(work_dir, crew)
+    env = crew_env(services, project_dir, work_dir, crew)
+    # The daily assistant runs for the toolset entity, which must be connected in the fakes
+    env["COMPOSIO_ENTITY_ID"] = BENCH_ENTITY.format(0)
+
+    results: Dict[str, Any] = {"crew": crew, "cli": {}, "service": {}}
+    for concurrency in levels:
+        results["cli"][concurrency] = run_jobs(
+            cli_job(crew, env, cwd, python, work_dir / f"{crew}.cli.log"), concurrency, concurrency * jobs_per_slot
+        )
+
+    process, startup_s = start_service(
+        crew, env, cwd, python, work_dir / f"{crew}.service.log", max(levels), processes
+    )
+    results["service_startup_s"] = startup_s
+    base_url = f"http://127.0.0.1:{SERVICE_PORTS[crew]}"
+    try:
+        # One job first, so the levels measure steady state like the CLI's warm page cache
+        run_jobs(service_job(crew, base_url), 1, 1)
+        for concurrency in levels:
+            results["service"][concurrency] = run_jobs(
+                service_job(crew, base_url), concurrency, concurrency * jobs_per_slot
+            )
+        results["service_stats"] = _request(f"{base_url}/health")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Crew service vs. CLI under concurrent submissions")
+    parser.add_argument("--crews", nargs="+", choices=sorted(CREWS), default=sorted(CREWS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--jobs-per-slot", type=int, default=2, help="Jobs per concurrent client")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for the simulated latencies")
+    parser.add_argument("--processes", action="store_true", help="Run the service workers as processes")
+    parser.add_argument("--python", help="Interpreter for the crews (default: each project's .venv)")
+    parser.add_argument("--output", help="Also write the full results to this JSON file")
+    args = parser.parse_args(argv)
+
+    services = FakeServices(args.profile, args.time_scale)
+    services.start()
+    work_dir = Path(tempfile.mkdtemp(prefix="service_benchmark_"))
+    print(f"🧪 Fake services ({args.profile}) on {services.url}, logs and outputs in {work_dir}")
+
+    results = {}
+    failed = False
+    try:
+        for crew in args.crews:
+            try:
+                m = benchmark_crew(services, crew, args.concurrency, args.jobs_per_slot, work_dir, args.python, args.processes)
+            except (RuntimeError, TimeoutError) as e:
+                print(f"❌ {crew}: {e}")
+                failed = True
+                continue
+            results[crew] = m
+            print(f"🛰️  {crew}: service ready in {m['service_startup_s']}s "
+                  f"({m['service_stats']['mode']}, {m['service_stats']['workers']} workers)")
+            for concurrency in args.concurrency:
+                cli, service = m["cli"][concurrency], m["service"][concurrency]
+                speedup = (service["throughput_jobs_per_min"] / cli["throughput_jobs_per_min"]
+                           if cli["throughput_jobs_per_min"] and service["throughput_jobs_per_min"] else None)
+                icon = "✅" if not cli["failed"] and not service["failed"] else "❌"
+                print(
+                    f"{icon} {crew} x{concurrency}: "
+                    f"cli {cli['throughput_jobs_per_min']} jobs/min, p50 {cli['latency_p50_s']}s, p99 {cli['latency_p99_s']}s | "
+                    f"service {service['throughput_jobs_per_min']} jobs/min, p50 {service['latency_p50_s']}s, "
+                    f"p99 {service['latency_p99_s']}s"
+                    + (f" | {speedup:.2f}x throughput" if speedup else "")
+                )
+                for error in cli["errors"] + service["errors"]:
+                    print(f"   ⚠️  {error}")
+                failed = failed or bool(cli["failed"] or service["failed"])
+    finally:
+        services.stop()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Overhead of telemetry and console output per LLM call
+
+Runs a crew against the fakes in each configuration below, in alternating
+rounds so drift affects all of them alike:
+
+- off: no telemetry export, no console output
+- console: crewai's verbose console rendering on the handlers' threads (the
+  behaviour before CREW_VERBOSE existed)
+- console_deferred: verbose console written by a background thread (the default)
+- telemetry: every run's events exported to a JSONL file in the background
+- telemetry_sampled: 10% of runs exported
+
+For each configuration it reports p50 run latency and the difference to `off`
+per LLM call, and for telemetry the time spent on the calling thread per event
+(sampling and buffering) and on the exporter thread per exported event. The
+instant profile is the default, so framework overhead is not hidden behind
+simulated LLM latency.
+
+Usage (from the repository root):
+    python -m benchmarks.telemetry_benchmark --rounds 3 --runs 4
+"""
+import sys
+import json
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from benchmarks.e2e_benchmark import CREWS, _percentile, run_level
+from benchmarks.fake_services import FakeServices, PROFILES
+
+
+def configurations(work_dir: Path) -> Dict[str, Dict[str, str]]:
+    """Environment of each measured configuration"""
+    quiet = {"CREW_TELEMETRY": "off", "CREW_VERBOSE": "false"}
+    return {
+        "off": quiet,
+        "console": {**quiet, "CREW_VERBOSE": "true"},
+        "console_deferred": {**quiet, "CREW_VERBOSE": "deferred"},
+        "telemetry": {**quiet, "CREW_TELEMETRY": str(work_dir / "telemetry.jsonl")},
+        "telemetry_sampled": {
+            **quiet, "CREW_TELEMETRY": str(work_dir / "telemetry_sampled.jsonl"), "CREW_TELEMETRY_SAMPLE_RATE": "0.1",
+        },
+    }
+
+
+def benchmark_crew(
+    services: FakeServices,
+    crew: str,
+    rounds: int,
+    runs: int,
+    work_dir: Path,
+    python: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run a crew in every configuration and compare each with `off`"""
+    configs = configurations(work_dir)
+    latencies: Dict[str, List[float]] = {name: [] for name in configs}
+    llm_calls: Dict[str, int] = {name: 0 for name in configs}
+    telemetry: Dict[str, Dict[str, float]] = {name: {} for name in configs}
+    errors: List[str] = []
+    for round_index in range(rounds):
+        for name, env in configs.items():
+            level_dir = work_dir / f"{crew}-{name}-{round_index}"
+            level_dir.mkdir(parents=True, exist_ok=True)
+            m = run_level(services, crew, 1, runs, level_dir, python, env_overrides=env)
+            if "error" in m or m["failed"]:
+                errors.append(f"{name}: {m.get('error') or '; '.join(m['errors'])}")
+                continue
+            with open(level_dir / f"{crew}@1.json", 'r', encoding='utf-8') as f:
+                latencies[name].extend(json.load(f)["run_latencies_s"])
+            llm_calls[name] += m["llm_calls"]
+            stats = m["telemetry"]
+            for key in ("events", "exported", "export_s"):
+                telemetry[name][key] = telemetry[name].get(key, 0) + (stats.get(key) or 0)
+            if stats.get("record_us_per_event") is not None:
+                telemetry[name]["record_us"] = telemetry[name].get("record_us", 0) + stats["record_us_per_event"] * stats["events"]
+
+    baseline = _percentile(latencies["off"], 50)
+    results: Dict[str, Any] = {"crew": crew, "errors": errors, "configurations": {}}
+    for name in configs:
+        p50 = _percentile(latencies[name], 50)
+        calls_per_run = llm_calls[name] / len(latencies[name]) if latencies[name] else 0
+        stats = telemetry[name]
+        results["configurations"][name] = {
+            "runs": len(latencies[name]),
+            "run_latency_p50_s": p50,
+            "llm_calls_per_run": round(calls_per_run, 1),
+            "overhead_ms_per_llm_call": (
+                round((p50 - baseline) / calls_per_run * 1000, 2) if p50 is not None and baseline is not None and calls_per_run else None
+            ),
+            "telemetry_events": stats.get("events", 0),
+            "telemetry_exported": stats.get("exported", 0),
+            "record_us_per_event": round(stats["record_us"] / stats["events"], 2) if stats.get("events") else None,
+            "export_us_per_event": round(stats["export_s"] / stats["exported"] * 1e6, 2) if stats.get("exported") else None,
+        }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Telemetry and console overhead per LLM call")
+    parser.add_argument("--crews", nargs="+", choices=sorted(CREWS), default=["job_screener"])
+    parser.add_argument("--rounds", type=int, default=3, help="Alternating rounds over the configurations")
+    parser.add_argument("--runs", type=int, default=4, help="Sequential crew runs per configuration and round")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="instant")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for the simulated latencies")
+    parser.add_argument("--python", help="Interpreter for the crews (default: each project's .venv)")
+    parser.add_argument("--output", help="Also write the full results to this JSON file")
+    args = parser.parse_args(argv)
+
+    services = FakeServices(args.profile, args.time_scale)
+    services.start()
+    work_dir = Path(tempfile.mkdtemp(prefix="telemetry_benchmark_"))
+    print(f"🧪 Fake services ({args.profile}) on {services.url}, worker output in {work_dir}")
+
+    results = {}
+    try:
+        for crew in args.crews:
+            m = benchmark_crew(services, crew, args.rounds, args.runs, work_dir, args.python)
+            results[crew] = m
+            for name, c in m["configurations"].items():
+                line = (f"{crew} {name}: p50 {c['run_latency_p50_s']}s over {c['runs']} runs, "
+                        f"{c['overhead_ms_per_llm_call']}ms per LLM call vs off")
+                if c["telemetry_events"]:
+                    line += (f", {c['telemetry_exported']}/{c['telemetry_events']} events exported, "
+                             f"{c['record_us_per_event']}µs per event on the calling thread, "
+                             f"{c['export_us_per_event']}µs per exported event in the background")
+                print(f"{'✅' if c['runs'] else '❌'} {line}")
+            for error in m["errors"]:
+                print(f"   ⚠️  {error}")
+    finally:
+        services.stop()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return int(any(m["errors"] for m in results.values()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Runtime shared by the crews of this repository
+
+Each crew project keeps its agents, tasks and output models in its own
+`crew_agent` package and imports the runtime from here.
+"""
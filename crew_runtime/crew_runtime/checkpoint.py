@@ -0,0 +1,190 @@
+"""
+Task-level checkpoints, so a failed crew run resumes where it stopped
+
+Every task that completes is checkpointed (its raw and pydantic output) under the
+run's execution folder, the same `<base_output_dir>/<folder_name>_<run_id>`
+folder StorageManager writes the final outputs to:
+
+    outputs/daily_assistant_<run_id>/
+        checkpoints/
+            state.json                      # inputs and other pre-kickoff state
+            daily_calendar_tasks.json       # one file per completed task
+            email_extraction_task.json
+        ...                                 # final outputs, written by StorageManager
+
+A rerun with the same run ID restores the completed tasks in order, without
+calling their agents, and continues from the first incomplete one. Restored
+outputs feed the context of later tasks exactly like fresh ones. A checkpoint is
+only restored while the task prompt (description and expected output, with the
+inputs interpolated) is unchanged; once a task runs again, every task after it
+runs as well.
+
+Checkpoints hold the crew inputs and every task output, so they are deleted
+once a run succeeds (see TaskCheckpoints.clear); only failed runs keep theirs.
+"""
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Union
+
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+
+from crew_runtime.files import atomic_write_json
+
+
+CHECKPOINT_DIRNAME = "checkpoints"
+STATE_FILENAME = "state.json"
+
+
+def execution_folder(base_output_dir: Union[str, Path], folder_name: str, run_id: str) -> Path:
+    """The execution folder of a run, as created by StorageManager.create_execution_folder"""
+    folder_path = Path(base_output_dir) / f"{folder_name}_{run_id}"
+    folder_path.mkdir(parents=True, exist_ok=True)
+    return folder_path
+
+
+def _read(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def fingerprint(task: Task) -> str:
+    """Hash of the task prompt with its inputs interpolated"""
+    return hashlib.sha256(f"{task.description}\n{task.expected_output}".encode('utf-8')).hexdigest()
+
+
+class TaskCheckpoints:
+    """Checkpoints of the completed tasks of one run"""
+
+    def __init__(self, folder_path: Union[str, Path]):
+        """
+        Initialize the checkpoints of a run
+
+        Args:
+            folder_path: Execution folder of the run (see execution_folder)
+        """
+        self.directory = Path(folder_path) / CHECKPOINT_DIRNAME
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.restored: List[str] = []
+        self.saved: List[str] = []
+
+    def _task_path(self, task_name: str) -> Path:
+        return self.directory / f"{task_name}.json"
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        """Pre-kickoff state (e.g. the crew inputs) saved by an earlier attempt, if any"""
+        state = _read(self.directory / STATE_FILENAME)
+        return state.get("state") if state else None
+
+    def save_state(self, state: Dict[str, Any]):
+        """
+        Save pre-kickoff state, so a resumed run reuses it instead of fetching it again
+
+        Args:
+            state: JSON-serializable state, typically the crew inputs
+        """
+        atomic_write_json(self.directory / STATE_FILENAME, {"saved_at": datetime.now().isoformat(), "state": state})
+
+    def completed_tasks(self) -> List[str]:
+        """Names of the tasks with a checkpoint"""
+        return sorted(path.stem for path in self.directory.glob("*.json") if path.name != STATE_FILENAME)
+
+    def save(self, task: Task, output: TaskOutput):
+        """
+        Checkpoint the output of a completed task
+
+        Args:
+            task: The task
+            output: Its output
+        """
+        atomic_write_json(self._task_path(task.name), {
+            "task": task.name,
+            "fingerprint": fingerprint(task),
+            "completed_at": datetime.now().isoformat(),
+            "agent": output.agent,
+            "output_format": output.output_format.value,
+            "raw": output.raw,
+            "pydantic": output.pydantic.model_dump() if output.pydantic else None,
+            "json_dict": output.json_dict,
+        })
+        self.saved.append(task.name)
+
+    def restore(self, task: Task) -> Optional[TaskOutput]:
+        """
+        Rebuild the output of a task from its checkpoint
+
+        Args:
+            task: The task, with its inputs interpolated
+
+        Returns:
+            The task output, or None if there is no usable checkpoint
+        """
+        checkpoint = _read(self._task_path(task.name))
+        if not checkpoint:
+            return None
+        if checkpoint.get("fingerprint") != fingerprint(task):
+            print(f"⚠️  Checkpoint of {task.name} was made with a different prompt or inputs, running it again")
+            return None
+        pydantic = None
+        if checkpoint.get("pydantic") is not None and task.output_pydantic:
+            try:
+                pydantic = task.output_pydantic.model_validate(checkpoint["pydantic"])
+            except ValueError:
+                print(f"⚠️  Checkpoint of {task.name} no longer matches {task.output_pydantic.__name__}, running it again")
+                return None
+        return TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            agent=checkpoint.get("agent") or (task.agent.role if task.agent else ""),
+            output_format=checkpoint.get("output_format") or "raw",
+            raw=checkpoint.get("raw") or "",
+            pydantic=pydantic,
+            json_dict=checkpoint.get("json_dict"),
+        )
+
+    def clear(self):
+        """Delete the checkpoints of a run that succeeded, and its execution folder if nothing else is in it"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        try:
+            self.directory.parent.rmdir()
+        except OSError:
+            pass
+
+    def attach(self, crew: Crew) -> Crew:
+        """
+        Checkpoint the crew's tasks as they complete and restore the completed ones
+
+        Args:
+            crew: A sequential crew, before kickoff
+
+        Returns:
+            The same crew
+        """
+        # Only the leading run of completed tasks is restored: a task that runs again
+        # may produce a different output, which the tasks after it depend on
+        resuming = {"active": True}
+
+        for task in crew.tasks:
+            original_execute = task.execute_sync
+
+            def execute_sync(*args, task=task, original_execute=original_execute, **kwargs) -> TaskOutput:
+                output = self.restore(task) if resuming["active"] else None
+                if output is not None:
+                    task.output = output
+                    self.restored.append(task.name)
+                    print(f"♻️  Restored {task.name} from checkpoint")
+                    return output
+                resuming["active"] = False
+                output = original_execute(*args, **kwargs)
+                self.save(task, output)
+                return output
+
+            object.__setattr__(task, "execute_sync", execute_sync)
+        return crew
@@ -0,0 +1,243 @@
+"""
+Local store of researched company profiles, shared by the crews of this repository
+
+CompanyResearchCrew writes the CompanyResearchData of every company it researches;
+JobScreenerCrew reads it to fill the company overview of a job profile, so a
+company that was already researched costs no web searches when screening.
+
+Profiles are JSON files keyed by normalized domain (`hubspot.com`, whether the
+input was `https://www.hubspot.com/careers` or `HubSpot hubspot.com`). A profile
+is written under the company's website domain and the domain of the research
+input, so either finds it:
+
+    company_profiles/
+        hubspot.com.json    # {"domain", "aliases", "source", "run_id", "researched_at", "profile"}
+
+A profile older than the maximum age counts as a miss, and the job screener
+searches the web as before. Partial results (a research task stopped by its
+budget) are not stored.
+
+Environment:
+    CREW_COMPANY_STORE: Directory of the profiles (default: company_profiles/ at
+        the repository root), or off
+    CREW_COMPANY_MAX_AGE_DAYS: Age after which a profile is stale (default: 30)
+"""
+import os
+import re
+import json
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+
+from crew_runtime.files import atomic_write_json
+from crew_runtime.instrumentation import current_run
+from crew_runtime.output_models import NOT_AVAILABLE
+
+
+MAX_AGE_DAYS = 30.0
+
+# A host name: labels separated by dots, ending in an alphabetic top-level domain
+_DOMAIN = re.compile(r"^(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z]{2,}$")
+_SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*://")
+
+# Fields of CompanyResearchData in the overview, in order
+OVERVIEW_FIELDS = (
+    ("tagline", "Tagline"),
+    ("website", "Website"),
+    ("industry", "Industry"),
+    ("company_type", "Type"),
+    ("founded_year", "Founded"),
+    ("employee_count", "Employees"),
+    ("revenue", "Revenue"),
+    ("product_summary", "Products"),
+    ("competitors", "Competitors"),
+    ("technology_stack", "Technology stack"),
+    ("hiring_status", "Hiring"),
+    ("tech_job_roles", "Tech roles"),
+    ("financial_info", "Financials"),
+    ("funding_acquisitions", "Funding and acquisitions"),
+    ("key_people", "Key people"),
+    ("latest_news", "Latest news"),
+)
+
+
+def normalize_domain(text: Optional[str]) -> Optional[str]:
+    """
+    The domain a company is stored under, from a URL, a host or free text
+
+    A URL (with a scheme) or a www. host is taken as the company's site; otherwise
+    the last domain in the text is, so "Vercel (Next.js) vercel.com" gives
+    vercel.com rather than the product name.
+
+    Args:
+        text: e.g. "https://www.HubSpot.com/careers", "hubspot.com" or "HubSpot hubspot.com"
+
+    Returns:
+        The lowercase host without "www." (e.g. "hubspot.com"), or None when the
+        text holds no domain
+    """
+    candidates: List[str] = []
+    for token in (text or "").lower().split():
+        token = token.strip("()<>,;\"'")
+        host = _SCHEME.sub("", token)
+        explicit = host != token or host.startswith("www.")
+        host = re.split(r"[/?#]", host, maxsplit=1)[0].rsplit("@", 1)[-1].split(":")[0].rstrip(".")
+        if host.startswith("www."):
+            host = host[4:]
+        if _DOMAIN.match(host):
+            if explicit:
+                return host
+            candidates.append(host)
+    return candidates[-1] if candidates else None
+
+
+def _is_partial(profile: Dict[str, Any]) -> bool:
+    return any(profile.get(field) in (None, "", NOT_AVAILABLE) for field in ("company_name", "website"))
+
+
+def company_overview(profile: Dict[str, Any]) -> str:
+    """
+    Compact text of a CompanyResearchData profile for a task prompt
+
+    Args:
+        profile: CompanyResearchData fields
+
+    Returns:
+        One line per known field, starting with the company name
+    """
+    lines = [f"Company: {profile.get('company_name')}"]
+    for field, label in OVERVIEW_FIELDS:
+        value = profile.get(field)
+        if isinstance(value, list):
+            value = "; ".join(str(item) for item in value if item)
+        if value and value != NOT_AVAILABLE:
+            lines.append(f"{label}: {value}")
+    return "\n".join(lines)
+
+
+class CompanyProfileStore:
+    """Company profiles on disk, one JSON file per normalized domain"""
+
+    def __init__(self, path: Optional[str], max_age_days: float = MAX_AGE_DAYS):
+        """
+        Initialize the store
+
+        Args:
+            path: Directory of the profiles (None: store off)
+            max_age_days: Age after which a profile counts as a miss
+        """
+        self.directory = Path(path) if path else None
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "writes": 0, "skipped": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _path(self, domain: str) -> Path:
+        return self.directory / f"{domain}.json"
+
+    def get(self, text: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the fresh profile of a company
+
+        Args:
+            text: Website URL, domain or text containing one
+
+        Returns:
+            The stored entry with its age in days ("age_days"), or None when the
+            company was not researched, its profile is stale or the text holds no domain
+        """
+        domain = normalize_domain(text)
+        if not self.enabled or domain is None:
+            return None
+        try:
+            with open(self._path(domain), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            researched_at = datetime.fromisoformat(entry["researched_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self._count("misses")
+            return None
+        age_days = (datetime.now(timezone.utc) - researched_at).total_seconds() / 86400
+        entry["age_days"] = round(age_days, 2)
+        if age_days > self.max_age_days:
+            self._count("stale")
+            return None
+        self._count("hits")
+        return entry
+
+    def put(
+        self,
+        profile: Dict[str, Any],
+        domains: Optional[List[Optional[str]]] = None,
+        source: str = "company_research",
+        run_id: Optional[str] = None
+    ) -> List[str]:
+        """
+        Store a company profile under its website domain and any other domains given
+
+        Args:
+            profile: CompanyResearchData fields
+            domains: Other URLs, domains or texts the company is looked up by
+            source: Name of the crew that researched the company
+            run_id: Run that produced the profile (default: the current run)
+
+        Returns:
+            The domains the profile was written under (empty for a partial profile)
+        """
+        if not self.enabled:
+            return []
+        written: List[str] = []
+        if not _is_partial(profile):
+            for domain in [normalize_domain(profile.get("website"))] + [normalize_domain(d) for d in domains or []]:
+                if domain and domain not in written:
+                    written.append(domain)
+        if not written:
+            self._count("skipped")
+            return []
+        entry = {
+            "domain": written[0],
+            "aliases": written[1:],
+            "source": source,
+            "run_id": run_id or current_run.get(),
+            "researched_at": datetime.now(timezone.utc).isoformat(),
+            "profile": profile,
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for domain in written:
+            atomic_write_json(self._path(domain), {**entry, "domain": domain})
+            self._count("writes")
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookups (hits, misses, stale profiles) and profiles written or skipped as partial"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["path"] = str(self.directory) if self.enabled else None
+        return stats
+
+    def print_stats(self):
+        """Print the store's lookups and writes, when it was used"""
+        s = self.stats()
+        if not any(s[key] for key in ("hits", "misses", "stale", "writes", "skipped")):
+            return
+        print(f"🏢 Company profiles ({s['path']}): {s['hits']} hits, {s['misses']} misses, "
+              f"{s['stale']} stale, {s['writes']} written, {s['skipped']} partial skipped")
+
+
+def store_path() -> Optional[str]:
+    """The store directory from CREW_COMPANY_STORE (None: store off)"""
+    path = os.getenv("CREW_COMPANY_STORE") or str(Path(__file__).resolve().parents[2] / "company_profiles")
+    return None if path.lower() in ("off", "false", "0", "none") else path
+
+
+company_profiles = CompanyProfileStore(
+    store_path(),
+    max_age_days=float(os.getenv("CREW_COMPANY_MAX_AGE_DAYS", str(MAX_AGE_DAYS))),
+)
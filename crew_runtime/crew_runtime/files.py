@@ -0,0 +1,41 @@
+"""
+Atomic file writes shared by the checkpoints, the company store and the crews' storage
+
+A file is written to a temporary file in the same directory and renamed over the
+target, so readers and resumed runs never see partial output, even after a crash.
+"""
+import os
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Union
+
+
+def atomic_write(path: Union[str, Path], data: bytes):
+    """
+    Write a file through a temporary file and rename, so readers never see partial output
+
+    Args:
+        path: File to write; its directory must exist
+        data: Complete file contents
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_json(path: Union[str, Path], data: Any):
+    """
+    Write data as indented JSON with atomic_write
+
+    Args:
+        path: File to write; its directory must exist
+        data: JSON-serializable data (other values are written with str())
+    """
+    atomic_write(path, json.dumps(data, indent=2, default=str).encode('utf-8'))
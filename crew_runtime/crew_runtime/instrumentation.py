@@ -0,0 +1,571 @@
+"""
+Per-call LLM and tool instrumentation shared by the crews
+
+Every LLM call made through an instrumented LLM and every tool call reported on
+the crewai event bus is recorded with its run, task, agent, model, token usage,
+latency, retries and cache status. Records are aggregated in memory for
+per-task p50/p95/p99 summaries and a Prometheus text-format endpoint, and
+appended to a JSONL file when CREW_METRICS_PATH is set.
+
+Environment:
+    CREW_METRICS_PATH: Append call records to this JSONL file (default: disabled)
+    CREW_METRICS_PORT: Serve Prometheus metrics on this port (default: disabled)
+"""
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import deque, defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Iterator, Callable
+
+from crewai.events import (
+    crewai_event_bus,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+
+try:
+    from litellm.integrations.custom_logger import CustomLogger
+except ImportError:  # pragma: no cover - only native providers are available
+    CustomLogger = object
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+MAX_SAMPLES = 10000
+MAX_RECORDS = 100000
+
+# Run whose calls are being recorded in the current context
+current_run: ContextVar[Optional[str]] = ContextVar("current_run", default=None)
+
+# Usage reported by the provider for the LLM call in progress
+_call_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("_call_usage", default=None)
+
+# Last task seen per thread, used for calls made without task context (e.g. output conversion)
+_thread_state = threading.local()
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q * len(ordered)) - 1))]
+
+
+def _get(usage: Any, *names: str) -> int:
+    """Read the first present token count from a usage dict or object"""
+    for name in names:
+        value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        if isinstance(value, (int, float)) and value:
+            return int(value)
+    return 0
+
+
+def normalize_usage(usage: Any) -> Dict[str, int]:
+    """
+    Normalize provider usage (OpenAI/LiteLLM, Anthropic or Gemini style) to token counts
+
+    Args:
+        usage: Usage dict or object reported by the provider
+
+    Returns:
+        Dictionary with prompt, completion, cached and cache write token counts
+    """
+    if not usage:
+        return {}
+    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": _get(usage, "prompt_tokens", "input_tokens", "prompt_token_count"),
+        "completion_tokens": _get(usage, "completion_tokens", "output_tokens", "candidates_token_count"),
+        "cached_prompt_tokens": _get(usage, "cache_read_input_tokens", "cached_prompt_tokens", "cached_tokens")
+        or (_get(details, "cached_tokens") if details else 0),
+        "cache_creation_tokens": _get(usage, "cache_creation_input_tokens"),
+    }
+
+
+def _add_usage(usage: Any, replace: bool = False):
+    """Attribute provider usage to the LLM call in progress"""
+    sink = _call_usage.get()
+    if sink is None:
+        return
+    normalized = normalize_usage(usage)
+    if replace:
+        sink.update(normalized)
+    else:
+        for key, value in normalized.items():
+            sink[key] = sink.get(key, 0) + value
+
+
+class _UsageCapture(CustomLogger):
+    """LiteLLM callback capturing the usage of the current call"""
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        usage = response_obj.get("usage") if isinstance(response_obj, dict) else getattr(response_obj, "usage", None)
+        # LiteLLM may report the same response more than once; the last report wins
+        _add_usage(usage, replace=True)
+
+
+def current_task() -> Optional[str]:
+    """Task of the last instrumented LLM call in this thread (output conversion runs after it)"""
+    return getattr(_thread_state, "task", None)
+
+
+def set_current_task(task: Optional[str], agent: Optional[str] = None):
+    """Attribute later calls without task context in this thread to a task (see current_task)"""
+    _thread_state.task, _thread_state.agent = task, agent
+
+
+def _task_name(task: Any) -> Optional[str]:
+    if task is None:
+        return None
+    return getattr(task, "name", None) or (getattr(task, "description", "") or "")[:60] or None
+
+
+class MetricsSink:
+    """Collects call records and serves aggregates"""
+
+    def __init__(self, path: Optional[str] = None, max_samples: int = MAX_SAMPLES):
+        """
+        Initialize the sink
+
+        Args:
+            path: JSONL file call records are appended to (None: in memory only)
+            max_samples: Latency samples kept per series for percentiles
+        """
+        self.path = Path(path) if path else None
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._file = None
+        self._records: deque = deque(maxlen=MAX_RECORDS)
+        self._counters: Dict[tuple, float] = defaultdict(float)
+        self._latencies: Dict[tuple, deque] = {}
+        self._latency_sums: Dict[tuple, List[float]] = defaultdict(lambda: [0.0, 0])
+        self._retries: Dict[tuple, int] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call listener with every record after it is stored"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Stop calling a listener"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @contextmanager
+    def run(self, run_id: str) -> Iterator[str]:
+        """Attribute the calls made inside the block to a run"""
+        token = current_run.set(run_id)
+        try:
+            yield run_id
+        finally:
+            current_run.reset(token)
+
+    def record(self, record: Dict[str, Any]):
+        """
+        Record one LLM or tool call
+
+        Args:
+            record: Call record with at least kind, task, status, start (epoch seconds)
+                and latency_s
+        """
+        record = {"ts": datetime.now(timezone.utc).isoformat(), "run_id": current_run.get(), **record}
+        kind, task = record["kind"], record.get("task") or "unknown"
+        name = record.get("model") if kind == "llm" else record.get("tool")
+
+        with self._lock:
+            self._records.append(record)
+            self._counters[(kind, "calls", task, name, record["status"])] += 1
+            for key in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens", "cache_creation_tokens"):
+                if record.get(key):
+                    self._counters[(kind, key, task, name, "")] += record[key]
+            if record.get("retries"):
+                self._counters[(kind, "retries", task, name, "")] += 1
+            if record.get("cache") == "hit":
+                self._counters[(kind, "cache_hits", task, name, "")] += 1
+            series = (kind, task, name)
+            self._latencies.setdefault(series, deque(maxlen=self.max_samples)).append(record["latency_s"])
+            sums = self._latency_sums[series]
+            sums[0] += record["latency_s"]
+            sums[1] += 1
+
+            if self.path:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(json.dumps(record, default=str) + "\n")
+                self._file.flush()
+
+        for listener in self._listeners:
+            listener(record)
+
+    def next_retry_count(self, key: tuple, failed: bool) -> int:
+        """Track consecutive failures of a call site and return the retry count of the current call"""
+        with self._lock:
+            retries = self._retries.get(key, 0)
+            self._retries[key] = retries + 1 if failed else 0
+        return retries
+
+    def records(self, run_id: Optional[str] = None, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return retained call records, optionally for one run or kind"""
+        with self._lock:
+            records = list(self._records)
+        return [
+            r for r in records
+            if (run_id is None or r["run_id"] == run_id) and (kind is None or r["kind"] == kind)
+        ]
+
+    def summary(self, run_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize calls per task
+
+        Args:
+            run_id: Only include calls of this run (default: all retained calls)
+
+        Returns:
+            Mapping of task name to call counts, token totals and latency percentiles
+        """
+        tasks: Dict[str, Dict[str, Any]] = {}
+        latencies: Dict[tuple, List[float]] = defaultdict(list)
+        for r in self.records(run_id):
+            task = r.get("task") or "unknown"
+            stats = tasks.setdefault(task, {
+                "llm_calls": 0, "tool_calls": 0, "errors": 0, "retries": 0, "cache_hits": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0,
+                "cache_creation_tokens": 0, "models": [],
+                "conversion_llm_calls": 0, "conversion_latency_s": 0.0, "local_repairs": 0,
+            })
+            if r["kind"] == "conversion":
+                # Outcome of converting the final answer; its LLM calls are recorded separately
+                stats["local_repairs"] += r.get("path") == "repaired"
+                stats["errors"] += r["status"] != "success"
+                continue
+            stats[f"{r['kind']}_calls"] += 1
+            if r["kind"] == "llm" and r.get("inferred_task"):
+                stats["conversion_llm_calls"] += 1
+                stats["conversion_latency_s"] += r["latency_s"]
+            stats["errors"] += r["status"] != "success"
+            stats["retries"] += r.get("retries", 0)
+            stats["cache_hits"] += r.get("cache") == "hit"
+            for key in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens", "cache_creation_tokens"):
+                stats[key] += r.get(key, 0)
+            if r.get("model") and r["model"] not in stats["models"]:
+                stats["models"].append(r["model"])
+            latencies[(task, r["kind"])].append(r["latency_s"])
+            if r["kind"] == "llm" and r["status"] == "success":
+                latencies[(task, f"llm_cache_{r.get('cache', 'miss')}")].append(r["latency_s"])
+
+        for (task, kind), values in latencies.items():
+            for q in QUANTILES:
+                tasks[task][f"{kind}_latency_p{int(q * 100)}_s"] = round(_percentile(values, q), 3)
+        for stats in tasks.values():
+            stats["total_tokens"] = stats["prompt_tokens"] + stats["completion_tokens"]
+            stats["conversion_latency_s"] = round(stats["conversion_latency_s"], 3)
+            stats["cached_prompt_ratio"] = (
+                round(stats["cached_prompt_tokens"] / stats["prompt_tokens"], 3) if stats["prompt_tokens"] else 0.0
+            )
+        return tasks
+
+    def cache_summary(self, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summarize prompt caching across all LLM calls
+
+        Only the calls of a streamed report task stream their response, so the
+        latency of a whole call stands in for time to first token. Calls differ in output length, so compare hit and miss
+        latency per task (summary) rather than across the run.
+
+        Args:
+            run_id: Only include calls of this run (default: all retained calls)
+
+        Returns:
+            Cached and written prompt tokens, the cached share of prompt tokens and
+            p50 LLM latency of calls with and without a cache hit
+        """
+        calls = [r for r in self.records(run_id, kind="llm") if r["status"] == "success"]
+        prompt_tokens = sum(r.get("prompt_tokens", 0) for r in calls)
+        cached = sum(r.get("cached_prompt_tokens", 0) for r in calls)
+        hits = [r["latency_s"] for r in calls if r.get("cache") == "hit"]
+        misses = [r["latency_s"] for r in calls if r.get("cache") != "hit"]
+        hit_p50, miss_p50 = _percentile(hits, 0.5), _percentile(misses, 0.5)
+        return {
+            "llm_calls": len(calls),
+            "cache_hits": len(hits),
+            "prompt_tokens": prompt_tokens,
+            "cached_prompt_tokens": cached,
+            "cache_creation_tokens": sum(r.get("cache_creation_tokens", 0) for r in calls),
+            "cached_prompt_ratio": round(cached / prompt_tokens, 3) if prompt_tokens else 0.0,
+            "hit_latency_p50_s": round(hit_p50, 3) if hit_p50 is not None else None,
+            "miss_latency_p50_s": round(miss_p50, 3) if miss_p50 is not None else None,
+        }
+
+    def task_token_usage(self, run_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Token usage per task, in the shape of the crews' TokenUsage models"""
+        return {
+            task: {
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"],
+                "total_tokens": stats["total_tokens"],
+                "model_name": ", ".join(stats["models"]) or None,
+            }
+            for task, stats in self.summary(run_id).items()
+            if stats["llm_calls"]
+        }
+
+    def print_summary(self, run_id: Optional[str] = None):
+        """Print the per-task summary"""
+        print("📈 Per-task LLM and tool metrics:")
+        for task, stats in self.summary(run_id).items():
+            print(
+                f"   {task}: {stats['llm_calls']} LLM calls "
+                f"(p50 {stats.get('llm_latency_p50_s', '-')}s, p95 {stats.get('llm_latency_p95_s', '-')}s), "
+                f"{stats['tool_calls']} tool calls, {stats['total_tokens']} tokens "
+                f"({stats['cached_prompt_tokens']} cached, {stats['cached_prompt_ratio']:.0%} of prompt), "
+                f"{stats['retries']} retries"
+                + (
+                    f", {stats['conversion_llm_calls']} conversion LLM calls (+{stats['conversion_latency_s']}s)"
+                    if stats["conversion_llm_calls"] else ""
+                )
+                + (f", {stats['local_repairs']} repaired locally" if stats["local_repairs"] else "")
+                + (
+                    f", cache hit p50 {stats['llm_cache_hit_latency_p50_s']}s vs "
+                    f"{stats['llm_cache_miss_latency_p50_s']}s on a miss"
+                    if "llm_cache_hit_latency_p50_s" in stats and "llm_cache_miss_latency_p50_s" in stats else ""
+                )
+            )
+        cache = self.cache_summary(run_id)
+        if cache["cache_hits"]:
+            print(
+                f"💾 Prompt cache: {cache['cached_prompt_ratio']:.0%} of {cache['prompt_tokens']} prompt tokens cached, "
+                f"{cache['cache_hits']}/{cache['llm_calls']} LLM calls hit"
+            )
+
+    def render_prometheus(self) -> str:
+        """Render the aggregates in the Prometheus text exposition format"""
+        def labels(**values) -> str:
+            items = ",".join(
+                f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                for k, v in values.items() if v not in (None, "")
+            )
+            return "{" + items + "}"
+
+        lines = []
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = {series: list(values) for series, values in self._latencies.items()}
+            sums = {series: list(values) for series, values in self._latency_sums.items()}
+
+        metrics: Dict[str, List[str]] = defaultdict(list)
+        for (kind, metric, task, name, status), value in sorted(counters.items(), key=str):
+            name_label = "model" if kind == "llm" else "tool"
+            metrics[f"crew_{kind}_{metric}_total"].append(
+                f"crew_{kind}_{metric}_total{labels(task=task, **{name_label: name}, status=status)} {value:g}"
+            )
+        for metric, samples in metrics.items():
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(samples)
+
+        for kind in ("llm", "tool"):
+            metric = f"crew_{kind}_latency_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            name_label = "model" if kind == "llm" else "tool"
+            for series, values in sorted(latencies.items(), key=str):
+                if series[0] != kind:
+                    continue
+                base = {"task": series[1], name_label: series[2]}
+                for q in QUANTILES:
+                    lines.append(f"{metric}{labels(**base, quantile=q)} {_percentile(values, q):.6f}")
+                total, count = sums[series]
+                lines.append(f"{metric}_sum{labels(**base)} {total:.6f}")
+                lines.append(f"{metric}_count{labels(**base)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve /metrics in the Prometheus text format from a background thread
+
+        Args:
+            port: Port to listen on
+            host: Interface to bind (default: localhost only)
+
+        Returns:
+            The running HTTP server
+        """
+        if self._server:
+            return self._server
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = sink.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self._server
+
+
+metrics = MetricsSink(path=os.getenv("CREW_METRICS_PATH") or None)
+if os.getenv("CREW_METRICS_PORT"):
+    metrics.serve(int(os.getenv("CREW_METRICS_PORT")))
+
+
+def instrument_llm(llm, sink: Optional[MetricsSink] = None):
+    """
+    Record every call made through an LLM instance
+
+    Args:
+        llm: crewai LLM (LiteLLM-backed or native provider), or None
+        sink: Metrics sink (default: the module-level sink)
+
+    Returns:
+        The same LLM instance
+    """
+    if llm is None or getattr(llm, "_crew_instrumented", False):
+        return llm
+    sink = sink or metrics
+    original_call = llm.call
+
+    if not getattr(llm, "is_litellm", False):
+        # Native providers report usage through this hook, once per API response
+        original_track = llm._track_token_usage_internal
+
+        def track_token_usage(usage_data):
+            _add_usage(usage_data)
+            return original_track(usage_data)
+
+        llm._track_token_usage_internal = track_token_usage
+
+        if hasattr(llm, "_extract_anthropic_token_usage"):
+            original_extract = llm._extract_anthropic_token_usage
+
+            def extract_anthropic_token_usage(response):
+                usage = original_extract(response)
+                raw = getattr(response, "usage", None)
+                for key in ("cache_read_input_tokens", "cache_creation_input_tokens"):
+                    usage[key] = getattr(raw, key, None) or 0
+                # input_tokens leaves out the prompt tokens read from or written to the cache
+                cached = usage["cache_read_input_tokens"] + usage["cache_creation_input_tokens"]
+                if cached and "input_tokens" in usage:
+                    usage["input_tokens"] += cached
+                    usage["total_tokens"] = usage["input_tokens"] + usage.get("output_tokens", 0)
+                usage["cached_prompt_tokens"] = usage["cache_read_input_tokens"]
+                return usage
+
+            llm._extract_anthropic_token_usage = extract_anthropic_token_usage
+
+    def call(*args, **kwargs):
+        task = _task_name(kwargs.get("from_task"))
+        agent = getattr(kwargs.get("from_agent"), "role", None)
+        inferred_task = not task
+        if task:
+            _thread_state.task, _thread_state.agent = task, agent
+        else:
+            task, agent = getattr(_thread_state, "task", None), agent or getattr(_thread_state, "agent", None)
+
+        if getattr(llm, "is_litellm", False):
+            kwargs["callbacks"] = [*(kwargs.get("callbacks") or []), _UsageCapture()]
+
+        usage: Dict[str, int] = {}
+        token = _call_usage.set(usage)
+        status, error = "success", None
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            return original_call(*args, **kwargs)
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            _call_usage.reset(token)
+            retries = sink.next_retry_count((current_run.get(), task, agent), failed=status != "success")
+            cached = usage.get("cached_prompt_tokens", 0)
+            sink.record({
+                "kind": "llm",
+                "task": task,
+                "agent": agent,
+                "model": llm.model,
+                "status": status,
+                "error": error,
+                "start": started_at,
+                "latency_s": round(latency, 4),
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "cached_prompt_tokens": cached,
+                "cache_creation_tokens": usage.get("cache_creation_tokens", 0),
+                "cache": "hit" if cached else "miss",
+                "retries": retries,
+                # Calls without task context come from output conversion and validation
+                "inferred_task": inferred_task,
+            })
+
+    llm.call = call
+    llm._crew_instrumented = True
+    return llm
+
+
+# Start times of tool calls in progress, used for the latency of failed calls
+_tool_starts: Dict[tuple, float] = {}
+
+
+def _tool_key(event) -> tuple:
+    return event.task_id, event.agent_id, event.tool_name
+
+
+def _on_tool_started(source, event: ToolUsageStartedEvent):
+    _tool_starts[_tool_key(event)] = event.timestamp.timestamp()
+
+
+def _on_tool_finished(source, event: ToolUsageFinishedEvent):
+    _tool_starts.pop(_tool_key(event), None)
+    metrics.record({
+        "kind": "tool",
+        "task": event.task_name,
+        "agent": event.agent_role,
+        "tool": event.tool_name,
+        "status": "success",
+        "error": None,
+        "start": event.started_at.timestamp(),
+        "latency_s": round((event.finished_at - event.started_at).total_seconds(), 4),
+        "cache": "hit" if event.from_cache else "miss",
+        "retries": max(0, (event.run_attempts or 1) - 1),
+    })
+
+
+def _on_tool_error(source, event: ToolUsageErrorEvent):
+    started = _tool_starts.pop(_tool_key(event), None)
+    metrics.record({
+        "kind": "tool",
+        "task": event.task_name,
+        "agent": event.agent_role,
+        "tool": event.tool_name,
+        "status": "error",
+        "error": str(event.error),
+        "start": started or event.timestamp.timestamp(),
+        "latency_s": round(event.timestamp.timestamp() - started, 4) if started else 0.0,
+        "cache": "miss",
+        "retries": max(0, (event.run_attempts or 1) - 1),
+    })
+
+
+crewai_event_bus.on(ToolUsageStartedEvent)(_on_tool_started)
+crewai_event_bus.on(ToolUsageFinishedEvent)(_on_tool_finished)
+crewai_event_bus.on(ToolUsageErrorEvent)(_on_tool_error)
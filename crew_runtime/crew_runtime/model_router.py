@@ -0,0 +1,277 @@
+"""
+Latency-aware routing, hedging and failover across the crew's LLM routes
+
+A ModelRouter takes over the `call` of every LLM route defined in the crew
+module (claude_base, claude, gemini, ...), so agents keep their configured LLM
+while each call is dispatched by policy:
+
+- The task's `routing` entry in tasks.yaml picks the preferred route and its
+  fallbacks; without one, the agent's own route is used with its equivalents.
+- Per-route latency and error rates are tracked live. After three consecutive
+  failures a route is taken out of rotation for a cooldown.
+- A call still running after the p95 of the primary route for that task gets a
+  hedged duplicate on the next healthy route; the first success wins. A running request cannot be
+  interrupted, so the loser is abandoned and its result discarded.
+- Throttling, server and connection errors fail over to the next route at once
+  instead of being retried on the failing one.
+
+Example tasks.yaml entry:
+    routing:
+      route: gemini_flash       # preferred route for this task
+      fallbacks: [claude_base]  # tried in order on outages, used for hedging
+      hedge: false              # default: true when a fallback exists
+"""
+import time
+import threading
+from collections import deque
+from contextlib import nullcontext
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Optional, Dict, Any, List, Tuple
+
+from crew_runtime.instrumentation import _percentile
+from crew_runtime.rate_limiter import limiter, is_throttled, is_transient
+
+
+MAX_SAMPLES = 200
+ERROR_WINDOW = 50
+FAILURE_THRESHOLD = 3
+COOLDOWN_S = 30.0
+# Hedging starts once a route has this many latency samples for the task
+MIN_HEDGE_SAMPLES = 10
+# Upper bound for the share of calls that get a hedged duplicate
+MAX_HEDGE_RATIO = 0.1
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether an error should move the call to another route"""
+    return is_throttled(error) or is_transient(error)
+
+
+def truncate_at_stop(text: str, stop: List[str]) -> str:
+    """Cut a completion at the earliest stop word, as the provider would have"""
+    positions = [pos for pos in (text.find(word) for word in stop) if pos != -1]
+    return text[:min(positions)].strip() if positions else text
+
+
+class RouteStats:
+    """Live latency and error tracking for one route; guarded by the router's lock"""
+
+    def __init__(self):
+        self.latencies: deque = deque(maxlen=MAX_SAMPLES)
+        # Output length differs per task, so hedging compares against the task's own latencies
+        self.task_latencies: Dict[Optional[str], deque] = {}
+        self.outcomes: deque = deque(maxlen=ERROR_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def success(self, latency_s: float, task_name: Optional[str] = None):
+        self.calls += 1
+        self.latencies.append(latency_s)
+        self.task_latencies.setdefault(task_name, deque(maxlen=MAX_SAMPLES)).append(latency_s)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+
+    def failure(self, outage: bool):
+        self.calls += 1
+        self.errors += 1
+        self.outcomes.append(False)
+        if outage:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= FAILURE_THRESHOLD:
+                self.down_until = time.monotonic() + COOLDOWN_S
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    @property
+    def error_rate(self) -> float:
+        return round(self.outcomes.count(False) / len(self.outcomes), 3) if self.outcomes else 0.0
+
+    def latency(self, q: float) -> Optional[float]:
+        return _percentile(list(self.latencies), q)
+
+    def hedge_delay(self, task_name: Optional[str]) -> Optional[float]:
+        """Seconds after which a call for a task deserves a hedge (its p95), once enough samples exist"""
+        samples = self.task_latencies.get(task_name) or ()
+        if len(samples) < MIN_HEDGE_SAMPLES or self.hedges > self.calls * MAX_HEDGE_RATIO:
+            return None
+        return _percentile(list(samples), 0.95)
+
+
+class ModelRouter:
+    """Dispatches the calls of a crew's LLM routes by per-task policy"""
+
+    def __init__(self, routes: Dict[str, Any], equivalents: Optional[Dict[str, List[str]]] = None):
+        """
+        Take over the call of every route
+
+        Args:
+            routes: Route name -> crewai LLM (None entries are skipped)
+            equivalents: Route name -> routes serving the same model, used as
+                fallbacks when a task has no routing policy
+        """
+        self.routes = {name: llm for name, llm in routes.items() if llm is not None}
+        self.equivalents = {
+            name: [other for other in others if other in self.routes]
+            for name, others in (equivalents or {}).items()
+        }
+        self.policies: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {name: RouteStats() for name in self.routes}
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+        # The route's own call (instrumented and rate limited) is what the router dispatches to
+        self._calls = {name: llm.call for name, llm in self.routes.items()}
+        for name, llm in self.routes.items():
+            llm.call = self._dispatcher(name)
+
+    def configure_tasks(self, tasks: List[Any], tasks_config: Dict[str, Dict[str, Any]]):
+        """
+        Load the `routing` entries of tasks.yaml for a crew's tasks
+
+        Entries are matched to tasks by name: CrewBase names a task after its
+        @task method, which must be the task's key in tasks.yaml.
+
+        Args:
+            tasks: The crew's Task objects
+            tasks_config: Parsed tasks.yaml
+
+        Raises:
+            ValueError: If a policy names an unknown route or belongs to no task
+        """
+        names = {task.name for task in tasks}
+        unmatched = sorted(key for key, config in tasks_config.items() if config.get("routing") and key not in names)
+        if unmatched:
+            raise ValueError(f"Routing policies for unknown task(s) {unmatched}; name each @task method after its tasks.yaml key")
+        for task in tasks:
+            policy = (tasks_config.get(task.name) or {}).get("routing")
+            if policy:
+                unknown = [r for r in [policy.get("route"), *policy.get("fallbacks", [])] if r and r not in self.routes]
+                if unknown:
+                    raise ValueError(f"Unknown route(s) {unknown} in routing policy of task {task.name}")
+                self.policies[task.name] = policy
+
+    def _candidates(self, default: str, task_name: Optional[str]) -> Tuple[List[str], bool]:
+        """Routes to try in order and whether hedging is allowed"""
+        policy = self.policies.get(task_name) or {}
+        primary = policy.get("route") or default
+        fallbacks = policy.get("fallbacks", self.equivalents.get(primary, []))
+        ordered = list(dict.fromkeys([primary, *fallbacks]))
+        with self._lock:
+            healthy = [name for name in ordered if self._stats[name].healthy]
+        # With every route down, keep trying them in order rather than failing outright
+        return healthy or ordered, policy.get("hedge", True)
+
+    def _call_route(self, name: str, source: Any, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Call one route and record its outcome"""
+        target = self.routes[name]
+        # crewai sets the ReAct stop words on the agent's LLM only. The route is shared by
+        # other agents and threads, so they are applied to this call's answer instead
+        stop = None
+        if target is not source and getattr(source, "stop", None) and not getattr(target, "stop", None):
+            stop = list(source.stop)
+        started_at = time.perf_counter()
+        try:
+            result = self._calls[name](*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self._stats[name].failure(outage=is_outage(e))
+            raise
+        with self._lock:
+            self._stats[name].success(time.perf_counter() - started_at, getattr(kwargs.get("from_task"), "name", None))
+        if stop and isinstance(result, str):
+            result = truncate_at_stop(result, stop)
+        return result
+
+    def _hedged(self, primary: str, backup: str, source: Any, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Run the primary route, adding a duplicate on the backup once it exceeds its p95"""
+        with self._lock:
+            delay = self._stats[primary].hedge_delay(getattr(kwargs.get("from_task"), "name", None))
+        futures: Dict[Future, str] = {
+            self._executor.submit(copy_context().run, self._call_route, primary, source, args, kwargs): primary
+        }
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            with self._lock:
+                self._stats[primary].hedges += 1
+            futures[self._executor.submit(copy_context().run, self._call_route, backup, source, args, kwargs)] = backup
+
+        pending, error = set(futures), None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if futures[future] == backup:
+                        with self._lock:
+                            self._stats[primary].hedge_wins += 1
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def _dispatcher(self, default: str):
+        def call(*args, **kwargs):
+            task_name = getattr(kwargs.get("from_task"), "name", None)
+            candidates, hedge = self._candidates(default, task_name)
+            source = self.routes[default]
+            error = None
+            for index, name in enumerate(candidates):
+                backup = candidates[index + 1] if index + 1 < len(candidates) else None
+                with self._lock:
+                    delay = self._stats[name].hedge_delay(task_name)
+                try:
+                    # Fail over instead of waiting out retries on a struggling route
+                    with limiter.max_retries(0) if backup else nullcontext():
+                        # Only calls made for a task are hedged; conversion calls run inline
+                        if hedge and backup and delay is not None and task_name:
+                            return self._hedged(name, backup, source, args, kwargs)
+                        return self._call_route(name, source, args, kwargs)
+                except Exception as e:
+                    if not is_outage(e) or backup is None:
+                        raise
+                    error = e
+                    with self._lock:
+                        self._stats[name].failovers += 1
+                    print(f"🔀 Route {name} failed ({type(e).__name__}), failing over to {backup}")
+            raise error
+        return call
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, error rate, latency percentiles, hedges and failovers per route"""
+        with self._lock:
+            return {
+                name: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "error_rate": s.error_rate,
+                    "latency_p50_s": round(s.latency(0.5), 3) if s.latencies else None,
+                    "latency_p95_s": round(s.latency(0.95), 3) if s.latencies else None,
+                    "hedges": s.hedges,
+                    "hedge_wins": s.hedge_wins,
+                    "failovers": s.failovers,
+                    "healthy": s.healthy,
+                }
+                for name, s in self._stats.items()
+                if s.calls
+            }
+
+    def print_stats(self):
+        """Print the stats of every route that has been called"""
+        stats = self.stats()
+        if not stats:
+            return
+        print("🔀 Model routes:")
+        for name, s in stats.items():
+            print(
+                f"   {name}: {s['calls']} calls ({s['error_rate']:.0%} errors), "
+                f"p50 {s['latency_p50_s']}s, p95 {s['latency_p95_s']}s, "
+                f"{s['hedges']} hedges ({s['hedge_wins']} won), {s['failovers']} failovers"
+                f"{'' if s['healthy'] else ', down'}"
+            )
@@ -0,0 +1,10 @@
+"""
+Values shared by the output models of the crews
+
+Each crew defines its own pydantic output models in crew_agent/output_models.py;
+the runtime only relies on the conventions below.
+"""
+
+# Value of a text field the agent could not find, requested in the task prompts.
+# Budget placeholders are filled with it and the company store treats it as missing
+NOT_AVAILABLE = "Not available"
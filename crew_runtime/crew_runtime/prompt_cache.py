@@ -0,0 +1,173 @@
+"""
+Stable prompt layout and Anthropic prompt caching for the crew's LLM routes
+
+Agent system prompts (role, goal, backstory and tools) and task instructions are
+the same on every run; only a few inputs change (the resume, the current date,
+the calendar). Task descriptions in tasks.yaml wrap those inputs in <dynamic>
+tags. Before a call is sent, the tagged sections are moved to the end of the task
+prompt, so everything in front of them, including the context of earlier tasks that
+crewai appends after the description, forms a prefix that repeats from run to run.
+
+For Claude routes (the native Anthropic provider, or Anthropic models through
+OpenRouter) the prefix is marked with cache_control breakpoints:
+- the system prompt (tools, role, goal and backstory)
+- the static part of each task prompt that has dynamic sections
+- the end of the conversation, so every ReAct iteration reuses the previous one
+Other routes get the same layout as plain text; providers that cache prompt
+prefixes automatically (OpenAI, Gemini) benefit from it as well.
+
+Environment:
+    CREW_PROMPT_CACHE: Set to false to send prompts without cache_control breakpoints
+"""
+import os
+import re
+from typing import Optional, Dict, Any, List, Tuple
+
+from crewai.utilities.i18n import I18N
+
+
+DYNAMIC_PATTERN = re.compile(r"\s*<dynamic>\s*(.*?)\s*</dynamic>\s*", re.S)
+CACHE_CONTROL = {"type": "ephemeral"}
+# Anthropic accepts at most four breakpoints per request
+MAX_BREAKPOINTS = 4
+
+
+def _task_tail() -> str:
+    """Closing instructions crewai appends after the task prompt in the agent's message"""
+    template = I18N().slice("task")
+    return template.split("{input}", 1)[1] if "{input}" in template else ""
+
+
+TASK_TAIL = _task_tail()
+
+
+def caching_enabled() -> bool:
+    return os.getenv("CREW_PROMPT_CACHE", "true").lower() not in ("0", "false", "no")
+
+
+def is_claude(llm: Any) -> bool:
+    """Whether an LLM serves an Anthropic model that honours cache_control"""
+    return getattr(llm, "provider", None) == "anthropic" or "claude" in (getattr(llm, "model", "") or "").lower()
+
+
+def layout(text: str) -> Tuple[str, str]:
+    """
+    Split a prompt into its static prefix and everything that varies between runs
+
+    Args:
+        text: Message content as built by crewai
+
+    Returns:
+        The static prefix and the remainder (the <dynamic> sections followed by
+        crewai's closing instructions); the remainder is empty without dynamic sections
+    """
+    sections = [match.group(1) for match in DYNAMIC_PATTERN.finditer(text)]
+    if not sections:
+        return text, ""
+    static = DYNAMIC_PATTERN.sub("\n\n", text)
+    tail = TASK_TAIL if TASK_TAIL and static.endswith(TASK_TAIL) else ""
+    static = static[:len(static) - len(tail)].strip()
+    return f"{static}\n\n", "\n\n".join(sections) + tail
+
+
+def _block(text: str, cached: bool = False) -> Dict[str, Any]:
+    block = {"type": "text", "text": text}
+    if cached:
+        block["cache_control"] = dict(CACHE_CONTROL)
+    return block
+
+
+def arrange(messages: Any, mark: bool = False, mark_system: bool = True) -> Any:
+    """
+    Lay out messages with the dynamic sections last, optionally marking cache breakpoints
+
+    Args:
+        messages: Messages passed to LLM.call (a string or a list of message dicts)
+        mark: Turn marked messages into content blocks with cache_control
+        mark_system: Mark the system message too (the native Anthropic provider
+            sends it as a separate parameter, marked in its request instead)
+
+    Returns:
+        New messages; the caller's messages are left untouched
+    """
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    if not isinstance(messages, list):
+        return messages
+
+    arranged: List[Dict[str, Any]] = []
+    breakpoints = 0 if mark_system else 1
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else None
+        if not isinstance(content, str):
+            arranged.append(message)
+            continue
+        static, dynamic = layout(content)
+        if not mark or not static.strip() or breakpoints >= MAX_BREAKPOINTS - 1:
+            arranged.append({**message, "content": static + dynamic})
+        elif message.get("role") == "system":
+            if mark_system:
+                breakpoints += 1
+                arranged.append({**message, "content": [_block(static + dynamic, cached=True)]})
+            else:
+                arranged.append({**message, "content": static + dynamic})
+        elif dynamic:
+            breakpoints += 1
+            arranged.append({**message, "content": [_block(static, cached=True), _block(dynamic)]})
+        else:
+            arranged.append({**message, "content": static})
+
+    # The end of the conversation: the next ReAct iteration starts with all of it
+    last = arranged[-1] if arranged else None
+    if mark and last and last.get("role") != "system" and breakpoints < MAX_BREAKPOINTS:
+        content = last.get("content")
+        if isinstance(content, str) and content.strip():
+            arranged[-1] = {**last, "content": [_block(content, cached=True)]}
+        elif isinstance(content, list) and content and isinstance(content[-1], dict):
+            arranged[-1] = {**last, "content": [*content[:-1], {**content[-1], "cache_control": dict(CACHE_CONTROL)}]}
+    return arranged
+
+
+def cache_prompts(llm, enabled: Optional[bool] = None):
+    """
+    Send an LLM's prompts with a stable prefix, marked for caching on Claude routes
+
+    Apply before instrument_llm and limit_llm so they see the caller's messages.
+
+    Args:
+        llm: crewai LLM (LiteLLM-backed or native provider), or None
+        enabled: Mark cache breakpoints (default: CREW_PROMPT_CACHE)
+
+    Returns:
+        The same LLM instance
+    """
+    if llm is None or getattr(llm, "_crew_prompt_cache", False):
+        return llm
+    mark = (caching_enabled() if enabled is None else enabled) and is_claude(llm)
+    native = not getattr(llm, "is_litellm", False)
+    original_call = llm.call
+
+    if mark and native and hasattr(llm, "_prepare_completion_params"):
+        # The native provider moves the system message into the `system` parameter
+        original_prepare = llm._prepare_completion_params
+
+        def prepare_completion_params(*args, **kwargs):
+            params = original_prepare(*args, **kwargs)
+            if isinstance(params.get("system"), str) and params["system"].strip():
+                params["system"] = [_block(params["system"], cached=True)]
+            return params
+
+        llm._prepare_completion_params = prepare_completion_params
+
+    def call(*args, **kwargs):
+        # LiteLLM hands structured-output calls to instructor, which expects plain text content
+        marked = mark and (native or not kwargs.get("response_model"))
+        if "messages" in kwargs:
+            kwargs["messages"] = arrange(kwargs["messages"], marked, mark_system=not native)
+        elif args:
+            args = (arrange(args[0], marked, mark_system=not native), *args[1:])
+        return original_call(*args, **kwargs)
+
+    llm.call = call
+    llm._crew_prompt_cache = True
+    return llm
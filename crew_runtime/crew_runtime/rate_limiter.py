@@ -0,0 +1,599 @@
+"""
+Process-wide rate limiting and adaptive concurrency for LLM and tool calls
+
+Every provider and API key gets a KeyLimiter with two token buckets (requests
+per minute and tokens per minute) and an AIMD concurrency limit. Callers wait
+in a priority queue, so interactive runs are admitted before batch jobs.
+
+A 429 (or 529/503 overloaded) halves the concurrency limit of the key and
+pauses it for the Retry-After period (exponential backoff without one); the
+call is then retried through the queue, so concurrent crews back off together
+instead of retrying blindly. Latency far above the recent baseline shrinks the
+limit gently, and successful calls grow it by about one per limit's worth of
+calls.
+
+Environment:
+    CREW_RATE_LIMITS: JSON overrides per provider, e.g.
+        {"anthropic": {"rpm": 50, "tpm": 30000, "max_concurrency": 4}};
+        token limits (tpm) are off unless set here
+    CREW_RATE_LIMIT_DISABLED: Set to true to bypass the limiter
+"""
+import os
+import re
+import json
+import time
+import heapq
+import random
+import hashlib
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Iterator, Callable
+
+from crew_runtime.instrumentation import metrics
+
+
+# Lower values are admitted first
+PRIORITIES = {"interactive": 0, "batch": 10}
+
+# Conservative defaults; raise them to match the tier of your keys. Token limits
+# differ too much between tiers to guess, so tpm is off unless CREW_RATE_LIMITS sets it
+DEFAULT_LIMITS: Dict[str, Dict[str, Any]] = {
+    "anthropic": {"rpm": 50, "tpm": None, "max_concurrency": 8},
+    "openrouter": {"rpm": 120, "tpm": None, "max_concurrency": 16},
+    "serper": {"rpm": 300, "tpm": None, "max_concurrency": 8},
+    "parallel": {"rpm": 300, "tpm": None, "max_concurrency": 8},
+    "composio": {"rpm": 300, "tpm": None, "max_concurrency": 16},
+}
+FALLBACK_LIMITS = {"rpm": 60, "tpm": None, "max_concurrency": 8}
+
+# Completion tokens reserved per LLM call until the provider reports usage
+COMPLETION_TOKEN_ESTIMATE = 512
+MAX_RETRIES = 4
+MAX_BACKOFF_S = 60.0
+
+# Priority of the calls made in the current context
+current_priority: ContextVar[str] = ContextVar("current_priority", default="interactive")
+
+# Retries of throttled or failed calls in the current context (None: the key's default)
+current_max_retries: ContextVar[Optional[int]] = ContextVar("current_max_retries", default=None)
+
+# Token usage reported by the instrumented LLM call in progress
+_llm_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("_llm_usage", default=None)
+
+_THROTTLE_STATUSES = {429, 503, 529}
+_THROTTLE_PATTERN = re.compile(r"\b(429|529)\b|rate.?limit|overloaded", re.IGNORECASE)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of an error or of the errors it was raised from"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return status
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def is_throttled(error: BaseException) -> bool:
+    """Whether an error means the provider is rate limiting or overloaded"""
+    status = _status_code(error)
+    if status is not None:
+        return status in _THROTTLE_STATUSES
+    return bool(_THROTTLE_PATTERN.search(str(error)))
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error is a server or connection failure worth retrying"""
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status == 408
+    name = type(error).__name__.lower()
+    return isinstance(error, (ConnectionError, TimeoutError)) or "connection" in name or "timeout" in name
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds to wait from the Retry-After header of an error's response, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def _result_throttled(result: Any) -> bool:
+    """Whether a tool reported a rate limit in its result instead of raising"""
+    text = result.get("error") if isinstance(result, dict) else result
+    if not isinstance(text, str) or not text:
+        return False
+    if isinstance(result, str) and "error" not in text[:200].lower():
+        return False
+    return bool(re.search(r"\b(429|529)\b", text[:200]))
+
+
+def estimate_tokens(messages: Any) -> int:
+    """Rough prompt size (4 characters per token) of a string or message list"""
+    if isinstance(messages, str):
+        return len(messages) // 4
+    total = 0
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else message
+        total += len(content if isinstance(content, str) else json.dumps(content, default=str)) // 4
+    return total
+
+
+class TokenBucket:
+    """Refills continuously at a per-minute rate; not thread-safe on its own"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize a full bucket
+
+        Args:
+            per_minute: Tokens added per minute
+            capacity: Maximum burst (default: one minute's worth)
+        """
+        self.rate = per_minute / 60
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float, now: float):
+        """Take tokens; a negative balance is paid back before the next caller"""
+        self._refill(now)
+        self.tokens -= amount
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease concurrency limit"""
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        decrease_factor: float = 0.5,
+        latency_factor: float = 3.0
+    ):
+        """
+        Initialize the controller at its maximum limit
+
+        Args:
+            max_limit: Highest allowed concurrency
+            min_limit: Lowest allowed concurrency
+            decrease_factor: Multiplier applied on throttling
+            latency_factor: Latency above this multiple of the baseline shrinks the limit
+        """
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.limit = float(max_limit)
+        self.baseline_latency: Optional[float] = None
+
+    @property
+    def allowed(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def on_success(self, latency_s: float):
+        if self.baseline_latency and latency_s > self.baseline_latency * self.latency_factor:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        if self.baseline_latency is None:
+            self.baseline_latency = latency_s
+        else:
+            self.baseline_latency = 0.9 * self.baseline_latency + 0.1 * latency_s
+
+    def on_throttled(self):
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+
+class KeyLimiter:
+    """Admission control for one provider and API key"""
+
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        latency_factor: float = 3.0,
+        max_retries: int = MAX_RETRIES
+    ):
+        """
+        Initialize the limiter
+
+        Args:
+            name: provider:key label used in stats
+            rpm: Requests per minute (None: unlimited)
+            tpm: Tokens per minute (None: unlimited)
+            max_concurrency: Upper bound for the AIMD concurrency limit
+            min_concurrency: Lower bound for the AIMD concurrency limit
+            latency_factor: Latency multiple of the baseline treated as congestion
+            max_retries: Retries of a throttled or failed call
+        """
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AIMDController(max_concurrency, min_concurrency, latency_factor=latency_factor)
+        self.max_retries = max_retries
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._cond = threading.Condition()
+        self._waiters: List[tuple] = []
+        self._seq = itertools.count()
+        self._stats = {
+            "calls": 0, "throttled": 0, "retries": 0, "errors": 0,
+            "queue_wait_s": 0.0, "max_queue_wait_s": 0.0, "max_queue_length": 0,
+        }
+
+    def acquire(self, tokens: int = 0, priority: Optional[str] = None) -> float:
+        """
+        Block until the call may start
+
+        Args:
+            tokens: Tokens the call is expected to use
+            priority: Name in PRIORITIES (default: the context's priority)
+
+        Returns:
+            Seconds spent waiting
+        """
+        entry = (PRIORITIES.get(priority or current_priority.get(), 0), next(self._seq))
+        started_at = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            self._stats["max_queue_length"] = max(self._stats["max_queue_length"], len(self._waiters))
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] == entry and self.in_flight < self.concurrency.allowed:
+                        now = time.monotonic()
+                        timeout = max(
+                            self.paused_until - now,
+                            self.requests.wait_time(1, now) if self.requests else 0.0,
+                            self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+                        )
+                        if timeout <= 0:
+                            break
+                    self._cond.wait(timeout)
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiters)
+            now = time.monotonic()
+            if self.requests:
+                self.requests.consume(1, now)
+            if self.tokens:
+                self.tokens.consume(tokens, now)
+            self.in_flight += 1
+            waited = now - started_at
+            self._stats["calls"] += 1
+            self._stats["queue_wait_s"] += waited
+            self._stats["max_queue_wait_s"] = max(self._stats["max_queue_wait_s"], waited)
+            self._cond.notify_all()
+        return waited
+
+    def release(
+        self,
+        latency_s: Optional[float] = None,
+        reserved_tokens: int = 0,
+        used_tokens: Optional[int] = None,
+        throttled: bool = False,
+        failed: bool = False,
+        pause_s: Optional[float] = None
+    ):
+        """
+        Finish a call and feed its outcome to the controller
+
+        Args:
+            latency_s: Duration of a successful call
+            reserved_tokens: Tokens taken in acquire
+            used_tokens: Tokens actually used, when known
+            throttled: The provider rate limited the call
+            failed: The call failed for another reason
+            pause_s: Retry-After reported by the provider
+        """
+        with self._cond:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if self.tokens and used_tokens is not None:
+                self.tokens.consume(used_tokens - reserved_tokens, now)
+            if throttled:
+                self._stats["throttled"] += 1
+                self._consecutive_throttles += 1
+                self.concurrency.on_throttled()
+                if pause_s is None:
+                    pause_s = min(MAX_BACKOFF_S, 2 ** self._consecutive_throttles) * random.uniform(0.5, 1.0)
+                self.paused_until = max(self.paused_until, now + pause_s)
+            elif failed:
+                self._stats["errors"] += 1
+            elif latency_s is not None:
+                self._consecutive_throttles = 0
+                self.concurrency.on_success(latency_s)
+            self._cond.notify_all()
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        tokens: int = 0,
+        used_tokens: Optional[Callable[[], Optional[int]]] = None,
+        result_throttled: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Run fn under the limits, retrying throttled and transient failures through the queue
+
+        Args:
+            fn: Call to make
+            tokens: Tokens the call is expected to use
+            used_tokens: Returns the tokens the last attempt actually used
+            result_throttled: Detects rate limits reported in a result instead of raised
+
+        Returns:
+            The result of fn
+        """
+        max_retries = current_max_retries.get()
+        max_retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(max_retries + 1):
+            if attempt:
+                with self._cond:
+                    self._stats["retries"] += 1
+            self.acquire(tokens)
+            started_at = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = is_throttled(e)
+                retry = (throttled or is_transient(e)) and attempt < max_retries
+                self.release(
+                    reserved_tokens=tokens,
+                    used_tokens=used_tokens() if used_tokens else None,
+                    throttled=throttled,
+                    failed=not throttled,
+                    pause_s=retry_after(e),
+                )
+                if not retry:
+                    raise
+                if not throttled:
+                    time.sleep(min(MAX_BACKOFF_S, 2 ** attempt) * random.uniform(0.5, 1.0))
+                continue
+
+            throttled = bool(result_throttled and result_throttled(result))
+            self.release(
+                latency_s=time.perf_counter() - started_at,
+                reserved_tokens=tokens,
+                used_tokens=used_tokens() if used_tokens else None,
+                throttled=throttled,
+            )
+            if not throttled or attempt == max_retries:
+                return result
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["concurrency_limit"] = round(self.concurrency.limit, 2)
+            stats["in_flight"] = self.in_flight
+            stats["queued"] = len(self._waiters)
+        stats["queue_wait_s"] = round(stats["queue_wait_s"], 3)
+        stats["max_queue_wait_s"] = round(stats["max_queue_wait_s"], 3)
+        return stats
+
+
+class RateLimiter:
+    """Registry of KeyLimiters shared by every crew in the process"""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None, enabled: bool = True):
+        """
+        Initialize the registry
+
+        Args:
+            limits: Per-provider overrides of DEFAULT_LIMITS
+            enabled: When False, calls run without any limiting
+        """
+        self.limits = {provider: dict(values) for provider, values in DEFAULT_LIMITS.items()}
+        for provider, values in (limits or {}).items():
+            self.limits.setdefault(provider, dict(FALLBACK_LIMITS)).update(values)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._limiters: Dict[tuple, KeyLimiter] = {}
+
+    def for_key(self, provider: str, api_key: Optional[str] = None) -> KeyLimiter:
+        """Limiter for a provider and API key, created on first use"""
+        key_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8] if api_key else "default"
+        with self._lock:
+            limiter = self._limiters.get((provider, key_id))
+            if limiter is None:
+                limiter = KeyLimiter(f"{provider}:{key_id}", **self.limits.get(provider, FALLBACK_LIMITS))
+                self._limiters[(provider, key_id)] = limiter
+        return limiter
+
+    @contextmanager
+    def priority(self, name: str) -> Iterator[str]:
+        """Queue the calls made inside the block with this priority"""
+        if name not in PRIORITIES:
+            raise ValueError(f"Unknown priority {name!r}, expected one of {sorted(PRIORITIES)}")
+        token = current_priority.set(name)
+        try:
+            yield name
+        finally:
+            current_priority.reset(token)
+
+    @contextmanager
+    def max_retries(self, retries: int) -> Iterator[int]:
+        """Override the retries of the calls made inside the block (e.g. when the caller can fail over)"""
+        token = current_max_retries.set(retries)
+        try:
+            yield retries
+        finally:
+            current_max_retries.reset(token)
+
+    def call(self, provider: str, api_key: Optional[str], fn: Callable[[], Any], **kwargs) -> Any:
+        """Run fn under the limits of a provider and key (see KeyLimiter.call)"""
+        if not self.enabled:
+            return fn()
+        return self.for_key(provider, api_key).call(fn, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Counters, queue waits and current concurrency limit per provider:key"""
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.name: limiter.stats() for limiter in limiters}
+
+    def print_stats(self):
+        """Print the stats of every key that has been used"""
+        stats = self.stats()
+        if not stats:
+            return
+        print("🚦 Rate limits:")
+        for name, s in stats.items():
+            print(
+                f"   {name}: {s['calls']} calls, {s['throttled']} throttled, {s['retries']} retries, "
+                f"waited {s['queue_wait_s']}s (max {s['max_queue_wait_s']}s), "
+                f"concurrency limit {s['concurrency_limit']}"
+            )
+
+
+limiter = RateLimiter(
+    limits=json.loads(os.getenv("CREW_RATE_LIMITS") or "{}"),
+    enabled=os.getenv("CREW_RATE_LIMIT_DISABLED", "").lower() not in ("1", "true", "yes"),
+)
+
+
+def _capture_llm_usage(record: Dict[str, Any]):
+    """Metrics listener handing the usage of an instrumented LLM call to the limiter"""
+    sink = _llm_usage.get()
+    if sink is not None and record["kind"] == "llm":
+        sink["total_tokens"] = record.get("prompt_tokens", 0) + record.get("completion_tokens", 0)
+
+
+metrics.add_listener(_capture_llm_usage)
+
+
+def _llm_provider(llm) -> str:
+    """Provider whose limits apply to an LLM (the route prefix for LiteLLM models)"""
+    model = getattr(llm, "model", "") or ""
+    if getattr(llm, "is_litellm", False) and "/" in model:
+        return model.split("/", 1)[0]
+    return getattr(llm, "provider", None) or "unknown"
+
+
+def limit_llm(llm, rate_limiter: Optional[RateLimiter] = None):
+    """
+    Route every call of an LLM through the rate limiter
+
+    Apply it on top of instrument_llm so the recorded latency excludes queueing
+    and the limiter learns the actual token usage of each call.
+
+    Args:
+        llm: crewai LLM, or None
+        rate_limiter: Limiter registry (default: the module-level limiter)
+
+    Returns:
+        The same LLM instance
+    """
+    if llm is None or getattr(llm, "_crew_rate_limited", False):
+        return llm
+    rate_limiter = rate_limiter or limiter
+    provider = _llm_provider(llm)
+    original_call = llm.call
+
+    def call(*args, **kwargs):
+        messages = args[0] if args else kwargs.get("messages")
+        usage: Dict[str, int] = {}
+
+        def attempt():
+            usage.clear()
+            token = _llm_usage.set(usage)
+            try:
+                return original_call(*args, **kwargs)
+            finally:
+                _llm_usage.reset(token)
+
+        return rate_limiter.call(
+            provider,
+            getattr(llm, "api_key", None),
+            attempt,
+            tokens=estimate_tokens(messages) + COMPLETION_TOKEN_ESTIMATE,
+            used_tokens=lambda: usage.get("total_tokens"),
+        )
+
+    llm.call = call
+    llm._crew_rate_limited = True
+    return llm
+
+
+def limit_tool(tool, provider: str, api_key: Optional[str] = None, rate_limiter: Optional[RateLimiter] = None):
+    """
+    Route every run of a crewai tool through the rate limiter
+
+    Must be applied before the tool is handed to an agent, which binds its _run.
+
+    Args:
+        tool: crewai BaseTool
+        provider: Provider whose limits apply
+        api_key: Key the tool authenticates with
+        rate_limiter: Limiter registry (default: the module-level limiter)
+
+    Returns:
+        The same tool instance
+    """
+    rate_limiter = rate_limiter or limiter
+    original_run = tool._run
+
+    def run(*args, **kwargs):
+        return rate_limiter.call(
+            provider, api_key, lambda: original_run(*args, **kwargs), result_throttled=_result_throttled
+        )
+
+    # BaseTool is a pydantic model; bypass its field validation
+    object.__setattr__(tool, "_run", run)
+    return tool
+
+
+def limit_toolset(toolset, provider: str = "composio", api_key: Optional[str] = None, rate_limiter: Optional[RateLimiter] = None):
+    """
+    Route every action a Composio toolset executes through the rate limiter
+
+    Covers the agent tools built from the toolset as well as direct execute_action calls.
+
+    Args:
+        toolset: ComposioToolSet
+        provider: Provider whose limits apply
+        api_key: Composio API key
+        rate_limiter: Limiter registry (default: the module-level limiter)
+
+    Returns:
+        The same toolset
+    """
+    rate_limiter = rate_limiter or limiter
+    original_execute = toolset.execute_action
+
+    def execute_action(*args, **kwargs):
+        return rate_limiter.call(
+            provider, api_key, lambda: original_execute(*args, **kwargs), result_throttled=_result_throttled
+        )
+
+    toolset.execute_action = execute_action
+    return toolset
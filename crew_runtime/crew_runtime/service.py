@@ -0,0 +1,391 @@
+"""
+Long-running crew service with warm clients, a bounded job queue and a worker pool
+
+A one-shot app pays for interpreter start-up, agentops init, LLM client
+construction, Composio tool loading and YAML parsing on every run. CrewService
+does all of that once and then serves crew runs over a small local HTTP API:
+
+    POST /jobs                   {"crew": "...", "inputs": {...}, "priority": "interactive"}
+                                 -> 202 {"job_id": "...", "status": "queued"}
+    GET  /jobs/<job_id>          status, queue wait and run time
+    GET  /jobs/<job_id>/result   the result once the job has finished; ?wait=<seconds>
+                                 holds the request until then (202 while still pending)
+    GET  /health                 workers, queue depth and latency percentiles
+
+Submissions go into a bounded queue. When it is full the service answers 503
+with Retry-After rather than accepting work it cannot start in time. Workers
+run the crews in a thread pool sharing the warm clients and the process-wide
+rate limiter (the default; crew runs mostly wait on the network), or in a pool
+of processes with one warm interpreter per core. In process mode, rate limits
+and metrics are enforced and recorded per process.
+
+Finished jobs are kept in memory for their status and result endpoints; the
+oldest are dropped beyond max_finished_jobs.
+"""
+import copy
+import json
+import math
+import time
+import uuid
+import asyncio
+import threading
+import multiprocessing
+from pathlib import Path
+from http import HTTPStatus
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from crew_runtime.instrumentation import _percentile
+from crew_runtime.rate_limiter import limiter, PRIORITIES
+
+
+# A runner takes the job inputs and the job ID (used as the run ID) and returns a JSON-serializable result
+CrewRunner = Callable[[Dict[str, Any], str], Any]
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_WAIT_S = 300.0
+LATENCY_SAMPLES = 1000
+
+
+def cache_configs(crew_class: type) -> type:
+    """
+    Parse the YAML configs of a CrewBase class once instead of on every instantiation
+
+    Configs are re-read when the file changes. Every crew gets its own copy,
+    since CrewBase writes resolved tools, callbacks and guardrails into it.
+
+    Args:
+        crew_class: A class decorated with @CrewBase
+
+    Returns:
+        The same class
+    """
+    load_yaml = crew_class.load_yaml
+    cache: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    lock = threading.Lock()
+
+    def cached_load_yaml(config_path: Path) -> Dict[str, Any]:
+        # A missing file raises FileNotFoundError, which CrewBase handles
+        key = (str(config_path), Path(config_path).stat().st_mtime_ns)
+        with lock:
+            config = cache.get(key)
+        if config is None:
+            config = load_yaml(config_path)
+            with lock:
+                cache[key] = config
+        return copy.deepcopy(config)
+
+    crew_class.load_yaml = staticmethod(cached_load_yaml)
+    return crew_class
+
+
+def _run_job(runner: CrewRunner, inputs: Dict[str, Any], job_id: str, priority: str) -> Any:
+    """Run one job in a worker thread or process"""
+    with limiter.priority(priority):
+        return runner(inputs, job_id)
+
+
+class Job:
+    """A submitted crew run"""
+
+    def __init__(self, crew: str, inputs: Dict[str, Any], priority: str):
+        self.job_id = str(uuid.uuid4())
+        self.crew = crew
+        self.inputs = inputs
+        self.priority = priority
+        self.status = "queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.done = asyncio.Event()
+
+    def to_dict(self, with_result: bool = False) -> Dict[str, Any]:
+        record = {
+            "job_id": self.job_id,
+            "crew": self.crew,
+            "status": self.status,
+            "priority": self.priority,
+            "submitted_at": self.submitted_at,
+            "queue_wait_s": round((self.started_at or time.time()) - self.submitted_at, 3),
+            "run_s": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            "error": self.error,
+        }
+        if with_result:
+            record["result"] = self.result
+        return record
+
+
+class CrewService:
+    """Serves crew runs from warm workers over a local HTTP API"""
+
+    def __init__(
+        self,
+        runners: Dict[str, CrewRunner],
+        workers: int = 4,
+        queue_size: int = 64,
+        processes: bool = False,
+        warmup: Optional[Callable[[], None]] = None,
+        max_finished_jobs: int = 1000
+    ):
+        """
+        Initialize the service
+
+        Args:
+            runners: Crew name -> runner; in process mode runners and warmup must be
+                module-level functions, so they can be sent to the worker processes
+            workers: Jobs running at the same time
+            queue_size: Jobs waiting for a worker before submissions are rejected
+            processes: Run every worker in its own process instead of a thread
+            warmup: Called once per worker process (once in thread mode) before
+                serving, e.g. to build a crew so its clients and configs are loaded
+            max_finished_jobs: Finished jobs kept for the status and result endpoints
+        """
+        self.runners = runners
+        self.workers = workers
+        self.queue_size = queue_size
+        self.processes = processes
+        self.warmup = warmup
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.counts = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+        self.latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.queue_waits: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.started_at = time.time()
+        self.warmup_s: Optional[float] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[Executor] = None
+        self._running = 0
+
+    def _create_executor(self) -> Executor:
+        if self.processes:
+            # spawn: forking would copy the limiter and client threads in an unknown state
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.warmup,
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crew-service")
+
+    def _warm_up(self):
+        started_at = time.perf_counter()
+        if self.processes:
+            # Start and warm every process now (the pool adds a process while none is
+            # idle), so the first jobs do not pay for interpreter start-up
+            list(self._executor.map(time.sleep, [0.5] * self.workers))
+        elif self.warmup:
+            self.warmup()
+        self.warmup_s = round(time.perf_counter() - started_at, 3)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self._running += 1
+            try:
+                job.result = await loop.run_in_executor(
+                    self._executor, _run_job, self.runners[job.crew], job.inputs, job.job_id, job.priority
+                )
+                job.status = "succeeded"
+            except Exception as e:
+                job.status = "failed"
+                job.error = f"{type(e).__name__}: {e}"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Service stopped"
+                raise
+            finally:
+                self._running -= 1
+                job.finished_at = time.time()
+                self.counts[job.status] += 1
+                self.latencies.append(round(job.finished_at - job.submitted_at, 3))
+                self.queue_waits.append(round(job.started_at - job.submitted_at, 3))
+                job.done.set()
+                self._queue.task_done()
+                self._forget_finished()
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    def _retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up (one of the running jobs finishing)"""
+        run_times = [latency - wait for latency, wait in zip(self.latencies, self.queue_waits)]
+        return max(1, math.ceil((_percentile(run_times, 0.5) or 1.0) / self.workers))
+
+    def submit(self, crew: Optional[str], inputs: Dict[str, Any], priority: str = "interactive") -> Job:
+        """
+        Queue a crew run
+
+        Args:
+            crew: Crew name (may be omitted when the service hosts one crew)
+            inputs: Inputs for the crew's runner
+            priority: Rate limiter priority of the job's LLM and tool calls
+
+        Returns:
+            The queued job
+
+        Raises:
+            KeyError: If the crew is unknown
+            ValueError: If the priority is unknown
+            asyncio.QueueFull: If the queue is full
+        """
+        if crew is None and len(self.runners) == 1:
+            crew = next(iter(self.runners))
+        if crew not in self.runners:
+            raise KeyError(f"Unknown crew {crew!r}, expected one of {sorted(self.runners)}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {sorted(PRIORITIES)}")
+        job = Job(crew, inputs, priority)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counts["rejected"] += 1
+            raise
+        self.jobs[job.job_id] = job
+        self.counts["submitted"] += 1
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue, worker and latency statistics"""
+        latencies, queue_waits = list(self.latencies), list(self.queue_waits)
+        return {
+            "status": "ok",
+            "crews": sorted(self.runners),
+            "mode": "processes" if self.processes else "threads",
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "warmup_s": self.warmup_s,
+            **self.counts,
+            "latency_p50_s": _percentile(latencies, 0.5),
+            "latency_p99_s": _percentile(latencies, 0.99),
+            "queue_wait_p50_s": _percentile(queue_waits, 0.5),
+            "queue_wait_p99_s": _percentile(queue_waits, 0.99),
+        }
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[int, Any, Dict[str, str]]:
+        """Dispatch a request; returns the status, the JSON payload and extra headers"""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"]:
+            if method != "GET":
+                return 405, {"error": "Use GET"}, {}
+            return 200, self.stats(), {}
+
+        if parts == ["jobs"]:
+            if method != "POST":
+                return 405, {"error": "Use POST to submit a job"}, {}
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError as e:
+                return 400, {"error": f"Invalid JSON: {e}"}, {}
+            if not isinstance(request, dict) or not isinstance(request.get("inputs", {}), dict):
+                return 400, {"error": "Expected an object with an `inputs` object"}, {}
+            try:
+                job = self.submit(request.get("crew"), request.get("inputs") or {}, request.get("priority", "interactive"))
+            except KeyError as e:
+                return 404, {"error": e.args[0]}, {}
+            except ValueError as e:
+                return 400, {"error": str(e)}, {}
+            except asyncio.QueueFull:
+                return 503, {"error": "Job queue is full"}, {"Retry-After": str(self._retry_after())}
+            return 202, {"job_id": job.job_id, "status": job.status}, {"Location": f"/jobs/{job.job_id}"}
+
+        if len(parts) in (2, 3) and parts[0] == "jobs" and (len(parts) == 2 or parts[2] == "result"):
+            if method != "GET":
+                return 405, {"error": "Use GET"}, {}
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {"error": f"Unknown job {parts[1]}"}, {}
+            if len(parts) == 2:
+                return 200, job.to_dict(), {}
+            wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+            if wait > 0 and not job.done.is_set():
+                try:
+                    await asyncio.wait_for(job.done.wait(), timeout=min(wait, MAX_WAIT_S))
+                except asyncio.TimeoutError:
+                    pass
+            if not job.done.is_set():
+                return 202, job.to_dict(), {}
+            return 200, job.to_dict(with_result=True), {}
+
+        return 404, {"error": f"Not found: {url.path}"}, {}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP/1.1 request per connection"""
+        extra_headers: Dict[str, str] = {}
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length") or 0)
+            if length > MAX_BODY_BYTES:
+                status, payload = 413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload, extra_headers = await self._route(method.upper(), target, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, payload = 400, {"error": "Malformed request"}
+
+        content = json.dumps(payload, default=str).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(content)}",
+            "Connection: close",
+            *(f"{name}: {value}" for name, value in extra_headers.items()),
+        ]
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + content)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8700):
+        """
+        Warm up the workers and serve until cancelled
+
+        Args:
+            host: Interface to listen on (keep it local: the API has no authentication)
+            port: Port to listen on
+        """
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = self._create_executor()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._warm_up)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self._handle, host, port)
+        mode = "processes" if self.processes else "threads"
+        print(f"🔥 Warmed up {self.workers} worker {mode} in {self.warmup_s}s")
+        print(f"🛰️  Serving {', '.join(sorted(self.runners))} on http://{host}:{port} (queue size {self.queue_size})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, host: str = "127.0.0.1", port: int = 8700):
+        """Serve until interrupted"""
+        try:
+            asyncio.run(self.serve(host, port))
+        except KeyboardInterrupt:
+            print("\n👋 Service stopped")
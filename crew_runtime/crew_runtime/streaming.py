@@ -0,0 +1,362 @@
+"""
+Streaming crew output: task results as they complete, report text as it is generated
+
+A CrewStream attached to a crew emits events while the crew runs:
+
+    {"kind": "task", "task": ..., "output": {...}, "elapsed_s": ...}   a completed task
+    {"kind": "token", "task": ..., "text": ..., "elapsed_s": ...}      report text
+    {"kind": "reset", "task": ..., "elapsed_s": ...}                   report text restarts
+    {"kind": "done", "result": CrewOutput, "elapsed_s": ...}           the crew finished
+
+Only the LLM calls of the streamed task (by default the last one) are made with
+streaming enabled. That task answers with JSON for its output model, so the
+text of one string field (e.g. markdown_report) is decoded from the JSON as it
+arrives and emitted as token events. When a new answer replaces text already
+emitted (a retry, a failover or a second attempt by the agent), a reset event
+comes first. Streaming is scoped to the run through context variables, so
+crews running concurrently in one process (see service.py) never see each
+other's tokens, and the shared LLMs keep their setting for every other call.
+
+Listeners get every event in the crew's thread; `astream()` runs the crew in a
+worker thread and yields the events to an async caller:
+
+    stream = CrewStream(field="markdown_report")
+    async for event in stream.astream(crew, inputs):
+        ...
+"""
+import json
+import time
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Callable, AsyncIterator
+
+from crewai import Crew
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from crewai.tasks.task_output import TaskOutput
+
+
+# The stream of the task whose calls are streamed, while it runs
+_active_stream: ContextVar[Optional["CrewStream"]] = ContextVar("active_stream", default=None)
+
+# The field decoder of the provider call in progress
+_current_call: ContextVar[Optional["JsonFieldStream"]] = ContextVar("current_call", default=None)
+
+_streaming_classes: Dict[type, type] = {}
+
+
+class JsonFieldStream:
+    """Decodes the value of one string field from JSON text arriving in chunks"""
+
+    def __init__(self, field: str):
+        self.marker = f'"{field}"'
+        self.buffer = ""
+        self.text = ""
+        self.in_value = False
+        self.closed = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of the answer
+
+        Args:
+            chunk: Next piece of the answer text
+
+        Returns:
+            The newly decoded text of the field (empty while outside it)
+        """
+        if self.closed:
+            return ""
+        self.buffer += chunk
+        if not self.in_value:
+            start = self.buffer.find(self.marker)
+            if start == -1:
+                # Keep a possible partial marker at the end
+                self.buffer = self.buffer[-len(self.marker):]
+                return ""
+            rest = self.buffer[start + len(self.marker):].lstrip()
+            if not rest or (rest[0] == ":" and not rest[1:].lstrip()):
+                return ""
+            if rest[0] != ":" or rest[1:].lstrip()[0] != '"':
+                # The name appeared as a value or in prose; look further on
+                self.buffer = rest
+                return ""
+            self.buffer = rest[1:].lstrip()[1:]
+            self.in_value = True
+        return self._decode()
+
+    def _decode(self) -> str:
+        text, index, buffer = [], 0, self.buffer
+        while index < len(buffer):
+            char = buffer[index]
+            if char == '"':
+                self.closed = True
+                index = len(buffer)
+                break
+            if char != "\\":
+                text.append(char)
+                index += 1
+                continue
+            # An escape sequence is decoded once it is complete (both halves of a surrogate pair)
+            length = 2
+            if buffer[index + 1:index + 2] == "u":
+                length = 6
+                try:
+                    if 0xD800 <= int(buffer[index + 2:index + 6], 16) < 0xDC00:
+                        length = 12
+                except ValueError:
+                    pass
+            if index + length > len(buffer):
+                break
+            try:
+                text.append(json.loads(f'"{buffer[index:index + length]}"'))
+            except ValueError:
+                text.append(buffer[index:index + length])
+            index += length
+        self.buffer = buffer[index:]
+        self.text += "".join(text)
+        return "".join(text)
+
+
+def _streaming_class(cls: type) -> type:
+    """Subclass of an LLM class whose stream attribute is on while a streamed task runs"""
+    if cls not in _streaming_classes:
+        def get_stream(self) -> bool:
+            stream = _active_stream.get()
+            return bool(stream and stream.field) or self.__dict__.get("stream", False)
+
+        def set_stream(self, value: bool):
+            self.__dict__["stream"] = value
+
+        _streaming_classes[cls] = type(cls.__name__, (cls,), {"stream": property(get_stream, set_stream)})
+    return _streaming_classes[cls]
+
+
+def stream_llm(llm):
+    """
+    Let a crewai LLM stream its answers for the tasks a CrewStream streams
+
+    Args:
+        llm: crewai LLM (LiteLLM-backed or native provider), or None
+
+    Returns:
+        The same LLM instance
+    """
+    if llm is None or getattr(llm, "_crew_streaming", False):
+        return llm
+    original_call = llm.call
+    llm.__class__ = _streaming_class(type(llm))
+
+    def call(*args, **kwargs):
+        stream = _active_stream.get()
+        if stream is None or not stream.field:
+            return original_call(*args, **kwargs)
+        # Every provider call (retries and hedges included) decodes its own answer
+        decoder = JsonFieldStream(stream.field)
+        token = _current_call.set(decoder)
+        try:
+            return original_call(*args, **kwargs)
+        finally:
+            _current_call.reset(token)
+            stream._end_call(decoder)
+
+    llm.call = call
+    llm._crew_streaming = True
+    return llm
+
+
+def _on_chunk(source, event: LLMStreamChunkEvent):
+    # Stream chunks are delivered synchronously, in the thread of the call
+    stream = _active_stream.get()
+    decoder = _current_call.get()
+    if stream is not None and decoder is not None and not event.tool_call:
+        stream._on_text(decoder, decoder.feed(event.chunk))
+
+
+crewai_event_bus.on(LLMStreamChunkEvent)(_on_chunk)
+
+
+def _task_output(output: TaskOutput) -> Any:
+    if output.pydantic is not None:
+        return output.pydantic.model_dump(mode="json")
+    return output.json_dict or output.raw
+
+
+class CrewStream:
+    """Emits a crew's task results and report text while it runs"""
+
+    def __init__(
+        self,
+        field: Optional[str] = None,
+        task: Optional[str] = None,
+        output_path: Optional[str] = None,
+        echo: bool = False
+    ):
+        """
+        Initialize the stream
+
+        Args:
+            field: String field of the streamed task's output model whose text is
+                emitted as it is generated (None: task results only)
+            task: Name of the streamed task (default: the crew's last task)
+            output_path: File the field text is written to as it arrives; it is
+                truncated on a reset
+            echo: Also write the field text to stdout
+        """
+        self.field = field
+        self.task = task
+        self.output_path = output_path
+        self.echo = echo
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.started_at: Optional[float] = None
+        self.first_output_s: Optional[float] = None
+        self.first_token_s: Optional[float] = None
+        self.tokens = 0
+        self.resets = 0
+        self._owner: Optional[JsonFieldStream] = None
+        self._emitted = False
+        self._file = None
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call listener(event) for every event"""
+        self.listeners.append(listener)
+
+    def _emit(self, event: Dict[str, Any]):
+        elapsed = time.perf_counter() - self.started_at
+        event["elapsed_s"] = round(elapsed, 3)
+        if self.first_output_s is None and event["kind"] in ("task", "token"):
+            self.first_output_s = event["elapsed_s"]
+        for listener in self.listeners:
+            listener(event)
+
+    def _on_text(self, decoder: JsonFieldStream, text: str):
+        if not text:
+            return
+        with self._lock:
+            if self._owner is None:
+                # The first call to produce text owns the output until it ends
+                self._owner = decoder
+                if self._emitted:
+                    self.resets += 1
+                    self._write(None)
+                    self._emit({"kind": "reset", "task": self.task})
+                # Its text so far, including what arrived while another call owned the output
+                text = decoder.text
+            if decoder is not self._owner:
+                return
+            self._emitted = True
+            self.tokens += 1
+            if self.first_token_s is None:
+                self.first_token_s = round(time.perf_counter() - self.started_at, 3)
+            self._write(text)
+            self._emit({"kind": "token", "task": self.task, "text": text})
+
+    def _end_call(self, decoder: JsonFieldStream):
+        with self._lock:
+            if decoder is self._owner:
+                self._owner = None
+
+    def _write(self, text: Optional[str]):
+        """Append text to the output file and stdout; None truncates the file"""
+        if self.output_path:
+            if text is None or self._file is None:
+                if self._file:
+                    self._file.close()
+                self._file = open(self.output_path, 'w', encoding='utf-8')
+            if text:
+                self._file.write(text)
+                self._file.flush()
+        if self.echo:
+            print("\n🔁 Report restarted\n" if text is None else text, end="", flush=True)
+
+    def attach(self, crew: Crew) -> Crew:
+        """
+        Emit the crew's task results and stream its report task, from kickoff on
+
+        Args:
+            crew: A sequential crew, before kickoff (and after any other wrapper
+                of its tasks, such as TaskCheckpoints.attach)
+
+        Returns:
+            The same crew
+        """
+        self.task = self.task or crew.tasks[-1].name
+        self.started_at = time.perf_counter()
+
+        for task in crew.tasks:
+            original_execute = task.execute_sync
+
+            def execute_sync(*args, task=task, original_execute=original_execute, **kwargs) -> TaskOutput:
+                token = _active_stream.set(self) if task.name == self.task else None
+                try:
+                    output = original_execute(*args, **kwargs)
+                finally:
+                    if token is not None:
+                        _active_stream.reset(token)
+                self._emit({"kind": "task", "task": task.name, "output": _task_output(output)})
+                return output
+
+            object.__setattr__(task, "execute_sync", execute_sync)
+        return crew
+
+    def close(self):
+        """Close the output file"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self.echo and self._emitted:
+            print(flush=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Time to the first task result or token, and the number of token events"""
+        return {
+            "first_output_s": self.first_output_s,
+            "first_token_s": self.first_token_s,
+            "tokens": self.tokens,
+            "resets": self.resets,
+        }
+
+    async def astream(self, crew: Crew, inputs: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a crew in a worker thread and yield its events
+
+        Args:
+            crew: A sequential crew, before kickoff
+            inputs: Crew inputs
+
+        Yields:
+            Task, token and reset events, then a done event with the CrewOutput
+
+        Raises:
+            Exception: Whatever the crew raised, after the events before it
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        self.add_listener(lambda event: loop.call_soon_threadsafe(queue.put_nowait, event))
+        self.attach(crew)
+
+        def run():
+            try:
+                return crew.kickoff(inputs=inputs)
+            finally:
+                self.close()
+
+        # to_thread copies the context, so the run's context variables follow it
+        kickoff = asyncio.ensure_future(asyncio.to_thread(run))
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, kickoff}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+                continue
+            getter.cancel()
+            # Events queued before the crew finished come first
+            while not queue.empty():
+                yield queue.get_nowait()
+            result = kickoff.result()
+            event = {"kind": "done", "result": result}
+            self._emit(event)
+            yield event
+            return
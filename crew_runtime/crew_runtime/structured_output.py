@@ -0,0 +1,314 @@
+"""
+Structured task output without conversion round trips
+
+crewai turns a task's final answer into its output_pydantic model by parsing it
+as JSON; when that fails it asks the LLM to convert the text, up to three
+times, each a full LLM call. StructuredOutputConverter (a task's converter_cls)
+avoids most of those calls:
+
+1. Local repair: code fences and prose around the object are dropped, trailing
+   commas removed, Python literals replaced and truncated output closed.
+2. Incremental validation: the object is validated against the model and each
+   failing field is coerced where the intent is clear (a string for a list, a
+   list for a string, "5 years" for an int) before validating again.
+3. Native re-ask: only an answer that still does not validate goes back to the
+   LLM, with the validation errors and the JSON schema sent as a native
+   constraint (forced tool use on Anthropic, an instructor tool call through
+   LiteLLM). The reply goes through the same repair and validation.
+
+Every conversion is recorded per task with its path, local repairs, re-asks and
+the latency it added.
+
+Environment:
+    CREW_STRUCTURED_OUTPUT: Set to false to use crewai's default conversion
+"""
+import os
+import re
+import ast
+import json
+import time
+from typing import Optional, Any, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from crewai.utilities.converter import Converter, ConverterError
+
+from crew_runtime.instrumentation import metrics, current_task
+
+
+FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+TRAILING_COMMA_PATTERN = re.compile(r",(\s*[}\]])")
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def enabled() -> bool:
+    return os.getenv("CREW_STRUCTURED_OUTPUT", "true").lower() not in ("0", "false", "no")
+
+
+def structured_output_converter() -> Optional[Type[Converter]]:
+    """The converter_cls for tasks with output_pydantic (None: crewai's default conversion)"""
+    return StructuredOutputConverter if enabled() else None
+
+
+def supports_native_schema(llm: Any) -> bool:
+    """Whether an LLM can be constrained to a schema through response_model"""
+    # The native Anthropic provider always forces its structured_output tool, but only
+    # reports function calling for Claude 3 models
+    return getattr(llm, "provider", None) == "anthropic" or llm.supports_function_calling()
+
+
+def _outside_strings(text: str, replace) -> str:
+    """Apply replace() to the parts of JSON text that are not inside string literals"""
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', text)
+    return "".join(part if index % 2 else replace(part) for index, part in enumerate(parts))
+
+
+def _close(text: str) -> str:
+    """Close the strings, arrays and objects left open by a truncated answer"""
+    stack: List[str] = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+    if in_string:
+        text += '"'
+    text = text.rstrip().rstrip(",")
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack))
+
+
+def _extract(text: str) -> str:
+    """The JSON object in an answer, without fences or surrounding prose"""
+    fenced = FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find("{")
+    if start == -1:
+        return text.strip()
+    depth, in_string, escaped = 0, False, False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    # Unbalanced: the answer was cut off
+    return text[start:]
+
+
+def repair_json(text: str) -> Tuple[Optional[Any], List[str]]:
+    """
+    Parse a JSON object from an LLM answer, repairing common defects
+
+    Args:
+        text: The answer text
+
+    Returns:
+        The parsed value (None when it cannot be parsed) and the repairs applied
+    """
+    repairs: List[str] = []
+    candidate = _extract(text)
+    if candidate != text.strip():
+        repairs.append("extracted")
+    try:
+        return json.loads(candidate, strict=False), repairs
+    except ValueError:
+        pass
+
+    fixed = _outside_strings(candidate, lambda part: TRAILING_COMMA_PATTERN.sub(r"\1", part))
+    if fixed != candidate:
+        repairs.append("trailing_commas")
+    literals = _outside_strings(
+        fixed, lambda part: re.sub(r"\b(True|False|None)\b", lambda m: PYTHON_LITERALS[m.group(1)], part)
+    )
+    if literals != fixed:
+        repairs.append("python_literals")
+    for attempt, repair in ((literals, None), (_close(literals), "closed_truncated")):
+        try:
+            value = json.loads(attempt, strict=False)
+            return value, repairs + ([repair] if repair else [])
+        except ValueError:
+            continue
+    try:
+        # Single-quoted, Python-style objects
+        value = ast.literal_eval(candidate)
+        if isinstance(value, (dict, list)):
+            return value, repairs + ["python_syntax"]
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        pass
+    return None, repairs
+
+
+def _coerce(value: Any, error_type: str) -> Tuple[bool, Any]:
+    """Coerce a field value for a validation error type; (False, value) when unclear"""
+    if error_type == "list_type" and isinstance(value, str):
+        items = [line.strip(" -*•\t") for line in value.splitlines() if line.strip(" -*•\t")]
+        return True, items if len(items) > 1 else [value]
+    if error_type == "string_type" and isinstance(value, list):
+        return True, "; ".join(v if isinstance(v, str) else json.dumps(v) for v in value)
+    if error_type == "string_type" and isinstance(value, (dict, int, float, bool)):
+        return True, json.dumps(value) if isinstance(value, dict) else str(value)
+    if error_type in ("int_parsing", "int_from_float", "int_type", "float_parsing", "float_type"):
+        match = NUMBER_PATTERN.search(str(value))
+        if match:
+            number = float(match.group())
+            return True, number if error_type.startswith("float") else int(round(number))
+    return False, value
+
+
+def _set_path(data: Any, path: tuple, value: Any) -> bool:
+    target = data
+    for key in path[:-1]:
+        try:
+            target = target[key]
+        except (KeyError, IndexError, TypeError):
+            return False
+    try:
+        target[path[-1]] = value
+    except (KeyError, IndexError, TypeError):
+        return False
+    return True
+
+
+def _get_path(data: Any, path: tuple) -> Tuple[bool, Any]:
+    target = data
+    for key in path:
+        try:
+            target = target[key]
+        except (KeyError, IndexError, TypeError):
+            return False, None
+    return True, target
+
+
+def validate_incrementally(text: str, model: Type[BaseModel]) -> Tuple[Optional[BaseModel], List[str], List[str]]:
+    """
+    Repair, validate and coerce an answer into a model, without calling an LLM
+
+    Args:
+        text: The answer text
+        model: Target pydantic model
+
+    Returns:
+        The model instance (None when it still does not validate), the remaining
+        validation errors and the repairs applied
+    """
+    data, repairs = repair_json(text)
+    if not isinstance(data, dict):
+        return None, ["the answer does not contain a JSON object"], repairs
+    # Fields are fixed one error at a time; each pass removes at least one error or stops
+    for _ in range(len(model.model_fields) * 4):
+        try:
+            return model.model_validate(data), [], repairs
+        except ValidationError as e:
+            fixed = False
+            for error in e.errors():
+                path = tuple(error["loc"])
+                found, value = _get_path(data, path)
+                if not found:
+                    continue
+                coerced, new_value = _coerce(value, error["type"])
+                if coerced and _set_path(data, path, new_value):
+                    repairs.append(f"coerced {'.'.join(map(str, path))}")
+                    fixed = True
+                    break
+            if not fixed:
+                return None, [
+                    f"{'.'.join(map(str, error['loc'])) or 'object'}: {error['msg']}" for error in e.errors()
+                ], repairs
+    return None, ["too many invalid fields"], repairs
+
+
+class StructuredOutputConverter(Converter):
+    """Converts a task's final answer locally first, re-asking the LLM natively only when needed"""
+
+    def _reask(self, text: str, errors: List[str]) -> str:
+        """Ask the LLM for the object again, constrained to the model's schema where supported"""
+        messages = [
+            {"role": "system", "content": self.instructions},
+            {
+                "role": "user",
+                "content": (
+                    f"{text}\n\nThis answer does not match the required schema:\n- "
+                    + "\n- ".join(errors[:20])
+                    + "\n\nReturn the complete, corrected object."
+                ),
+            },
+        ]
+        if supports_native_schema(self.llm):
+            response = self.llm.call(messages=messages, response_model=self.model)
+        else:
+            response = self.llm.call(messages)
+        if isinstance(response, BaseModel):
+            return response.model_dump_json()
+        return response if isinstance(response, str) else json.dumps(response)
+
+    def to_pydantic(self, current_attempt: int = 1) -> BaseModel:
+        """
+        Convert the answer into the model
+
+        Args:
+            current_attempt: Unused; re-asks are counted internally
+
+        Returns:
+            The model instance
+
+        Raises:
+            ConverterError: If the answer still does not validate after max_attempts re-asks
+        """
+        started_at = time.time()
+        start = time.perf_counter()
+        result, errors, repairs = validate_incrementally(self.text, self.model)
+        path = "repaired" if repairs else "parsed"
+        text, reasks, error = self.text, 0, None
+        while result is None and reasks < self.max_attempts:
+            reasks += 1
+            path = "reask"
+            try:
+                text = self._reask(text, errors)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+            result, errors, more = validate_incrementally(text, self.model)
+            repairs += more
+
+        metrics.record({
+            "kind": "conversion",
+            "task": current_task(),
+            "model": getattr(self.llm, "model", None),
+            "output_model": self.model.__name__,
+            "status": "success" if result is not None else "error",
+            "error": None if result is not None else error or "; ".join(errors[:5]),
+            "start": started_at,
+            "latency_s": round(time.perf_counter() - start, 4),
+            "path": path,
+            "repairs": repairs,
+            "reasks": reasks,
+        })
+        if result is None:
+            raise ConverterError(
+                f"Failed to convert text into {self.model.__name__} after {reasks} re-asks: {'; '.join(errors[:5])}"
+            )
+        return result
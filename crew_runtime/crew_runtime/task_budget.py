@@ -0,0 +1,354 @@
+"""
+Per-task execution budgets: tool calls, tokens and a wall-clock deadline
+
+A task's `budget` entry in tasks.yaml bounds how much work its agent may do.
+TaskBudgets takes over the `call` of the crew's LLM routes (after the model
+router) and the `_run` of the agents' tools, and tracks the budget of the task
+in progress:
+
+- Wrap-up: once the tool calls are used up, or 80% of the tokens or of the
+  deadline is spent, tools stop running and answer with a note asking for the
+  final answer, and the agent's next LLM call carries the same note. The agent
+  then answers with what it has gathered.
+- Hard stop: an LLM call is refused once the tokens are spent or the deadline
+  has passed, and every LLM and tool request is given only the time left until
+  the deadline. A request still running at the deadline is abandoned (a running
+  request cannot be interrupted) and its result discarded.
+
+A task stopped by its budget does not fail the crew: it returns a valid partial
+result of its output_pydantic model, with "Not available" for required text,
+empty lists and model defaults elsewhere.
+
+Example tasks.yaml entry:
+    budget:
+      max_tool_calls: 12   # tool calls per task execution
+      max_tokens: 80000    # prompt + completion tokens over its LLM calls
+      deadline_s: 240      # wall-clock time for the task, output conversion included
+"""
+import time
+import threading
+from concurrent.futures import Future
+from contextvars import ContextVar, copy_context
+from typing import Optional, Dict, Any, List, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from crewai import Task
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+
+from crew_runtime.instrumentation import metrics, set_current_task
+from crew_runtime.output_models import NOT_AVAILABLE
+
+
+# Share of the tokens or the deadline after which the agent is asked to wrap up
+WRAP_UP_RATIO = 0.8
+WRAP_UP_NOTE = (
+    "The budget for this task is nearly used up. Do not use any more tools: give your "
+    "Final Answer now, based on the information gathered so far, and mark anything "
+    f"still missing as \"{NOT_AVAILABLE}\"."
+)
+LIMIT_KEYS = ("max_tool_calls", "max_tokens", "deadline_s")
+
+
+class BudgetExceeded(TimeoutError):
+    """A task ran out of its budget; crewai does not retry the task on TimeoutError"""
+
+
+class TaskBudget:
+    """Usage of one task execution against its limits"""
+
+    def __init__(self, task_name: str, limits: Dict[str, Any]):
+        self.task_name = task_name
+        self.max_tool_calls: Optional[int] = limits.get("max_tool_calls")
+        self.max_tokens: Optional[int] = limits.get("max_tokens")
+        self.deadline_s: Optional[float] = limits.get("deadline_s")
+        self.started = time.monotonic()
+        self.deadline = self.started + self.deadline_s if self.deadline_s else None
+        self.tool_calls = 0
+        self.refused_tool_calls = 0
+        self.tokens = 0
+        self.exceeded: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def remaining_s(self) -> Optional[float]:
+        """Seconds left until the deadline (None: no deadline)"""
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def add_tokens(self, tokens: int):
+        with self._lock:
+            self.tokens += tokens
+
+    def take_tool_call(self) -> bool:
+        """Count a tool call; False when the task should wrap up instead"""
+        with self._lock:
+            if self.wrapping_up:
+                self.refused_tool_calls += 1
+                return False
+            self.tool_calls += 1
+            return True
+
+    @property
+    def wrapping_up(self) -> bool:
+        """Whether the agent should stop using tools and answer"""
+        if self.max_tool_calls is not None and self.tool_calls >= self.max_tool_calls:
+            return True
+        if self.max_tokens and self.tokens >= self.max_tokens * WRAP_UP_RATIO:
+            return True
+        return bool(self.deadline_s) and time.monotonic() - self.started >= self.deadline_s * WRAP_UP_RATIO
+
+    def check(self):
+        """Raise BudgetExceeded when the tokens are spent or the deadline has passed"""
+        if self.max_tokens and self.tokens >= self.max_tokens:
+            self.stop(f"token budget of {self.max_tokens} spent ({self.tokens} tokens)")
+        remaining = self.remaining_s()
+        if remaining is not None and remaining <= 0:
+            self.stop(f"deadline of {self.deadline_s}s passed")
+
+    def stop(self, reason: str):
+        self.exceeded = self.exceeded or reason
+        raise BudgetExceeded(f"Task {self.task_name} stopped: {reason}")
+
+
+# Budget of the task executing in the current context
+current_budget: ContextVar[Optional[TaskBudget]] = ContextVar("current_budget", default=None)
+
+
+def _count_tokens(record: Dict[str, Any]):
+    """Metrics listener adding the tokens of each LLM call to the budget of its task"""
+    budget = current_budget.get()
+    if budget is not None and record.get("kind") == "llm":
+        budget.add_tokens((record.get("prompt_tokens") or 0) + (record.get("completion_tokens") or 0))
+
+
+metrics.add_listener(_count_tokens)
+
+
+def _within(budget: TaskBudget, fn, *args, **kwargs) -> Any:
+    """Run fn, giving up on it when the task's deadline passes first"""
+    budget.check()
+    remaining = budget.remaining_s()
+    if remaining is None:
+        return fn(*args, **kwargs)
+
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # A thread per request: an abandoned request must not hold up the calls of other tasks
+    threading.Thread(target=copy_context().run, args=(run,), name="budget-call", daemon=True).start()
+    try:
+        return future.result(timeout=max(remaining, 0))
+    except TimeoutError:
+        if future.done():
+            raise
+        budget.stop(f"deadline of {budget.deadline_s}s passed during a request")
+
+
+def _placeholder(annotation: Any) -> Any:
+    """Value standing in for a required field the task never produced"""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = get_args(annotation)
+        if type(None) in args:
+            return None
+        return _placeholder(args[0])
+    if annotation is str:
+        return NOT_AVAILABLE
+    if origin in (list, List) or annotation is list:
+        return []
+    if origin is dict or annotation is dict:
+        return {}
+    if annotation is bool:
+        return False
+    if annotation in (int, float):
+        return 0
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return partial_result(annotation)
+    return None
+
+
+def partial_result(model: Type[BaseModel]) -> BaseModel:
+    """
+    A valid instance of a model for a task stopped by its budget
+
+    Args:
+        model: The task's output_pydantic model
+
+    Returns:
+        The instance, with "Not available" for required text, empty collections for
+        required lists and the model's defaults for optional fields
+    """
+    return model.model_validate({
+        name: _placeholder(field.annotation)
+        for name, field in model.model_fields.items()
+        if field.is_required()
+    })
+
+
+class TaskBudgets:
+    """Enforces the `budget` entries of tasks.yaml on a crew's LLM routes and tools"""
+
+    def __init__(self, routes: Dict[str, Any]):
+        """
+        Take over the call of every route
+
+        Args:
+            routes: Route name -> crewai LLM, after the model router took them over
+        """
+        self.policies: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        for llm in routes.values():
+            if llm is not None and not getattr(llm, "_crew_budgeted", False):
+                llm.call = self._llm_call(llm.call)
+                llm._crew_budgeted = True
+
+    def configure_tasks(self, tasks: List[Task], tasks_config: Dict[str, Dict[str, Any]]):
+        """
+        Load the `budget` entries of tasks.yaml and enforce them on a crew's tasks
+
+        Entries are matched to tasks by name: CrewBase names a task after its
+        @task method, which must be the task's key in tasks.yaml.
+
+        Args:
+            tasks: The crew's Task objects
+            tasks_config: Parsed tasks.yaml
+
+        Raises:
+            ValueError: If a budget has unknown limits or belongs to no task
+        """
+        names = {task.name for task in tasks}
+        unmatched = sorted(key for key, config in tasks_config.items() if config.get("budget") and key not in names)
+        if unmatched:
+            raise ValueError(f"Budgets for unknown task(s) {unmatched}; name each @task method after its tasks.yaml key")
+        for task in tasks:
+            limits = (tasks_config.get(task.name) or {}).get("budget")
+            if not limits:
+                continue
+            unknown = sorted(set(limits) - set(LIMIT_KEYS))
+            if unknown:
+                raise ValueError(f"Unknown budget limit(s) {unknown} for task {task.name}")
+            self.policies[task.name] = limits
+            for tool in [*(task.tools or []), *(getattr(task.agent, "tools", None) or [])]:
+                self._limit_tool(tool)
+            self._limit_task(task, limits)
+
+    def _llm_call(self, original_call):
+        def call(*args, **kwargs):
+            budget = current_budget.get()
+            if budget is None:
+                return original_call(*args, **kwargs)
+            messages = kwargs.get("messages", args[0] if args else None)
+            # Only the agent's own turns carry the note; output conversion calls have no task
+            if budget.wrapping_up and isinstance(messages, list) and kwargs.get("from_task"):
+                messages = [*messages, {"role": "user", "content": WRAP_UP_NOTE}]
+                if "messages" in kwargs:
+                    kwargs["messages"] = messages
+                else:
+                    args = (messages, *args[1:])
+            agent = getattr(kwargs.get("from_agent"), "role", None)
+
+            def run():
+                # Calls without task context (output conversion) are attributed per thread
+                set_current_task(budget.task_name, agent)
+                return original_call(*args, **kwargs)
+
+            try:
+                return _within(budget, run)
+            finally:
+                set_current_task(budget.task_name, agent)
+        return call
+
+    def _limit_tool(self, tool):
+        if getattr(tool, "_crew_budgeted", False):
+            return
+        original_run = tool._run
+
+        def run(*args, **kwargs):
+            budget = current_budget.get()
+            if budget is None:
+                return original_run(*args, **kwargs)
+            if not budget.take_tool_call():
+                return WRAP_UP_NOTE
+            return _within(budget, original_run, *args, **kwargs)
+
+        # BaseTool is a pydantic model; bypass its field validation
+        object.__setattr__(tool, "_run", run)
+        object.__setattr__(tool, "_crew_budgeted", True)
+
+    def _limit_task(self, task: Task, limits: Dict[str, Any]):
+        original_execute = task.execute_sync
+
+        def execute_sync(*args, **kwargs) -> TaskOutput:
+            budget = TaskBudget(task.name, limits)
+            token = current_budget.set(budget)
+            try:
+                return original_execute(*args, **kwargs)
+            except Exception:
+                # Errors caused by the budget (also when wrapped by crewai) end in a partial result
+                if not budget.exceeded:
+                    raise
+                return self._partial_output(task, budget)
+            finally:
+                current_budget.reset(token)
+                self._record(budget)
+
+        object.__setattr__(task, "execute_sync", execute_sync)
+
+    def _partial_output(self, task: Task, budget: TaskBudget) -> TaskOutput:
+        print(f"⏱️  {task.name} {budget.exceeded}, returning a partial result")
+        pydantic = partial_result(task.output_pydantic) if task.output_pydantic else None
+        output = TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            agent=task.agent.role if task.agent else "",
+            output_format=OutputFormat.PYDANTIC if pydantic else OutputFormat.RAW,
+            raw=pydantic.model_dump_json(indent=2) if pydantic else f"{NOT_AVAILABLE}: {budget.exceeded}",
+            pydantic=pydantic,
+        )
+        task.output = output
+        return output
+
+    def _record(self, budget: TaskBudget):
+        with self._lock:
+            stats = self._stats.setdefault(budget.task_name, {
+                "runs": 0, "partial": 0, "wrap_ups": 0, "tool_calls": 0, "refused_tool_calls": 0,
+                "tokens": 0, "max_elapsed_s": 0.0, "reasons": [],
+            })
+            stats["runs"] += 1
+            stats["tool_calls"] += budget.tool_calls
+            stats["refused_tool_calls"] += budget.refused_tool_calls
+            stats["tokens"] += budget.tokens
+            stats["max_elapsed_s"] = round(max(stats["max_elapsed_s"], time.monotonic() - budget.started), 3)
+            if budget.wrapping_up:
+                stats["wrap_ups"] += 1
+            if budget.exceeded:
+                stats["partial"] += 1
+                if budget.exceeded not in stats["reasons"]:
+                    stats["reasons"].append(budget.exceeded)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Executions, wrap-ups, partial results and usage per budgeted task"""
+        with self._lock:
+            return {
+                task_name: {**stats, "limits": self.policies.get(task_name, {}), "reasons": list(stats["reasons"])}
+                for task_name, stats in self._stats.items()
+            }
+
+    def print_stats(self):
+        """Print the stats of every budgeted task that has run"""
+        stats = self.stats()
+        if not stats:
+            return
+        print("⏱️  Task budgets:")
+        for task_name, s in stats.items():
+            print(
+                f"   {task_name}: {s['runs']} runs, {s['tool_calls']} tool calls "
+                f"({s['refused_tool_calls']} refused), {s['tokens']} tokens, "
+                f"max {s['max_elapsed_s']}s, {s['wrap_ups']} wrapped up, {s['partial']} partial"
+            )
@@ -0,0 +1,359 @@
+"""
+Sampled telemetry exported in batches by a background thread
+
+Every call record of the metrics sink (LLM calls, tool calls, output
+conversions) is offered to the telemetry buffer. Recording only decides
+sampling and appends to an in-memory ring buffer; a daemon thread exports the
+buffer in batches every few seconds, or as soon as a batch is full. When the
+exporter falls behind, the oldest events are dropped and counted rather than
+blocking the crew.
+
+Sampling is decided per run, so a sampled run is exported whole; failed calls
+are always exported. Events go to AgentOps (initialized in the background
+thread on the first export, without its LLM and framework patching, and sent
+as OpenTelemetry spans) or to a local JSONL file.
+
+The crews' console output (agent steps, tool calls, final answers) is rendered
+by crewai's event handlers. CREW_VERBOSE=deferred hands the rendered text to a
+background writer, so a slow terminal or pipe never holds up a handler, and
+skips the panel crewai redraws in the LLM call's thread for every streamed
+chunk (the final answer is still shown once complete). CREW_VERBOSE=false turns
+the console output off.
+
+Environment:
+    CREW_TELEMETRY: agentops, a .jsonl file path or off (default: agentops when
+        AGENTOPS_API_KEY is set, otherwise off)
+    CREW_TELEMETRY_SAMPLE_RATE: Share of runs exported (default: 1.0)
+    CREW_TELEMETRY_BATCH_SIZE: Events per export batch (default: 256)
+    CREW_TELEMETRY_FLUSH_S: Longest wait before buffered events are exported (default: 2.0)
+    CREW_TELEMETRY_BUFFER: Events kept while waiting for export (default: 10000)
+    CREW_VERBOSE: true, deferred or false (default: deferred)
+"""
+import io
+import os
+import sys
+import json
+import time
+import zlib
+import atexit
+import random
+import threading
+from pathlib import Path
+from collections import deque
+from typing import Optional, Dict, Any, List
+
+from crew_runtime.instrumentation import MetricsSink, metrics
+
+
+BATCH_SIZE = 256
+FLUSH_INTERVAL_S = 2.0
+BUFFER_SIZE = 10000
+
+
+class FileExporter:
+    """Appends events to a JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.name = str(self.path)
+
+    def export(self, events: List[Dict[str, Any]]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(event, default=str) + "\n" for event in events))
+
+    def flush(self):
+        pass
+
+
+class AgentOpsExporter:
+    """Sends events to AgentOps as spans"""
+
+    name = "agentops"
+
+    def __init__(self):
+        self._tracer = None
+
+    def _start(self):
+        import agentops
+
+        # Its LLM and crewai patching would put it back on every call's path
+        agentops.init(instrument_llm_calls=False, auto_start_session=False)
+        self._tracer = agentops.tracer.get_tracer("crew_agent")
+
+    def export(self, events: List[Dict[str, Any]]):
+        if self._tracer is None:
+            self._start()
+        for event in events:
+            start = event.get("start") or time.time()
+            name = event.get("model") if event["kind"] == "llm" else event.get("tool") or event.get("path")
+            span = self._tracer.start_span(f"{event['kind']} {name}", start_time=int(start * 1e9))
+            span.set_attributes({
+                f"crew.{key}": value for key, value in event.items()
+                if isinstance(value, (str, bool, int, float)) and key != "start"
+            })
+            span.end(end_time=int((start + event.get("latency_s", 0.0)) * 1e9))
+
+    def flush(self):
+        if self._tracer is not None:
+            import agentops
+
+            agentops.tracer.provider.force_flush()
+
+
+def exporter_from_env() -> Optional[Any]:
+    """The exporter configured by CREW_TELEMETRY (None: telemetry off)"""
+    target = os.getenv("CREW_TELEMETRY") or ("agentops" if os.getenv("AGENTOPS_API_KEY") else "off")
+    if target.lower() in ("off", "false", "0", "none"):
+        return None
+    if target.lower() == "agentops":
+        return AgentOpsExporter()
+    return FileExporter(target)
+
+
+class Telemetry:
+    """Ring buffer of sampled events with a background batch exporter"""
+
+    def __init__(
+        self,
+        exporter: Optional[Any] = None,
+        sample_rate: float = 1.0,
+        batch_size: int = BATCH_SIZE,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+        buffer_size: int = BUFFER_SIZE
+    ):
+        """
+        Initialize the telemetry buffer
+
+        Args:
+            exporter: Object with export(events) and flush() (None: telemetry off)
+            sample_rate: Share of runs whose events are exported
+            batch_size: Events per export call; a full batch wakes the exporter
+            flush_interval_s: Longest time an event waits in the buffer
+            buffer_size: Events kept before the oldest are dropped
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._random = random.Random()
+        self._stats = {
+            "events": 0, "sampled_out": 0, "dropped": 0, "exported": 0,
+            "batches": 0, "export_errors": 0, "export_s": 0.0, "record_s": 0.0,
+        }
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def attach(self, sink: MetricsSink = metrics):
+        """Offer every record of a metrics sink to the buffer"""
+        if self.enabled:
+            sink.add_listener(self.record)
+
+    def sampled(self, run_id: Optional[str]) -> bool:
+        """Whether the events of a run are exported; the same for every event of the run"""
+        if self.sample_rate >= 1.0:
+            return True
+        if run_id is None:
+            return self._random.random() < self.sample_rate
+        return zlib.crc32(run_id.encode('utf-8')) / 0xFFFFFFFF < self.sample_rate
+
+    def record(self, event: Dict[str, Any]):
+        """
+        Buffer an event for export, unless its run is sampled out
+
+        Args:
+            event: Call record (see MetricsSink.record)
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._stats["events"] += 1
+            if event.get("status", "success") == "success" and not self.sampled(event.get("run_id")):
+                self._stats["sampled_out"] += 1
+            else:
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._stats["dropped"] += 1
+                self._buffer.append(event)
+                self._idle.clear()
+                if len(self._buffer) >= self.batch_size:
+                    self._wake.set()
+            self._stats["record_s"] += time.perf_counter() - started
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None or self._stopped:
+                return
+            self._thread = threading.Thread(target=self._run, name="telemetry-export", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            self._export_buffered()
+            if self._stopped:
+                return
+
+    def _export_buffered(self):
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    self._idle.set()
+                    return
+            started = time.perf_counter()
+            try:
+                self.exporter.export(batch)
+                exported, error = len(batch), None
+            except Exception as e:
+                exported, error = 0, f"{type(e).__name__}: {e}"
+            with self._lock:
+                self._stats["exported"] += exported
+                self._stats["batches"] += 1
+                self._stats["export_errors"] += error is not None
+                self._stats["export_s"] += time.perf_counter() - started
+                self.last_error = error or self.last_error
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until the buffered events are exported; returns False on timeout"""
+        if self._thread is None:
+            return True
+        self._wake.set()
+        done = self._idle.wait(timeout)
+        try:
+            self.exporter.flush()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        return done
+
+    def close(self, timeout: float = 10.0):
+        """Export what is buffered and stop the exporter thread"""
+        if self._thread is None or self._stopped:
+            return
+        self.flush(timeout)
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Event counts, export batches and the time spent recording and exporting"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["exporter"] = getattr(self.exporter, "name", None)
+        stats["sample_rate"] = self.sample_rate
+        stats["record_us_per_event"] = round(stats.pop("record_s") / stats["events"] * 1e6, 2) if stats["events"] else None
+        stats["export_s"] = round(stats["export_s"], 6)
+        return stats
+
+    def print_stats(self):
+        """Print what was exported, when telemetry is on"""
+        if not self.enabled:
+            return
+        self.flush()
+        s = self.stats()
+        print(f"🛰️  Telemetry ({s['exporter']}, {s['sample_rate']:.0%} sampled): {s['exported']}/{s['events']} "
+              f"events exported in {s['batches']} batches, {s['sampled_out']} sampled out, {s['dropped']} dropped, "
+              f"{s['record_us_per_event']}µs per event on the calling thread")
+        if s["export_errors"]:
+            print(f"   ⚠️  {s['export_errors']} failed exports, last: {self.last_error}")
+
+
+class ConsoleWriter(io.TextIOBase):
+    """Text stream whose writes are queued and written to the target by a daemon thread"""
+
+    def __init__(self, target):
+        self.target = target
+        self._queue: deque = deque()
+        self._writing = False
+        self._wake = threading.Condition()
+        threading.Thread(target=self._run, name="console-writer", daemon=True).start()
+        atexit.register(self.flush)
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self.target.isatty()
+
+    @property
+    def encoding(self) -> str:
+        return getattr(self.target, "encoding", "utf-8")
+
+    def fileno(self) -> int:
+        return self.target.fileno()
+
+    def write(self, text: str) -> int:
+        with self._wake:
+            self._queue.append(text)
+            self._wake.notify()
+        return len(text)
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while not self._queue:
+                    self._wake.wait()
+                text = "".join(self._queue)
+                self._queue.clear()
+                self._writing = True
+            try:
+                self.target.write(text)
+                self.target.flush()
+            except (OSError, ValueError):
+                pass
+            with self._wake:
+                self._writing = False
+                self._wake.notify_all()
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until the queued text is written"""
+        deadline = time.monotonic() + timeout
+        with self._wake:
+            while (self._queue or self._writing) and time.monotonic() < deadline:
+                self._wake.wait(0.05)
+
+
+def verbose_mode() -> str:
+    """The console mode from CREW_VERBOSE: true, deferred or false"""
+    mode = (os.getenv("CREW_VERBOSE") or "deferred").lower()
+    if mode in ("false", "0", "off"):
+        return "false"
+    return "true" if mode in ("true", "1", "on") else "deferred"
+
+
+def defer_console():
+    """Write crewai's console rendering through a background writer"""
+    from crewai.events.event_listener import event_listener
+
+    formatter = event_listener.formatter
+    if not isinstance(formatter.console.file, ConsoleWriter):
+        formatter.console.file = ConsoleWriter(sys.stdout)
+    # Stream chunk handlers run in the call's thread and redraw all text so far
+    formatter.handle_llm_stream_chunk = lambda *args, **kwargs: None
+
+
+telemetry = Telemetry(
+    exporter=exporter_from_env(),
+    sample_rate=float(os.getenv("CREW_TELEMETRY_SAMPLE_RATE", "1.0")),
+    batch_size=int(os.getenv("CREW_TELEMETRY_BATCH_SIZE", str(BATCH_SIZE))),
+    flush_interval_s=float(os.getenv("CREW_TELEMETRY_FLUSH_S", str(FLUSH_INTERVAL_S))),
+    buffer_size=int(os.getenv("CREW_TELEMETRY_BUFFER", str(BUFFER_SIZE))),
+)
+telemetry.attach()
+
+# Agents and crews are built with verbose=VERBOSE
+VERBOSE = verbose_mode() != "false"
+if verbose_mode() == "deferred":
+    defer_console()
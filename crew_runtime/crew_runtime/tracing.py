@@ -0,0 +1,346 @@
+"""
+Chrome Trace Event / Perfetto timeline export for crew runs
+
+When enabled, crew kickoff, task and agent execution spans are collected from
+the crewai event bus, and LLM and tool call spans from the call metrics. Agent
+iterations (an LLM call and the tool calls it triggers) are derived from the
+call spans, and LLM calls made without task context are shown as output
+conversion. Traces open in https://ui.perfetto.dev or chrome://tracing.
+
+A trace can also be built offline from the call records of a past or replayed
+run (see CREW_METRICS_PATH); task spans are then derived from the calls.
+
+Environment:
+    CREW_TRACE_DIR: Enable tracing and write one trace file per run to this directory
+
+Usage (from the crew directory):
+    python -m crew_runtime.tracing metrics/calls.jsonl --run <run_id> -o trace.json
+"""
+import os
+import json
+import argparse
+import time
+import threading
+from pathlib import Path
+from collections import defaultdict
+from typing import Optional, Dict, Any, List
+
+from crewai.events import (
+    crewai_event_bus,
+    AgentExecutionCompletedEvent,
+    AgentExecutionErrorEvent,
+    AgentExecutionStartedEvent,
+    CrewKickoffCompletedEvent,
+    CrewKickoffFailedEvent,
+    CrewKickoffStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+)
+
+from crew_runtime.instrumentation import current_run, metrics, _task_name
+
+
+def _task_label(task: Any) -> str:
+    return _task_name(task) or "task"
+
+
+def call_span(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an LLM or tool call record into a span"""
+    if record["kind"] == "llm":
+        category = "conversion" if record.get("inferred_task") else "llm"
+        name = f"{'convert' if category == 'conversion' else 'llm'} {record.get('model')}"
+    else:
+        category, name = "tool", f"tool {record.get('tool')}"
+    start = record.get("start")
+    return {
+        "run_id": record.get("run_id"),
+        "name": name,
+        "cat": category,
+        "start": start,
+        "end": start + record["latency_s"],
+        "args": {k: v for k, v in record.items() if k not in ("ts", "start", "run_id", "kind")},
+    }
+
+
+class ChromeTracer:
+    """Collects nested spans of crew runs"""
+
+    def __init__(self):
+        self.enabled = False
+        self._registered = False
+        self._lock = threading.Lock()
+        self._open: Dict[tuple, Dict[str, Any]] = {}
+        self._spans: List[Dict[str, Any]] = []
+        self._last_mark: Dict[Optional[str], float] = {}
+
+    def enable(self):
+        """Start collecting spans; nothing is hooked until the tracer is first enabled"""
+        if not self._registered:
+            self._register()
+        metrics.add_listener(self._on_record)
+        self.enabled = True
+
+    def disable(self):
+        """Stop collecting spans"""
+        metrics.remove_listener(self._on_record)
+        self.enabled = False
+
+    def _mark(self, key: tuple, edge: str, event, name: str, category: str, args: Optional[Dict] = None):
+        """Record the start or end of a span; handlers may run out of order"""
+        if not self.enabled:
+            return
+        with self._lock:
+            run_id = current_run.get()
+            span = self._open.setdefault(key, {"run_id": run_id, "name": name, "cat": category, "args": {}})
+            span[edge] = event.timestamp.timestamp()
+            self._last_mark[run_id] = time.monotonic()
+            span["args"].update(args or {})
+            if "start" in span and "end" in span:
+                self._spans.append(self._open.pop(key))
+
+    def _register(self):
+        """Subscribe to the crew, task and agent lifecycle events"""
+        bus = crewai_event_bus
+
+        @bus.on(CrewKickoffStartedEvent)
+        def crew_started(source, event):
+            self._mark(("crew", id(source)), "start", event, f"crew {event.crew_name}", "crew")
+
+        @bus.on(CrewKickoffCompletedEvent)
+        def crew_completed(source, event):
+            self._mark(("crew", id(source)), "end", event, f"crew {event.crew_name}", "crew",
+                       {"total_tokens": event.total_tokens})
+
+        @bus.on(CrewKickoffFailedEvent)
+        def crew_failed(source, event):
+            self._mark(("crew", id(source)), "end", event, f"crew {event.crew_name}", "crew", {"error": event.error})
+
+        @bus.on(TaskStartedEvent)
+        def task_started(source, event):
+            self._mark(("task", id(event.task)), "start", event, f"task {_task_label(event.task)}", "task")
+
+        @bus.on(TaskCompletedEvent)
+        def task_completed(source, event):
+            self._mark(("task", id(event.task)), "end", event, f"task {_task_label(event.task)}", "task")
+
+        @bus.on(TaskFailedEvent)
+        def task_failed(source, event):
+            self._mark(("task", id(event.task)), "end", event, f"task {_task_label(event.task)}", "task",
+                       {"error": event.error})
+
+        @bus.on(AgentExecutionStartedEvent)
+        def agent_started(source, event):
+            self._mark(("agent", id(event.agent), id(event.task)), "start", event,
+                       f"agent {event.agent.role}", "agent", {"task": _task_label(event.task)})
+
+        @bus.on(AgentExecutionCompletedEvent)
+        def agent_completed(source, event):
+            self._mark(("agent", id(event.agent), id(event.task)), "end", event,
+                       f"agent {event.agent.role}", "agent")
+
+        @bus.on(AgentExecutionErrorEvent)
+        def agent_failed(source, event):
+            self._mark(("agent", id(event.agent), id(event.task)), "end", event,
+                       f"agent {event.agent.role}", "agent", {"error": event.error})
+
+        self._registered = True
+
+    def _on_record(self, record: Dict[str, Any]):
+        if record.get("start") is None:
+            return
+        with self._lock:
+            self._spans.append(call_span(record))
+
+    def spans(self, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return completed spans, optionally for one run"""
+        with self._lock:
+            return [s for s in self._spans if run_id is None or s["run_id"] == run_id]
+
+    def wait_closed(self, run_id: Optional[str] = None, timeout: float = 5.0, settle: float = 0.1) -> bool:
+        """
+        Wait until the crew span of a run is closed and no events arrived for `settle` seconds
+
+        Bus handlers run on a thread pool and can be delayed or reordered, so
+        the end of kickoff does not mean every span has been recorded yet.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                crew_closed = any(s["cat"] == "crew" and s["run_id"] == run_id for s in self._spans)
+                still_open = any(run_id is None or s["run_id"] == run_id for s in self._open.values())
+                last_mark = max(self._last_mark.values(), default=0.0) if run_id is None else self._last_mark.get(run_id, 0.0)
+                quiet = time.monotonic() - last_mark >= settle
+            if (crew_closed or run_id is None) and not still_open and quiet:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def export(self, path: str, run_id: Optional[str] = None) -> Path:
+        """
+        Write the spans as a Chrome Trace Event JSON file
+
+        Args:
+            path: Output file
+            run_id: Only export spans of this run (default: all runs)
+
+        Returns:
+            Path to the written trace
+        """
+        self.wait_closed(run_id)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(to_chrome_trace(self.spans(run_id)), f, default=str)
+        with self._lock:
+            self._spans = [s for s in self._spans if run_id is not None and s["run_id"] != run_id]
+            if run_id is None:
+                self._last_mark.clear()
+            else:
+                self._last_mark.pop(run_id, None)
+        return path
+
+
+def iteration_spans(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Derive agent iteration spans: each task LLM call and the calls that follow it"""
+    iterations = []
+    by_task: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        if span["cat"] in ("llm", "tool"):
+            by_task[(span["run_id"], span["args"].get("task"))].append(span)
+
+    for (run_id, task), calls in by_task.items():
+        calls.sort(key=lambda s: s["start"])
+        current, count = None, 0
+        for span in calls:
+            if span["cat"] == "llm":
+                count += 1
+                current = {"run_id": run_id, "name": f"iteration {count}", "cat": "iteration",
+                           "start": span["start"], "end": span["end"], "args": {"task": task}}
+                iterations.append(current)
+            elif current is not None:
+                current["end"] = max(current["end"], span["end"])
+    return iterations
+
+
+def task_spans_from_calls(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Derive task spans from call spans, for traces built from call records only"""
+    bounds: Dict[tuple, List[float]] = {}
+    for span in spans:
+        key = (span["run_id"], span["args"].get("task"))
+        start, end = bounds.get(key, (span["start"], span["end"]))
+        bounds[key] = [min(start, span["start"]), max(end, span["end"])]
+    return [
+        {"run_id": run_id, "name": f"task {task}", "cat": "task", "start": start, "end": end, "args": {}}
+        for (run_id, task), (start, end) in bounds.items()
+    ]
+
+
+def to_chrome_trace(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert spans to the Chrome Trace Event format
+
+    Each run is a process; crew, task, agent, iteration and call spans nest on
+    a single track per run.
+
+    Args:
+        spans: Spans with run_id, name, cat, start, end (epoch seconds) and args
+
+    Returns:
+        Trace document with traceEvents
+    """
+    spans = spans + iteration_spans(spans)
+    if not any(s["cat"] == "task" for s in spans):
+        spans += task_spans_from_calls([s for s in spans if s["cat"] in ("llm", "tool", "conversion")])
+
+    pids: Dict[Optional[str], int] = {}
+    events = []
+    # Outer spans first so viewers nest spans with equal start times correctly
+    depth = {"crew": 0, "task": 1, "agent": 2, "iteration": 3, "llm": 4, "tool": 4, "conversion": 4}
+    for span in sorted(spans, key=lambda s: (s["start"], depth.get(s["cat"], 5))):
+        pid = pids.setdefault(span["run_id"], len(pids) + 1)
+        events.append({
+            "name": span["name"],
+            "cat": span["cat"],
+            "ph": "X",
+            "ts": round(span["start"] * 1e6),
+            "dur": max(1, round((span["end"] - span["start"]) * 1e6)),
+            "pid": pid,
+            "tid": 1,
+            "args": span["args"],
+        })
+    for run_id, pid in pids.items():
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"run {run_id}"}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def time_breakdown(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    Split each task's wall time into LLM, tool, conversion and other (framework) time
+
+    Args:
+        spans: Spans of one or more runs
+
+    Returns:
+        Mapping of task name to seconds per category
+    """
+    tasks = {s["name"].removeprefix("task "): s for s in spans if s["cat"] == "task"}
+    if not tasks:
+        tasks = {s["name"].removeprefix("task "): s for s in task_spans_from_calls(
+            [s for s in spans if s["cat"] in ("llm", "tool", "conversion")]
+        )}
+    breakdown = {}
+    for task, task_span in tasks.items():
+        stats = {"wall_s": task_span["end"] - task_span["start"], "llm_s": 0.0, "tool_s": 0.0, "conversion_s": 0.0}
+        for span in spans:
+            if span["cat"] in ("llm", "tool", "conversion") and span["args"].get("task") == task:
+                stats[f"{span['cat']}_s"] += span["end"] - span["start"]
+        stats["other_s"] = max(0.0, stats["wall_s"] - stats["llm_s"] - stats["tool_s"] - stats["conversion_s"])
+        breakdown[task] = {k: round(v, 3) for k, v in stats.items()}
+    return breakdown
+
+
+def load_call_spans(path: str, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read call records from a metrics JSONL file as spans"""
+    spans = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("start") is None or (run_id and record.get("run_id") != run_id):
+                continue
+            spans.append(call_span(record))
+    return spans
+
+
+tracer = ChromeTracer()
+if os.getenv("CREW_TRACE_DIR"):
+    tracer.enable()
+
+
+def export_run(run_id: str) -> Optional[Path]:
+    """Export the trace of a run to CREW_TRACE_DIR when tracing is enabled"""
+    if not tracer.enabled:
+        return None
+    return tracer.export(Path(os.getenv("CREW_TRACE_DIR", "traces")) / f"{run_id}.trace.json", run_id)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Build a trace offline from recorded call metrics"""
+    parser = argparse.ArgumentParser(description="Export call records as a Chrome/Perfetto trace")
+    parser.add_argument("records", help="Metrics JSONL file (e.g. metrics/calls.jsonl)")
+    parser.add_argument("--run", help="Only include this run ID")
+    parser.add_argument("-o", "--output", default="trace.json")
+    args = parser.parse_args(argv)
+
+    spans = load_call_spans(args.records, args.run)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(to_chrome_trace(spans), f, default=str)
+    print(f"📊 Wrote {len(spans)} call spans to {args.output}")
+    for task, stats in time_breakdown(spans).items():
+        print(f"   {task}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
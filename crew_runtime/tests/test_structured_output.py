@@ -0,0 +1,109 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from crew_runtime.structured_output import repair_json, validate_incrementally
+
+
+class Contact(BaseModel):
+    name: str
+    role: Optional[str] = None
+
+
+class Profile(BaseModel):
+    company: str
+    employees: int
+    growth: float
+    products: List[str]
+    summary: str
+    contacts: List[Contact] = []
+
+
+def test_valid_json_needs_no_repair():
+    assert repair_json('{"a": 1, "b": [true, null]}') == ({"a": 1, "b": [True, None]}, [])
+
+
+def test_fences_and_prose_are_stripped():
+    text = 'Here is the profile:\n```json\n{"a": "x } y", "b": {"c": 2}}\n```\nLet me know!'
+    assert repair_json(text) == ({"a": "x } y", "b": {"c": 2}}, ["extracted"])
+
+
+def test_trailing_commas_outside_strings():
+    value, repairs = repair_json('{"a": [1, 2,], "b": "keep ,] this",}')
+    assert value == {"a": [1, 2], "b": "keep ,] this"}
+    assert repairs == ["trailing_commas"]
+
+
+def test_python_literals_outside_strings():
+    value, repairs = repair_json('{"a": True, "b": None, "c": "None of it is False"}')
+    assert value == {"a": True, "b": None, "c": "None of it is False"}
+    assert repairs == ["python_literals"]
+
+
+def test_truncated_answer_is_closed():
+    value, repairs = repair_json('{"a": [1, 2], "b": {"c": "unfinished')
+    assert value == {"a": [1, 2], "b": {"c": "unfinished"}}
+    assert repairs == ["closed_truncated"]
+
+
+def test_dangling_key_is_closed_with_null():
+    value, _ = repair_json('{"a": 1, "b":')
+    assert value == {"a": 1, "b": None}
+
+
+def test_single_quoted_python_dict():
+    value, repairs = repair_json("{'a': 'x', 'b': [1, 2]}")
+    assert value == {"a": "x", "b": [1, 2]}
+    assert repairs[-1] == "python_syntax"
+
+
+def test_unparseable_answer():
+    assert repair_json("I could not find any information.")[0] is None
+
+
+def test_valid_answer_validates_without_repairs():
+    text = '{"company": "Acme", "employees": 120, "growth": 0.2, "products": ["a"], "summary": "ok"}'
+    profile, errors, repairs = validate_incrementally(text, Profile)
+    assert profile == Profile(company="Acme", employees=120, growth=0.2, products=["a"], summary="ok")
+    assert (errors, repairs) == ([], [])
+
+
+def test_fields_are_coerced_where_the_intent_is_clear():
+    text = """```json
+    {
+        "company": "Acme",
+        "employees": "about 40 people",
+        "growth": "12.5%",
+        "products": "- Rockets\\n- Anvils",
+        "summary": ["Makes rockets", "Ships anvils"],
+        "contacts": [{"name": "Wile", "role": 7}],
+    }
+    ```"""
+    profile, errors, repairs = validate_incrementally(text, Profile)
+    assert errors == []
+    assert profile.employees == 40
+    assert profile.growth == 12.5
+    assert profile.products == ["Rockets", "Anvils"]
+    assert profile.summary == "Makes rockets; Ships anvils"
+    assert profile.contacts == [Contact(name="Wile", role="7")]
+    assert repairs[:2] == ["extracted", "trailing_commas"]
+    assert "coerced contacts.0.role" in repairs
+
+
+def test_single_line_string_becomes_a_one_item_list():
+    text = '{"company": "Acme", "employees": 3, "growth": 1, "products": "Rockets", "summary": "ok"}'
+    profile, _, _ = validate_incrementally(text, Profile)
+    assert profile.products == ["Rockets"]
+
+
+def test_unclear_field_is_reported_not_guessed():
+    text = '{"company": "Acme", "employees": "unknown", "growth": 1, "products": [], "summary": "ok"}'
+    profile, errors, _ = validate_incrementally(text, Profile)
+    assert profile is None
+    assert errors and errors[0].startswith("employees:")
+
+
+def test_answer_without_an_object():
+    profile, errors, _ = validate_incrementally('["Acme"]', Profile)
+    assert profile is None
+    assert errors == ["the answer does not contain a JSON object"]
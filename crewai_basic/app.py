@@ -1,7 +1,16 @@
 import json
 import os
 import uuid
-from crew_agent.job_screener_crew import JobScreenerCrew
+import argparse
+from typing import Optional
+from crew_agent.job_screener_crew import JobScreenerCrew, router, budgets
+from crew_runtime.checkpoint import TaskCheckpoints, execution_folder
+from crew_runtime.streaming import CrewStream
+from crew_runtime.instrumentation import metrics
+from crew_runtime.tracing import export_run
+from crew_runtime.rate_limiter import limiter
+from crew_runtime.telemetry import telemetry
+from crew_runtime.company_store import company_profiles
 
 
 def read_file(filename):
@@ -15,31 +24,97 @@ def write_json_file(data, filename):
         json.dump(data, f, indent=4)
 
 
-def run_crew():
-    job_title = read_file('input/job_role.txt')
-    company_website = read_file('input/company.txt')
-    job_description = read_file('input/job_description.txt')
-    resume = read_file('input/resume.txt')
+def task_result_writer(filename):
+    def write_task_result(event):
+        if event["kind"] != "task":
+            return
+        with open(filename, 'a') as f:
+            f.write(json.dumps({"task": event["task"], "elapsed_s": event["elapsed_s"], "output": event["output"]}) + "\n")
+        print(f"\n🌊 {event['task']} completed after {event['elapsed_s']}s: {filename}\n")
+    return write_task_result
 
-    input_data = {
-        "job_title": job_title,
-        "job_description": job_description,
-        "company_website": company_website,
-        "candidate_resume": resume
-    }
 
-    crew = JobScreenerCrew().crew()
-    result = crew.kickoff(inputs=input_data)
+def run_crew(run_id: Optional[str] = None, input_data: Optional[dict] = None, stream: bool = False) -> dict:
+    """
+    Screen a candidate for a job
+
+    Args:
+        run_id: ID of an earlier run to resume: its completed tasks are restored
+            from their checkpoints and its inputs are reused (default: new run)
+        input_data: job_title, job_description, company_website and
+            candidate_resume (default: read from the input folder)
+        stream: Append each task's result to output_<run_id>.jsonl as it
+            completes and print the summary as it is generated
+
+    Returns:
+        The screening summary
+    """
+    run_id = run_id or str(uuid.uuid4())
+    # Completed tasks are checkpointed under output/job_screener_<run_id>
+    checkpoints = TaskCheckpoints(execution_folder("output", "job_screener", run_id))
+    state = checkpoints.load_state()
+    if state:
+        input_data = state
+        print(f"♻️  Resuming run {run_id}")
+    elif input_data:
+        checkpoints.save_state(input_data)
+    else:
+        job_title = read_file('input/job_role.txt')
+        company_website = read_file('input/company.txt')
+        job_description = read_file('input/job_description.txt')
+        resume = read_file('input/resume.txt')
+
+        input_data = {
+            "job_title": job_title,
+            "job_description": job_description,
+            "company_website": company_website,
+            "candidate_resume": resume
+        }
+        checkpoints.save_state(input_data)
+
+    crew = checkpoints.attach(JobScreenerCrew().crew())
+    summary_stream = None
+    if stream:
+        summary_stream = CrewStream(field="summary", echo=True)
+        summary_stream.add_listener(task_result_writer(f'output_{run_id}.jsonl'))
+        summary_stream.attach(crew)
+    try:
+        with metrics.run(run_id):
+            result = crew.kickoff(inputs=input_data)
+    finally:
+        if summary_stream:
+            summary_stream.close()
     pydantic_dict = result.pydantic.model_dump()
-    file_name = f'output_{str(uuid.uuid4())}.json'
+    file_name = f'output_{run_id}.json'
     write_json_file(pydantic_dict, file_name)
+    # The run succeeded and its result is written: its checkpoints (inputs and task outputs) are no longer needed
+    checkpoints.clear()
     print("\n" + "=" * 60)
     print(f"🧠 Research Crew Result: {file_name}")
     print("=" * 60)
     print("Usage Statistics:")
     print(result.token_usage)
+    metrics.print_summary(run_id)
+    if summary_stream:
+        stats = summary_stream.stats()
+        print(f"🌊 First output after {stats['first_output_s']}s, first summary text after "
+              f"{stats['first_token_s']}s ({stats['tokens']} chunks, {stats['resets']} restarts)")
+    limiter.print_stats()
+    router.print_stats()
+    budgets.print_stats()
+    telemetry.print_stats()
+    company_profiles.print_stats()
+    trace_path = export_run(run_id)
+    if trace_path:
+        print(f"🧭 Trace saved to: {trace_path}")
     print("=" * 60)
 
+    return pydantic_dict
+
 
 if __name__ == "__main__":
-    run_crew()
+    parser = argparse.ArgumentParser(description="Screen a candidate for a job")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a failed run from its first incomplete task")
+    parser.add_argument("--stream", action="store_true", help="Write task results and print the summary as they are generated")
+    args = parser.parse_args()
+    run_crew(run_id=args.resume, stream=args.stream)
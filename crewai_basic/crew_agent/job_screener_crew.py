@@ -1,10 +1,18 @@
 import os
-import agentops
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
 from crewai_tools import ParallelSearchTool, SerperDevTool
 from crewai import LLM
 
+from crew_runtime.instrumentation import instrument_llm
+from crew_runtime.company_store import company_profiles, company_overview
+from crew_runtime.model_router import ModelRouter
+from crew_runtime.task_budget import TaskBudgets
+from crew_runtime.prompt_cache import cache_prompts
+from crew_runtime.streaming import stream_llm
+from crew_runtime.telemetry import VERBOSE
+from crew_runtime.structured_output import structured_output_converter
+from crew_runtime.rate_limiter import limit_llm, limit_tool
 from crew_agent.output_models import (
     CrewOutputSummary,
     InterviewPreparationTips,
@@ -15,10 +23,10 @@ from crew_agent.output_models import (
 
 def load_llm(model_name: str) -> LLM | None:
     try:
-        return LLM(
+        return limit_llm(instrument_llm(cache_prompts(stream_llm(LLM(
             model=model_name,
             api_key=os.getenv('OPENROUTER_API_KEY'),
-            base_url='https://openrouter.ai/api/v1',
+            base_url=os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
             temperature=0.7,
             additional_params={
                 "default_headers": {
@@ -26,7 +34,7 @@ def load_llm(model_name: str) -> LLM | None:
                     "X-Title": "CrewAI App"
                 }
             }
-        )
+        )))))
     except Exception as e:
         print(f"Error loading LLM for model {model_name}: {str(e)}")
         return None
@@ -46,7 +54,13 @@ Anthropic Model
 CLAUDE_MODEL = 'openrouter/anthropic/claude-sonnet-4-5-20250929'
 # CLAUDE_MODEL = 'openrouter/anthropic/claude-opus-4.5'
 claude = load_llm(CLAUDE_MODEL)
-claude_base = LLM(model='claude-sonnet-4-5-20250929', api_key=os.getenv('ANTHROPIC_API_KEY'))
+claude_base = limit_llm(instrument_llm(cache_prompts(stream_llm(LLM(
+    model='claude-sonnet-4-5-20250929',
+    api_key=os.getenv('ANTHROPIC_API_KEY'),
+    base_url=os.getenv('ANTHROPIC_BASE_URL'),
+    # 429s and transient errors are retried by the shared rate limiter
+    max_retries=0
+)))))
 
 """
 Gemini Model
@@ -56,7 +70,31 @@ GEMINI_MODEL = 'openrouter/google/gemini-2.5-pro'
 # GEMINI_MODEL = 'openrouter/google/gemini-2.5-flash'
 gemini = load_llm(GEMINI_MODEL)
 
-agentops.init()
+# Cheaper and faster route for lightweight tasks (see `routing` in tasks.yaml)
+GEMINI_FLASH_MODEL = 'openrouter/google/gemini-2.5-flash'
+gemini_flash = load_llm(GEMINI_FLASH_MODEL)
+
+"""
+Model Routing
+"""
+# Agents keep their LLM; each call is dispatched by the task's routing policy
+router = ModelRouter(
+    routes={
+        "claude_base": claude_base,
+        "claude": claude,
+        "gemini": gemini,
+        "gemini_flash": gemini_flash,
+        "openai": openai,
+    },
+    # Claude through Anthropic and through OpenRouter serve the same model
+    equivalents={"claude_base": ["claude"], "claude": ["claude_base"]},
+)
+
+"""
+Task Budgets
+"""
+# Tool call, token and deadline limits per task (see `budget` in tasks.yaml)
+budgets = TaskBudgets(router.routes)
 
 
 @CrewBase
@@ -64,13 +102,35 @@ class JobScreenerCrew:
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
 
+    @before_kickoff
+    def load_company_profile(self, inputs: dict) -> dict:
+        """Give the job profile the stored research of the company, instead of a web search"""
+        inputs = dict(inputs or {})
+        analyst, profile_task = self.job_analyst(), self.job_profiler_task()
+        if not hasattr(self, "_analyst_tools"):
+            self._analyst_tools = list(analyst.tools or [])
+        entry = company_profiles.get(inputs.get("company_website"))
+        inputs["company_profile"] = (
+            "Company profile from earlier research (use it for the company overview, "
+            f"no web search is needed):\n{company_overview(entry['profile'])}"
+        ) if entry else ""
+        # The search tool only served the company overview (the task holds a copy of the agent's tools);
+        # a rerun of the same crew gets it back on a miss
+        tools = [] if entry else list(self._analyst_tools)
+        object.__setattr__(analyst, "tools", tools)
+        object.__setattr__(profile_task, "tools", list(tools))
+        return inputs
+
     @agent
     def job_analyst(self) -> Agent:
         return Agent(
             config=self.agents_config['job_analyst'],
             llm=claude_base,
-            tools=[SerperDevTool()],
-            verbose=True,
+            tools=[limit_tool(
+                SerperDevTool(base_url=os.getenv('SERPER_BASE_URL', 'https://google.serper.dev')),
+                'serper', os.getenv('SERPER_API_KEY')
+            )],
+            verbose=VERBOSE,
             memory=False
         )
 
@@ -79,8 +139,11 @@ class JobScreenerCrew:
         return Agent(
             config=self.agents_config['candidate_screener'],
             llm=claude_base,
-            tools=[ParallelSearchTool()],
-            verbose=True,
+            tools=[limit_tool(
+                ParallelSearchTool(search_url=os.getenv('PARALLEL_SEARCH_URL', 'https://api.parallel.ai/v1beta/search')),
+                'parallel', os.getenv('PARALLEL_API_KEY')
+            )],
+            verbose=VERBOSE,
             memory=False
         )
 
@@ -89,7 +152,7 @@ class JobScreenerCrew:
         return Agent(
             config=self.agents_config['interview_coordinator'],
             llm=claude_base,
-            verbose=True,
+            verbose=VERBOSE,
             memory=False
         )
 
@@ -98,16 +161,17 @@ class JobScreenerCrew:
         return Agent(
             config=self.agents_config['hiring_manager'],
             llm=claude_base,
-            verbose=True,
+            verbose=VERBOSE,
             memory=False
         )
 
     @task
-    def job_profile_task(self) -> Task:
+    def job_profiler_task(self) -> Task:
         return Task(
             config=self.tasks_config['job_profiler_task'],
             agent=self.job_analyst(),
-            output_pydantic=JobProfiler
+            output_pydantic=JobProfiler,
+            converter_cls=structured_output_converter()
         )
 
     @task
@@ -115,17 +179,19 @@ class JobScreenerCrew:
         return Task(
             config=self.tasks_config['job_screening_task'],
             agent=self.candidate_screener(),
-            context=[self.job_profile_task()],
-            output_pydantic=JobCandidateProfile
+            context=[self.job_profiler_task()],
+            output_pydantic=JobCandidateProfile,
+            converter_cls=structured_output_converter()
         )
 
     @task
-    def interview_prep_task(self) -> Task:
+    def job_interview_prep_task(self) -> Task:
         return Task(
             config=self.tasks_config['job_interview_prep_task'],
             agent=self.interview_coordinator(),
             context=[self.job_screening_task()],
-            output_pydantic=InterviewPreparationTips
+            output_pydantic=InterviewPreparationTips,
+            converter_cls=structured_output_converter()
         )
 
     @task
@@ -133,16 +199,19 @@ class JobScreenerCrew:
         return Task(
             config=self.tasks_config['final_summary_task'],
             agent=self.hiring_manager(),
-            context=[self.job_screening_task(), self.interview_prep_task()],
-            output_pydantic=CrewOutputSummary
+            context=[self.job_screening_task(), self.job_interview_prep_task()],
+            output_pydantic=CrewOutputSummary,
+            converter_cls=structured_output_converter()
         )
 
     @crew
     def crew(self) -> Crew:
+        router.configure_tasks(self.tasks, self.tasks_config)
+        budgets.configure_tasks(self.tasks, self.tasks_config)
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            verbose=VERBOSE,
             memory=False,
         )
@@ -0,0 +1,50 @@
+import os
+import argparse
+from app import run_crew, read_file
+from crew_agent.job_screener_crew import JobScreenerCrew
+from crew_runtime.service import CrewService, cache_configs
+
+
+cache_configs(JobScreenerCrew)
+
+# Inputs a job does not provide are read from the input folder
+DEFAULT_INPUTS = {
+    "job_title": read_file('input/job_role.txt'),
+    "job_description": read_file('input/job_description.txt'),
+    "company_website": read_file('input/company.txt'),
+    "candidate_resume": read_file('input/resume.txt')
+}
+
+
+def screen_candidate(inputs: dict, job_id: str) -> dict:
+    """Run JobScreenerCrew for a job, with the job ID as run ID"""
+    return run_crew(run_id=job_id, input_data={**DEFAULT_INPUTS, **inputs})
+
+
+def warm_up():
+    """Build a crew once, so agents, tools and configs are loaded before the first job"""
+    JobScreenerCrew().crew()
+
+
+def run_service():
+    """Serve JobScreenerCrew runs from warm workers"""
+    parser = argparse.ArgumentParser(description="Serve candidate screenings over a local HTTP API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8700, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Jobs running at the same time")
+    parser.add_argument("--queue-size", type=int, default=64, help="Jobs waiting before submissions are rejected")
+    parser.add_argument("--processes", action="store_true", help="Run each worker in its own process")
+    args = parser.parse_args()
+
+    service = CrewService(
+        runners={"job_screener": screen_candidate},
+        workers=args.workers,
+        queue_size=args.queue_size,
+        processes=args.processes,
+        warmup=warm_up
+    )
+    service.run(args.host, args.port)
+
+
+if __name__ == "__main__":
+    run_service()
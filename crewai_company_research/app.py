@@ -1,5 +1,15 @@
 import os
-from crew_agent.company_research_crew import CompanyResearchCrew
+import uuid
+import argparse
+from typing import Optional
+from crew_agent.company_research_crew import CompanyResearchCrew, router, budgets
+from crew_runtime.checkpoint import TaskCheckpoints, execution_folder
+from crew_runtime.streaming import CrewStream
+from crew_runtime.instrumentation import metrics
+from crew_runtime.tracing import export_run
+from crew_runtime.rate_limiter import limiter
+from crew_runtime.telemetry import telemetry
+from crew_runtime.company_store import company_profiles
 
 
 def write_markdown_file(content, filename):
@@ -7,48 +17,118 @@ def write_markdown_file(content, filename):
         f.write(content)
 
 
-def run_crew(company_name: str):
+def print_task_result(event: dict):
+    if event["kind"] == "task":
+        print(f"\n🌊 {event['task']} completed after {event['elapsed_s']}s\n")
+
+
+def run_crew(company_name: Optional[str] = None, run_id: Optional[str] = None, stream: bool = False):
     """
     Run company research crew for a given company name.
 
     Args:
         company_name: Name of the company to research
+        run_id: ID of an earlier run to resume: its completed tasks are restored
+            from their checkpoints and its company name is reused (default: new run)
+        stream: Write the report to its file and stdout as it is generated; the
+            file is rewritten with the validated report once the crew finishes
     """
-    input_data = {
-        "company_name": company_name
-    }
+    run_id = run_id or str(uuid.uuid4())
+    # Completed tasks are checkpointed under output/company_research_<run_id>
+    checkpoints = TaskCheckpoints(execution_folder("output", "company_research", run_id))
+    input_data = checkpoints.load_state()
+    if input_data:
+        company_name = input_data["company_name"]
+        print(f"♻️  Resuming run {run_id}")
+    elif company_name:
+        input_data = {
+            "company_name": company_name
+        }
+        checkpoints.save_state(input_data)
+    else:
+        raise ValueError(f"No company name given and no checkpoint found for run {run_id}")
 
     print(f"\n{'=' * 60}")
     print(f"🔍 Starting research for: {company_name}")
     print(f"{'=' * 60}\n")
 
-    crew = CompanyResearchCrew().crew()
-    result = crew.kickoff(inputs=input_data)
+    file_name = f'output/{company_name.replace(" ", "_").lower()}_report.md'
+    os.makedirs('output', exist_ok=True)
+    crew = checkpoints.attach(CompanyResearchCrew().crew())
+    report_stream = None
+    if stream:
+        report_stream = CrewStream(field="markdown_report", output_path=file_name, echo=True)
+        report_stream.add_listener(print_task_result)
+        report_stream.attach(crew)
+    try:
+        with metrics.run(run_id):
+            result = crew.kickoff(inputs=input_data)
+    finally:
+        if report_stream:
+            report_stream.close()
 
     # Get the markdown report from the result
     markdown_report = result.pydantic.markdown_report
 
     # Save the markdown report
-    file_name = f'output/{company_name.replace(" ", "_").lower()}_report.md'
-    os.makedirs('output', exist_ok=True)
     write_markdown_file(markdown_report, file_name)
+    # The run succeeded and its report is written: its checkpoints are no longer needed
+    checkpoints.clear()
 
     print(f"\n{'=' * 60}")
     print(f"✅ Research Complete!")
     print(f"📄 Report saved to: {file_name}")
+    print(f"📋 Run ID: {run_id}")
     print(f"{'=' * 60}")
     print("\n📊 Usage Statistics:")
     print(result.token_usage)
+    metrics.print_summary(run_id)
+    if report_stream:
+        stats = report_stream.stats()
+        print(f"🌊 First output after {stats['first_output_s']}s, first report text after "
+              f"{stats['first_token_s']}s ({stats['tokens']} chunks, {stats['resets']} restarts)")
+    limiter.print_stats()
+    router.print_stats()
+    budgets.print_stats()
+    telemetry.print_stats()
+    company_profiles.print_stats()
+    trace_path = export_run(run_id)
+    if trace_path:
+        print(f"🧭 Trace saved to: {trace_path}")
     print(f"{'=' * 60}\n")
 
     return markdown_report
 
 
+async def stream_research(company_name: str):
+    """
+    Research a company and yield its progress, for embedding in async applications
+
+    Args:
+        company_name: Name of the company to research
+
+    Yields:
+        The stream's task, token and reset events, then a done event whose
+        result is the crew output (see crew_runtime.streaming)
+    """
+    stream = CrewStream(field="markdown_report")
+    async for event in stream.astream(CompanyResearchCrew().crew(), {"company_name": company_name}):
+        yield event
+
+
 if __name__ == "__main__":
-    # Example usage - replace with your company name
-    # company_name = input("Enter company name to research: ").strip()
-    company_name = "HubSpot hubspot.com" # For testing purposes
-    if company_name:
-        run_crew(company_name)
+    parser = argparse.ArgumentParser(description="Research a company")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a failed run from its first incomplete task")
+    parser.add_argument("--stream", action="store_true", help="Print task results and the report as they are generated")
+    args = parser.parse_args()
+
+    if args.resume:
+        run_crew(run_id=args.resume, stream=args.stream)
     else:
-        print("Please provide a company name!")
+        # Example usage - replace with your company name
+        # company_name = input("Enter company name to research: ").strip()
+        company_name = "HubSpot hubspot.com" # For testing purposes
+        if company_name:
+            run_crew(company_name, stream=args.stream)
+        else:
+            print("Please provide a company name!")
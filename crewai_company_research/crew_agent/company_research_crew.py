@@ -1,10 +1,19 @@
 import os
-import agentops
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
 from crewai_tools import ParallelSearchTool, SerperDevTool
 from crewai import LLM
-
+from crewai.tasks.task_output import TaskOutput
+
+from crew_runtime.instrumentation import instrument_llm
+from crew_runtime.company_store import company_profiles
+from crew_runtime.model_router import ModelRouter
+from crew_runtime.task_budget import TaskBudgets
+from crew_runtime.prompt_cache import cache_prompts
+from crew_runtime.streaming import stream_llm
+from crew_runtime.telemetry import VERBOSE
+from crew_runtime.structured_output import structured_output_converter
+from crew_runtime.rate_limiter import limit_llm, limit_tool
 from crew_agent.output_models import (
     CompanyResearchData,
     CompanyResearchReport
@@ -13,10 +22,10 @@ from crew_agent.output_models import (
 
 def load_llm(model_name: str) -> LLM | None:
     try:
-        return LLM(
+        return limit_llm(instrument_llm(cache_prompts(stream_llm(LLM(
             model=model_name,
             api_key=os.getenv('OPENROUTER_API_KEY'),
-            base_url='https://openrouter.ai/api/v1',
+            base_url=os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
             temperature=0.7,
             additional_params={
                 "default_headers": {
@@ -24,7 +33,7 @@ def load_llm(model_name: str) -> LLM | None:
                     "X-Title": "CrewAI App"
                 }
             }
-        )
+        )))))
     except Exception as e:
         print(f"Error loading LLM for model {model_name}: {str(e)}")
         return None
@@ -44,7 +53,13 @@ Anthropic Model
 CLAUDE_MODEL = 'openrouter/anthropic/claude-sonnet-4-5-20250929'
 # CLAUDE_MODEL = 'openrouter/anthropic/claude-opus-4.5'
 claude = load_llm(CLAUDE_MODEL)
-claude_base = LLM(model='claude-sonnet-4-5-20250929', api_key=os.getenv('ANTHROPIC_API_KEY'))
+claude_base = limit_llm(instrument_llm(cache_prompts(stream_llm(LLM(
+    model='claude-sonnet-4-5-20250929',
+    api_key=os.getenv('ANTHROPIC_API_KEY'),
+    base_url=os.getenv('ANTHROPIC_BASE_URL'),
+    # 429s and transient errors are retried by the shared rate limiter
+    max_retries=0
+)))))
 
 """
 Gemini Model
@@ -54,21 +69,66 @@ GEMINI_MODEL = 'openrouter/google/gemini-2.5-pro'
 # GEMINI_MODEL = 'openrouter/google/gemini-2.5-flash'
 gemini = load_llm(GEMINI_MODEL)
 
-agentops.init()
+# Cheaper and faster route for lightweight tasks (see `routing` in tasks.yaml)
+GEMINI_FLASH_MODEL = 'openrouter/google/gemini-2.5-flash'
+gemini_flash = load_llm(GEMINI_FLASH_MODEL)
+
+"""
+Model Routing
+"""
+# Agents keep their LLM; each call is dispatched by the task's routing policy
+router = ModelRouter(
+    routes={
+        "claude_base": claude_base,
+        "claude": claude,
+        "gemini": gemini,
+        "gemini_flash": gemini_flash,
+        "openai": openai,
+    },
+    # Claude through Anthropic and through OpenRouter serve the same model
+    equivalents={"claude_base": ["claude"], "claude": ["claude_base"]},
+)
+
+"""
+Task Budgets
+"""
+# Tool call, token and deadline limits per task (see `budget` in tasks.yaml)
+budgets = TaskBudgets(router.routes)
 
 
 @CrewBase
 class CompanyResearchCrew:
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
+    company_input: str = ""
+
+    @before_kickoff
+    def remember_company(self, inputs: dict) -> dict:
+        # The research input (e.g. "HubSpot hubspot.com") is another key of the stored profile
+        self.company_input = (inputs or {}).get("company_name", "")
+        return inputs
+
+    def store_company_profile(self, output: TaskOutput):
+        """Share the research data with the other crews through the company profile store"""
+        if isinstance(output.pydantic, CompanyResearchData):
+            company_profiles.put(output.pydantic.model_dump(mode="json"), domains=[self.company_input])
 
     @agent
     def company_researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['company_researcher'],
             llm=gemini,
-            tools=[SerperDevTool(), ParallelSearchTool()],
-            verbose=True,
+            tools=[
+                limit_tool(
+                    SerperDevTool(base_url=os.getenv('SERPER_BASE_URL', 'https://google.serper.dev')),
+                    'serper', os.getenv('SERPER_API_KEY')
+                ),
+                limit_tool(
+                    ParallelSearchTool(search_url=os.getenv('PARALLEL_SEARCH_URL', 'https://api.parallel.ai/v1beta/search')),
+                    'parallel', os.getenv('PARALLEL_API_KEY')
+                )
+            ],
+            verbose=VERBOSE,
             memory=False
         )
 
@@ -77,33 +137,38 @@ class CompanyResearchCrew:
         return Agent(
             config=self.agents_config['report_compiler'],
             llm=claude_base,
-            verbose=True,
+            verbose=VERBOSE,
             memory=False
         )
 
     @task
-    def research_task(self) -> Task:
+    def company_research_task(self) -> Task:
         return Task(
             config=self.tasks_config['company_research_task'],
             agent=self.company_researcher(),
-            output_pydantic=CompanyResearchData
+            output_pydantic=CompanyResearchData,
+            converter_cls=structured_output_converter(),
+            callback=self.store_company_profile
         )
 
     @task
-    def report_task(self) -> Task:
+    def report_generation_task(self) -> Task:
         return Task(
             config=self.tasks_config['report_generation_task'],
             agent=self.report_compiler(),
-            context=[self.research_task()],
-            output_pydantic=CompanyResearchReport
+            context=[self.company_research_task()],
+            output_pydantic=CompanyResearchReport,
+            converter_cls=structured_output_converter()
         )
 
     @crew
     def crew(self) -> Crew:
+        router.configure_tasks(self.tasks, self.tasks_config)
+        budgets.configure_tasks(self.tasks, self.tasks_config)
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            verbose=VERBOSE,
             memory=False,
         )
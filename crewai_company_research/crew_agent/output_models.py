@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+from crew_runtime.output_models import NOT_AVAILABLE
+
 
 class CompanyResearchData(BaseModel):
     """Comprehensive company research data"""
@@ -11,7 +13,7 @@ class CompanyResearchData(BaseModel):
     employee_count: str = Field(description="Approximate number of employees")
     founded_year: str = Field(description="Year the company was founded")
     company_type: str = Field(description="Type of company (e.g., Public, Private, Startup)")
-    revenue: Optional[str] = Field(default="Not available", description="Company revenue information if available")
+    revenue: Optional[str] = Field(default=NOT_AVAILABLE, description="Company revenue information if available")
     latest_news: List[str] = Field(description="Recent news articles or updates about the company")
     product_summary: str = Field(description="Summary of main products or services offered")
     competitors: List[str] = Field(description="List of main competitors")
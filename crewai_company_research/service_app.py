@@ -0,0 +1,43 @@
+import os
+import argparse
+from app import run_crew
+from crew_agent.company_research_crew import CompanyResearchCrew
+from crew_runtime.service import CrewService, cache_configs
+
+
+cache_configs(CompanyResearchCrew)
+
+
+def research_company(inputs: dict, job_id: str) -> dict:
+    """Research the job's company_name, with the job ID as run ID"""
+    markdown_report = run_crew(company_name=inputs.get("company_name"), run_id=job_id)
+    return {"company_name": inputs.get("company_name"), "markdown_report": markdown_report}
+
+
+def warm_up():
+    """Build a crew once, so agents, tools and configs are loaded before the first job"""
+    CompanyResearchCrew().crew()
+
+
+def run_service():
+    """Serve CompanyResearchCrew runs from warm workers"""
+    parser = argparse.ArgumentParser(description="Serve company research over a local HTTP API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8701, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Jobs running at the same time")
+    parser.add_argument("--queue-size", type=int, default=64, help="Jobs waiting before submissions are rejected")
+    parser.add_argument("--processes", action="store_true", help="Run each worker in its own process")
+    args = parser.parse_args()
+
+    service = CrewService(
+        runners={"company_research": research_company},
+        workers=args.workers,
+        queue_size=args.queue_size,
+        processes=args.processes,
+        warmup=warm_up
+    )
+    service.run(args.host, args.port)
+
+
+if __name__ == "__main__":
+    run_service()
@@ -1,6 +1,16 @@
 from datetime import datetime
-from crew_agent.composio_crew import ComposioAgentCrew
+from typing import Optional
+import os
+import argparse
+from crew_agent.composio_crew import ComposioAgentCrew, compactor, load_calendar, toolset, router, budgets
+from crew_agent.calendar_engine import CalendarEngine
+from crew_runtime.checkpoint import TaskCheckpoints
+from crew_agent.doc_publisher import DocPublisher
+from crew_runtime.instrumentation import metrics
 from crew_agent.storage_manager import StorageManager
+from crew_runtime.tracing import export_run
+from crew_runtime.rate_limiter import limiter
+from crew_runtime.telemetry import telemetry
 from crew_agent.output_models import CrewExecutionResult, TokenUsage
 import uuid
 
@@ -36,68 +46,111 @@ def parse_task_outputs(crew_output) -> tuple[dict, dict]:
     return task_outputs, raw_outputs
 
 
-def extract_token_usage(crew_output) -> tuple[TokenUsage, dict]:
+def extract_token_usage(crew_output, run_id: Optional[str] = None) -> tuple[TokenUsage, dict]:
     """
-    Extract token usage information from crew output
+    Extract token usage from the LLM calls recorded during the run
 
     Args:
         crew_output: The output from crew.kickoff()
+        run_id: Run the LLM calls were recorded under
 
     Returns:
         Tuple of (total_token_usage, task_token_usage_dict)
     """
-    total_usage = TokenUsage(
-        prompt_tokens=0,
-        completion_tokens=0,
-        total_tokens=0,
-        model_name="claude-sonnet-4-5-20250929"
-    )
+    task_usage = {
+        task_name: TokenUsage(**usage)
+        for task_name, usage in metrics.task_token_usage(run_id).items()
+    }
 
-    task_usage = {}
+    if task_usage:
+        models = sorted({u.model_name for u in task_usage.values() if u.model_name})
+        total_usage = TokenUsage(
+            prompt_tokens=sum(u.prompt_tokens for u in task_usage.values()),
+            completion_tokens=sum(u.completion_tokens for u in task_usage.values()),
+            total_tokens=sum(u.total_tokens for u in task_usage.values()),
+            model_name=", ".join(models) or None
+        )
+    else:
+        # No instrumented calls (e.g. metrics disabled); fall back to the crew totals
+        usage = getattr(crew_output, 'token_usage', None)
+        usage = usage.model_dump() if hasattr(usage, 'model_dump') else (usage or {})
+        total_usage = TokenUsage(
+            prompt_tokens=usage.get('prompt_tokens', 0),
+            completion_tokens=usage.get('completion_tokens', 0),
+            total_tokens=usage.get('total_tokens', 0)
+        )
 
-    # Extract token usage if available
-    if hasattr(crew_output, 'token_usage'):
-        usage = crew_output.token_usage
-        if isinstance(usage, dict):
-            total_usage = TokenUsage(
-                prompt_tokens=usage.get('prompt_tokens', 0),
-                completion_tokens=usage.get('completion_tokens', 0),
-                total_tokens=usage.get('total_tokens', 0),
-                model_name=usage.get('model_name', 'claude-sonnet-4-5-20250929')
-            )
+    return total_usage, task_usage
 
-    # Extract per-task usage if available
-    if hasattr(crew_output, 'tasks_output') and crew_output.tasks_output:
-        for task_output in crew_output.tasks_output:
-            task_name = task_output.name if hasattr(task_output, 'name') else "unknown"
-            if hasattr(task_output, 'token_usage'):
-                usage = task_output.token_usage
-                if isinstance(usage, dict):
-                    task_usage[task_name] = TokenUsage(
-                        prompt_tokens=usage.get('prompt_tokens', 0),
-                        completion_tokens=usage.get('completion_tokens', 0),
-                        total_tokens=usage.get('total_tokens', 0),
-                        model_name=usage.get('model_name', 'claude-sonnet-4-5-20250929')
-                    )
 
-    return total_usage, task_usage
+def run_crew_agent(
+    entity_id: Optional[str] = None,
+    base_output_dir: str = "outputs",
+    execution_id: Optional[str] = None,
+    catalog_path: Optional[str] = None
+) -> CrewExecutionResult:
+    """
+    Main function with storage manager integration
 
+    Args:
+        entity_id: Composio entity to run the assistant for (default: toolset entity)
+        base_output_dir: Base directory for the outputs of this entity
+        execution_id: ID of an earlier run to resume: its completed tasks are
+            restored from their checkpoints (default: new run)
+        catalog_path: Execution catalog to index the run in (default: catalog.db
+            in base_output_dir)
 
-def run_crew_agent():
-    """Main function with storage manager integration"""
+    Returns:
+        The saved execution result
+    """
     print("\n" + "=" * 60)
-    print("🚀 Starting Composio Crew")
+    print(f"🚀 Starting Composio Crew{f' for {entity_id}' if entity_id else ''}")
     print("=" * 60 + "\n")
 
-    # Prepare input data
-    current_date = datetime.now().strftime("%Y-%m-%d")
+    # Generate execution ID; LLM and tool calls are recorded under it
+    execution_id = execution_id or str(uuid.uuid4())
+
+    # Initialize storage manager; files are written by a background thread
+    storage_manager = StorageManager(base_output_dir=base_output_dir, background=True, catalog_path=catalog_path)
+
+    # Completed tasks are checkpointed in the execution folder
+    _, folder_path = storage_manager.create_execution_folder("daily_assistant", execution_id)
+    checkpoints = TaskCheckpoints(folder_path)
+
+    # A resumed run reuses the date and calendar of its first attempt
+    state = checkpoints.load_state()
+    if state:
+        print(f"♻️  Resuming execution {execution_id} from {state['current_date']}")
+        current_date = state["current_date"]
+        calendar_engine = CalendarEngine(time_zone=state["time_zone"])
+        calendar_analysis = CalendarEngine.load_analysis(state["calendar_analysis"])
+    else:
+        # Prepare input data
+        current_date = datetime.now().strftime("%Y-%m-%d")
+
+        # Calendar events are extracted locally; the LLM only writes the narrative summary
+        print("📅 Analyzing calendar...")
+        calendar_engine, calendar_analysis = load_calendar(current_date, entity_id=entity_id)
+        checkpoints.save_state({
+            "current_date": current_date,
+            "time_zone": calendar_engine.tz.key,
+            "calendar_analysis": CalendarEngine.dump_analysis(calendar_analysis),
+        })
+
     input_data = {
         "current_date": current_date,
+        "calendar_events": calendar_engine.render_context(calendar_analysis),
     }
 
     # Execute crew
     print("⏳ Running crew tasks...")
-    crew_result = ComposioAgentCrew().crew().kickoff(input_data)
+    try:
+        with metrics.run(execution_id):
+            crew = checkpoints.attach(ComposioAgentCrew(entity_id=entity_id).crew())
+            crew_result = crew.kickoff(input_data)
+    except BaseException:
+        compactor.forget(execution_id)
+        raise
 
     print("\n" + "=" * 60)
     print("🧠 Composio Crew Result")
@@ -105,23 +158,42 @@ def run_crew_agent():
     print(crew_result)
     print("\n")
 
-    # Initialize storage manager
-    storage_manager = StorageManager(base_output_dir="outputs")
-
-    # Generate execution ID
-    execution_id = str(uuid.uuid4())
-
     # Parse outputs
     task_outputs, raw_outputs = parse_task_outputs(crew_result)
 
     # Extract token usage
-    total_usage, task_usage = extract_token_usage(crew_result)
+    total_usage, task_usage = extract_token_usage(crew_result, execution_id)
 
     # Map task names to outputs
-    daily_calendar_output = task_outputs.get('daily_calendar_tasks') or task_outputs.get('daily_calendar')
+    calendar_summary = task_outputs.get('daily_calendar_tasks') or task_outputs.get('daily_calendar')
+    daily_calendar_output = calendar_engine.to_output(
+        calendar_analysis,
+        summary=calendar_summary.summary if calendar_summary else "",
+        todo_list=calendar_summary.todo_list if calendar_summary else None
+    )
     email_extraction_output = task_outputs.get('email_extraction_task') or task_outputs.get('email_extraction')
     summary_generator_output = task_outputs.get('summary_generator_task') or task_outputs.get('summary_generator')
 
+    # Append the summary to the cached Google Doc for the day (or week)
+    if summary_generator_output:
+        print("📄 Publishing summary to Google Docs...")
+        publisher = DocPublisher(
+            toolset,
+            base_dir=os.path.join(base_output_dir, "published"),
+            period=os.getenv("DAILY_DOC_PERIOD", "day"),
+            entity_id=entity_id
+        )
+        try:
+            summary_generator_output.google_docs_url = publisher.publish(summary_generator_output, current_date)
+        except Exception as e:
+            # The briefing is still saved; it links the period's document from an earlier publish, if any
+            print(f"❌ Failed to publish summary: {type(e).__name__}: {e}")
+            summary_generator_output.google_docs_url = publisher.cached_url(current_date)
+
+    # Compaction statistics of this run only; the records are dropped once summarized
+    tool_compaction = compactor.summary(execution_id)
+    compactor.forget(execution_id)
+
     # Create execution result with structured outputs
     execution_result = CrewExecutionResult(
         execution_id=execution_id,
@@ -136,22 +208,46 @@ def run_crew_agent():
             "agent_name": "personal_assistant",
             "status": "success",
             "final_output": str(crew_result),
-            "tasks_completed": list(task_outputs.keys())
+            "tasks_completed": list(task_outputs.keys()),
+            "tasks_restored": checkpoints.restored,
+            "entity_id": entity_id or toolset.entity_id,
+            "tool_compaction": tool_compaction,
+            "call_metrics": metrics.summary(execution_id)
         }
     )
 
-    # Save outputs
+    # Save outputs; once they are on disk, the run's checkpoints (date, calendar and
+    # task outputs) are no longer needed. A failed save keeps them for --resume
     print("💾 Saving outputs...")
     output_folder = storage_manager.save_crew_execution_result(
         folder_name="daily_assistant",
         execution_result=execution_result,
-        raw_outputs=raw_outputs
+        raw_outputs=raw_outputs,
+        on_saved=checkpoints.clear
     )
 
+    for action, stats in tool_compaction.items():
+        print(f"🗜️  {action}: {stats['tokens_before']} → {stats['tokens_after']} tokens over {stats['calls']} call(s)")
+
+    metrics.print_summary(execution_id)
+    limiter.print_stats()
+    router.print_stats()
+    budgets.print_stats()
+    telemetry.print_stats()
+    trace_path = export_run(execution_id)
+    if trace_path:
+        print(f"🧭 Trace saved to: {trace_path}")
+    save_stats = storage_manager.last_save_stats
+    print(f"💾 Serialized {save_stats['bytes_written']} bytes in {save_stats['serialize_ms']}ms")
     print(f"✅ Outputs saved to: {output_folder}")
     print(f"📋 Execution ID: {execution_id}")
     print("\n" + "=" * 60 + "\n")
 
+    return execution_result
+
 
 if __name__ == "__main__":
-    run_crew_agent()
+    parser = argparse.ArgumentParser(description="Run the daily assistant")
+    parser.add_argument("--resume", metavar="EXECUTION_ID", help="Resume a failed run from its first incomplete task")
+    args = parser.parse_args()
+    run_crew_agent(execution_id=args.resume)
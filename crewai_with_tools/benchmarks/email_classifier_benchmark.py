@@ -0,0 +1,67 @@
+"""
+Benchmark the local email pre-classifier against LLM labels
+
+Usage (from the crewai_with_tools directory):
+    python -m benchmarks.email_classifier_benchmark
+"""
+import json
+import time
+from pathlib import Path
+from collections import Counter
+
+from crew_agent.email_classifier import EmailClassifier, NEWSLETTER, PROMOTIONAL
+
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "labeled_emails.json"
+
+
+def evaluate(classifier: EmailClassifier, messages: list[dict]) -> dict:
+    """
+    Compare local classifications with the LLM labels of the fixture
+
+    Args:
+        classifier: Classifier under test
+        messages: Raw messages with an 'llm_label' key
+
+    Returns:
+        Dictionary with per-class precision and the share of messages resolved locally
+    """
+    predicted = Counter()
+    correct = Counter()
+    for message in messages:
+        email_type, _ = classifier.classify(message)
+        if email_type is None:
+            continue
+        predicted[email_type] += 1
+        if email_type == message["llm_label"]:
+            correct[email_type] += 1
+
+    resolved = sum(predicted.values())
+    return {
+        "precision": {
+            label: (correct[label] / predicted[label]) if predicted[label] else None
+            for label in (NEWSLETTER, PROMOTIONAL)
+        },
+        "overall_precision": (sum(correct.values()) / resolved) if resolved else None,
+        "resolved_locally": resolved,
+        "sent_to_llm": len(messages) - resolved,
+    }
+
+
+def measure_throughput(classifier: EmailClassifier, messages: list[dict], total: int = 20000) -> float:
+    """Return the number of messages classified per second"""
+    batch = (messages * (total // len(messages) + 1))[:total]
+    start = time.perf_counter()
+    classifier.partition(batch, summarize_bodies=False)
+    return total / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    with open(FIXTURE_PATH, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+
+    classifier = EmailClassifier()
+    report = evaluate(classifier, fixture)
+    report["messages_per_second"] = round(measure_throughput(classifier, fixture))
+
+    print(json.dumps(report, indent=2))
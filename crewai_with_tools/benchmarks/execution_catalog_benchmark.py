@@ -0,0 +1,91 @@
+"""
+Benchmark execution catalog queries on a large number of executions
+
+Usage (from the crewai_with_tools directory):
+    python -m benchmarks.execution_catalog_benchmark --executions 200000
+"""
+import json
+import time
+import uuid
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta
+
+from crew_agent.execution_catalog import ExecutionCatalog
+from crew_agent.output_models import CrewExecutionResult, TokenUsage
+
+
+TASKS = ("daily_calendar", "email_extraction", "summary_generator")
+
+
+def synthetic_entries(n: int, start: datetime):
+    """Generate upsert_many() entries for n executions spread over a year"""
+    rng = random.Random(0)
+    for i in range(n):
+        timestamp = start + timedelta(seconds=i * 365 * 86400 / n)
+        task_usage = {
+            task: TokenUsage(prompt_tokens=p, completion_tokens=c, total_tokens=p + c)
+            for task, p, c in ((t, rng.randint(500, 4000), rng.randint(100, 800)) for t in TASKS)
+        }
+        result = CrewExecutionResult(
+            execution_id=str(uuid.uuid4()),
+            timestamp=timestamp,
+            total_token_usage=TokenUsage(
+                prompt_tokens=sum(u.prompt_tokens for u in task_usage.values()),
+                completion_tokens=sum(u.completion_tokens for u in task_usage.values()),
+                total_tokens=sum(u.total_tokens for u in task_usage.values()),
+            ),
+            task_token_usage=task_usage,
+            metadata={
+                "current_date": timestamp.date().isoformat(),
+                "status": "success" if rng.random() > 0.02 else "failed",
+                "entity_id": f"user{rng.randint(0, 500)}@example.com",
+            }
+        )
+        yield (result.execution_id, f"outputs/daily_assistant_{result.execution_id}", result, {}, None)
+
+
+def timed(fn, repeat: int = 20) -> float:
+    """Median latency of fn in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(sorted(samples)[len(samples) // 2], 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--executions", type=int, default=200000)
+    args = parser.parse_args()
+
+    catalog = ExecutionCatalog(Path(tempfile.mkdtemp(prefix="catalog_bench_")) / "catalog.db")
+    start = datetime(2025, 1, 1)
+
+    insert_start = time.perf_counter()
+    batch = []
+    for entry in synthetic_entries(args.executions, start):
+        batch.append(entry)
+        if len(batch) == 5000:
+            catalog.upsert_many(batch)
+            batch = []
+    if batch:
+        catalog.upsert_many(batch)
+    insert_s = time.perf_counter() - insert_start
+
+    sample = catalog.last_runs(1)[0]
+    report = {
+        "executions": args.executions,
+        "bulk_insert_per_second": round(args.executions / insert_s),
+        "single_upsert_ms": timed(lambda: catalog.upsert(*next(synthetic_entries(1, start)))),
+        "last_10_ms": timed(lambda: catalog.last_runs(10)),
+        "last_10_failed_ms": timed(lambda: catalog.last_runs(10, status="failed")),
+        "runs_for_date_ms": timed(lambda: catalog.runs_for_date("2025-06-15")),
+        "get_ms": timed(lambda: catalog.get(sample["execution_id"])),
+        "tokens_by_month_ms": timed(lambda: catalog.token_totals("month"), repeat=5),
+        "tokens_by_task_last_week_ms": timed(lambda: catalog.token_totals("task", since="2025-12-24"), repeat=5),
+    }
+    print(json.dumps(report, indent=2))
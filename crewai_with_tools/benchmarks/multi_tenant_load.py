@@ -0,0 +1,102 @@
+"""
+Load test the multi-tenant runner with real assistant runs against local fakes
+
+Every user runs the full daily assistant (run_crew_agent: calendar analysis,
+crew kickoff, Docs publish and storage) with the LLM, Composio and search
+endpoints pointed at benchmarks/fake_services.py from the repository root, so
+the numbers include crew construction, tool calls, rate limiting and storage,
+not only the runner's scheduling. All users write to their own output folder
+and index their runs in one shared execution catalog, which is queried per
+entity at the end.
+
+Usage (from the crewai_with_tools directory):
+    python -m benchmarks.multi_tenant_load --users 64 --workers 16 --profile fast
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import importlib.util
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Rate limits generous enough that the fakes, not the limiter, set the pace
+LOAD_RATE_LIMITS = {
+    provider: {"rpm": None, "tpm": None, "max_concurrency": 64}
+    for provider in ("anthropic", "openrouter", "serper", "parallel", "composio")
+}
+
+
+def load_fake_services():
+    """Import benchmarks/fake_services.py from the repository root (this package has the same name)"""
+    spec = importlib.util.spec_from_file_location("fake_services", REPO_ROOT / "benchmarks" / "fake_services.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+if __name__ == "__main__":
+    fake_services = load_fake_services()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=64, help=f"At most {fake_services.MAX_BENCH_ENTITIES}")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--profile", choices=sorted(fake_services.PROFILES), default="fast")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for the simulated latencies")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of LLM calls delayed by --slow-s")
+    parser.add_argument("--slow-s", type=float, default=0.0, help="Extra latency of a slow LLM call")
+    parser.add_argument("--latency-slo", type=float, default=None, help="Per-user latency objective in seconds")
+    args = parser.parse_args()
+    if args.users > fake_services.MAX_BENCH_ENTITIES:
+        parser.error(f"the fake Composio has {fake_services.MAX_BENCH_ENTITIES} connected entities")
+
+    services = fake_services.FakeServices(
+        args.profile, args.time_scale, slow_rate=args.slow_rate, slow_s=args.slow_s
+    )
+    services.start()
+    work_dir = Path(tempfile.mkdtemp(prefix="multi_tenant_load_"))
+
+    # The crew modules read their endpoints and limits at import time
+    os.environ.update(services.env())
+    os.environ.update({
+        "CREW_RATE_LIMITS": json.dumps(LOAD_RATE_LIMITS),
+        "COMPOSIO_CACHE_DIR": str(work_dir / "composio_cache"),
+        "CREW_VERBOSE": "false",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "CREWAI_TRACING_ENABLED": "false",
+        "OTEL_SDK_DISABLED": "true",
+    })
+
+    from app import run_crew_agent
+    from crew_agent.execution_catalog import ExecutionCatalog, CATALOG_FILENAME
+    from crew_agent.multi_tenant import MultiTenantRunner
+    from crew_agent.storage_manager import get_background_writer
+
+    output_dir = work_dir / "users"
+    catalog_path = str(output_dir / CATALOG_FILENAME)
+    runner = MultiTenantRunner(
+        run_user=lambda entity_id, user_dir: run_crew_agent(
+            entity_id=entity_id, base_output_dir=user_dir, catalog_path=catalog_path
+        ),
+        base_output_dir=str(output_dir),
+        max_workers=args.workers,
+        latency_slo_s=args.latency_slo
+    )
+    try:
+        report = runner.run([fake_services.BENCH_ENTITY.format(i) for i in range(args.users)])
+        get_background_writer().flush()
+    finally:
+        services.stop()
+
+    report.pop("per_user")
+    catalog_rows = ExecutionCatalog(catalog_path).token_totals(group_by="entity")
+    report["catalog"] = {
+        "path": catalog_path,
+        "entities": len(catalog_rows),
+        "executions": sum(row["runs"] for row in catalog_rows),
+    }
+    report["fake_services"] = services.reset_stats()
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,110 @@
+"""
+Benchmark per-run persistence time and bytes written by StorageManager
+
+Compares the previous write path (one model_dump per output, stdlib json with
+indent=2, direct open/write) with the single-pass atomic path, both inline and
+with the background writer. "critical_path_ms" is the time until
+save_crew_execution_result returns. The execution catalog is disabled so only
+file persistence is measured.
+
+Usage (from the crewai_with_tools directory):
+    python -m benchmarks.storage_benchmark --runs 200 --emails 60
+"""
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+
+from crew_agent.storage_manager import StorageManager, create_sample_execution_result
+from crew_agent.output_models import Email
+
+
+def large_execution_result(emails: int):
+    """Sample execution result with a realistic number of extracted emails"""
+    result = create_sample_execution_result()
+    extraction = result.email_extraction_output
+    extraction.newsletters = [
+        Email(
+            sender=f"news{i}@example.com",
+            subject=f"Weekly digest #{i}",
+            date_received="2025-11-25",
+            content_overview="Highlights from this week in engineering, product and design. " * 6,
+            email_type="newsletter"
+        )
+        for i in range(emails)
+    ]
+    return result
+
+
+def legacy_save(storage: StorageManager, result, raw_outputs: dict) -> int:
+    """Write path used before single-pass persistence; returns bytes written"""
+    execution_id, folder_path = storage.create_execution_folder("legacy")
+    written = 0
+    for task_name in ("daily_calendar", "email_extraction", "summary_generator"):
+        model = getattr(result, f"{task_name}_output")
+        json_path = folder_path / f"{task_name}_output.json"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(model.model_dump(), f, indent=2, default=str)
+        md_path = folder_path / f"{task_name}_output.md"
+        with open(md_path, 'w', encoding='utf-8') as f:
+            f.write(f"# {task_name}\n\n**Generated at:** {datetime.now().isoformat()}\n\n---\n\n")
+            f.write(storage._format_model_as_markdown(model))
+            f.write("\n\n---\n\n## Raw Output\n\n" + raw_outputs[task_name])
+    with open(folder_path / "token_usage.json", 'w', encoding='utf-8') as f:
+        json.dump({
+            "total_usage": result.total_token_usage.model_dump(),
+            "task_usage": {k: v.model_dump() for k, v in result.task_token_usage.items()},
+        }, f, indent=2)
+    with open(folder_path / "execution_metadata.json", 'w', encoding='utf-8') as f:
+        json.dump({"execution_id": execution_id, **result.metadata}, f, indent=2, default=str)
+    with open(folder_path / "complete_execution_result.json", 'w', encoding='utf-8') as f:
+        json.dump(result.model_dump(), f, indent=2, default=str)
+    for path in folder_path.iterdir():
+        written += path.stat().st_size
+    return written
+
+
+def percentile(samples: list, p: float) -> float:
+    """Percentile (0-100) of the samples, rounded to the microsecond"""
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--emails", type=int, default=60)
+    args = parser.parse_args()
+
+    raw_outputs = {name: "Raw task output. " * 200 for name in ("daily_calendar", "email_extraction", "summary_generator")}
+    report = {}
+
+    for mode in ("legacy", "single_pass", "background"):
+        storage = StorageManager(
+            base_output_dir=tempfile.mkdtemp(prefix=f"storage_bench_{mode}_"),
+            use_catalog=False,
+            background=mode == "background"
+        )
+        critical, bytes_written = [], 0
+        total_start = time.perf_counter()
+        for _ in range(args.runs):
+            result = large_execution_result(args.emails)
+            start = time.perf_counter()
+            if mode == "legacy":
+                bytes_written += legacy_save(storage, result, raw_outputs)
+            else:
+                storage.save_crew_execution_result("daily_assistant", result, raw_outputs)
+                bytes_written += storage.last_save_stats["bytes_written"]
+            critical.append((time.perf_counter() - start) * 1000)
+        storage.flush()
+        total_s = time.perf_counter() - total_start
+
+        report[mode] = {
+            "critical_path_ms_p50": percentile(critical, 50),
+            "critical_path_ms_p95": percentile(critical, 95),
+            "bytes_per_run": bytes_written // args.runs,
+            "runs_per_second_incl_flush": round(args.runs / total_s, 1),
+        }
+
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,65 @@
+"""
+Benchmark the local extractive summarizer against LLM-written summaries
+
+Usage (from the crewai_with_tools directory):
+    python -m benchmarks.summarizer_benchmark
+"""
+import re
+import json
+import time
+from pathlib import Path
+from collections import Counter
+
+from crew_agent.summarizer import summarize, summarize_batch, clean_text
+
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "newsletter_corpus.json"
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def rouge_1(candidate: str, reference: str) -> dict:
+    """Unigram overlap between a candidate and a reference summary"""
+    candidate_counts = Counter(_WORD_RE.findall(candidate.lower()))
+    reference_counts = Counter(_WORD_RE.findall(reference.lower()))
+    overlap = sum((candidate_counts & reference_counts).values())
+    precision = overlap / max(1, sum(candidate_counts.values()))
+    recall = overlap / max(1, sum(reference_counts.values()))
+    f1 = 2 * precision * recall / (precision + recall) if overlap else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+if __name__ == "__main__":
+    with open(FIXTURE_PATH, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    body_tokens = summary_tokens = 0
+    scores = []
+    for item in corpus:
+        summary = summarize(item["body"])
+        body_tokens += estimate_tokens(item["body"])
+        summary_tokens += estimate_tokens(summary)
+        scores.append(rouge_1(summary, item["llm_summary"]))
+
+    # Throughput with the process pool on a larger synthetic inbox
+    bodies = [item["body"] for item in corpus] * 250
+    start = time.perf_counter()
+    summarize_batch(bodies)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "documents": len(corpus),
+        "body_tokens": body_tokens,
+        "summary_tokens": summary_tokens,
+        "cleaned_body_tokens": sum(estimate_tokens(clean_text(item["body"])) for item in corpus),
+        "token_reduction": round(1 - summary_tokens / body_tokens, 3),
+        "rouge_1_recall": round(sum(s["recall"] for s in scores) / len(scores), 3),
+        "rouge_1_f1": round(sum(s["f1"] for s in scores) / len(scores), 3),
+        "batch_documents_per_second": round(len(bodies) / elapsed),
+    }
+    print(json.dumps(report, indent=2))
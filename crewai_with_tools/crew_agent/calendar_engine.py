@@ -0,0 +1,392 @@
+import re
+import calendar
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from typing import Optional, Dict, Any, List
+
+from crew_agent.output_models import CalendarEvent, DailyCalendarOutput
+
+
+_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+_BIRTHDAY_RE = re.compile(r"\bbirthday\b|\bbday\b", re.IGNORECASE)
+_SPECIAL_RE = re.compile(r"\banniversary\b|\bholiday\b|\bwedding\b|\bgraduation\b", re.IGNORECASE)
+
+# Guard against malformed recurrence rules expanding forever
+MAX_RECURRENCE_STEPS = 5000
+
+
+class Occurrence:
+    """A single (possibly expanded) instance of a calendar event"""
+
+    __slots__ = ("event", "start", "end", "all_day")
+
+    def __init__(self, event: Dict[str, Any], start: datetime, end: datetime, all_day: bool):
+        self.event = event
+        self.start = start
+        self.end = end
+        self.all_day = all_day
+
+
+class IntervalIndex:
+    """Sorted interval index supporting overlap queries"""
+
+    def __init__(self, occurrences: List[Occurrence]):
+        """
+        Build the index
+
+        Args:
+            occurrences: Timed occurrences to index
+        """
+        self.items = sorted(occurrences, key=lambda o: (o.start, o.end))
+        self.starts = [o.start for o in self.items]
+        self.max_duration = max((o.end - o.start for o in self.items), default=timedelta(0))
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Occurrence]:
+        """Return occurrences overlapping the half-open interval [start, end)"""
+        lo = bisect_left(self.starts, start - self.max_duration)
+        hi = bisect_left(self.starts, end)
+        return [o for o in self.items[lo:hi] if o.end > start and o.start < end]
+
+    def conflicts(self) -> List[tuple[Occurrence, Occurrence]]:
+        """Return all pairs of overlapping occurrences"""
+        pairs = []
+        for i, occurrence in enumerate(self.items):
+            hi = bisect_left(self.starts, occurrence.end)
+            for other in self.items[i + 1:hi]:
+                if other.start < occurrence.end:
+                    pairs.append((occurrence, other))
+        return pairs
+
+    def free_slots(self, start: datetime, end: datetime, min_minutes: int = 30) -> List[tuple[datetime, datetime]]:
+        """Return the gaps of at least min_minutes between busy intervals in [start, end)"""
+        slots = []
+        cursor = start
+        for occurrence in sorted(self.overlapping(start, end), key=lambda o: o.start):
+            if occurrence.start > cursor and occurrence.start - cursor >= timedelta(minutes=min_minutes):
+                slots.append((cursor, occurrence.start))
+            cursor = max(cursor, occurrence.end)
+        if end - cursor >= timedelta(minutes=min_minutes):
+            slots.append((cursor, end))
+        return slots
+
+
+def _parse_rrule(rule: str) -> Dict[str, str]:
+    """Parse 'RRULE:FREQ=WEEKLY;BYDAY=MO,WE' into a dict"""
+    body = rule.split(":", 1)[1] if ":" in rule else rule
+    return dict(part.split("=", 1) for part in body.split(";") if "=" in part)
+
+
+def _parse_ical_datetime(value: str, tz: ZoneInfo) -> datetime:
+    """Parse an iCalendar DATE or DATE-TIME value"""
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=ZoneInfo("UTC"))
+    if "T" in value:
+        return datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=tz)
+    return datetime.strptime(value, "%Y%m%d").replace(tzinfo=tz)
+
+
+def _add_months(value: datetime, months: int) -> Optional[datetime]:
+    """Shift a datetime by whole months, or None if the day does not exist"""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    if value.day > calendar.monthrange(year, month)[1]:
+        return None
+    return value.replace(year=year, month=month)
+
+
+def expand_recurrence(
+    start: datetime,
+    recurrence: List[str],
+    window_end: datetime,
+    window_start: Optional[datetime] = None
+) -> List[datetime]:
+    """
+    Expand RRULE/EXDATE lines into occurrence start times
+
+    Supports FREQ=DAILY/WEEKLY/MONTHLY/YEARLY with INTERVAL, COUNT, UNTIL and
+    BYDAY (weekly). Wall-clock time is preserved across DST changes.
+
+    Args:
+        start: Start of the first occurrence (timezone-aware)
+        recurrence: Recurrence lines of the event
+        window_end: No occurrences at or after this instant are generated
+        window_start: Lets rules without COUNT skip ahead to the window
+
+    Returns:
+        Sorted occurrence start times
+    """
+    rules = [_parse_rrule(line) for line in recurrence if line.startswith("RRULE")]
+    excluded = set()
+    for line in recurrence:
+        if line.startswith("EXDATE"):
+            params, _, values = line.partition(":")
+            tz_name = re.search(r"TZID=([^;:]+)", params)
+            tz = ZoneInfo(tz_name.group(1)) if tz_name else start.tzinfo
+            excluded.update(_parse_ical_datetime(v, tz) for v in values.split(","))
+
+    if not rules:
+        return [start]
+
+    rule = rules[0]
+    freq = rule.get("FREQ", "DAILY")
+    interval = int(rule.get("INTERVAL", 1))
+    count = int(rule["COUNT"]) if "COUNT" in rule else None
+    until = _parse_ical_datetime(rule["UNTIL"], start.tzinfo) if "UNTIL" in rule else None
+    weekdays = sorted(_WEEKDAYS[d[-2:]] for d in rule.get("BYDAY", "").split(",") if d[-2:] in _WEEKDAYS)
+
+    first_step = 0
+    if count is None and window_start is not None and window_start > start:
+        months = (window_start.year - start.year) * 12 + window_start.month - start.month
+        elapsed = {
+            "DAILY": (window_start - start).days,
+            "WEEKLY": (window_start - start).days // 7,
+            "MONTHLY": months,
+            "YEARLY": months // 12,
+        }.get(freq, 0)
+        first_step = max(0, elapsed // interval - 1)
+
+    occurrences = []
+    generated = 0
+    for step in range(first_step, first_step + MAX_RECURRENCE_STEPS):
+        if freq == "DAILY":
+            candidates = [start + timedelta(days=step * interval)]
+        elif freq == "WEEKLY":
+            week_start = start - timedelta(days=start.weekday()) + timedelta(weeks=step * interval)
+            candidates = [week_start + timedelta(days=d) for d in (weekdays or [start.weekday()])]
+        elif freq == "MONTHLY":
+            candidates = [_add_months(start, step * interval)]
+        elif freq == "YEARLY":
+            candidates = [_add_months(start, 12 * step * interval)]
+        else:
+            return [start]
+
+        for candidate in candidates:
+            if candidate is None or candidate < start:
+                continue
+            if (until and candidate > until) or candidate >= window_end:
+                return occurrences
+            if count is not None and generated >= count:
+                return occurrences
+            generated += 1
+            if candidate not in excluded:
+                occurrences.append(candidate)
+    return occurrences
+
+
+def extract_events(data: Any) -> Optional[List[Dict[str, Any]]]:
+    """Locate the event list inside a Google Calendar action response"""
+    if isinstance(data, list):
+        if all(isinstance(e, dict) and ("start" in e or "summary" in e) for e in data):
+            return data
+        return None
+    if isinstance(data, dict):
+        for key in ("data", "items", "events", "event_data"):
+            if key in data:
+                found = extract_events(data[key])
+                if found is not None:
+                    return found
+    return None
+
+
+class CalendarEngine:
+    """Turns raw Google Calendar events into structured calendar output without an LLM"""
+
+    def __init__(
+        self,
+        time_zone: str = "UTC",
+        window_days: int = 3,
+        work_start: time = time(9, 0),
+        work_end: time = time(18, 0),
+        min_free_minutes: int = 30
+    ):
+        """
+        Initialize the calendar engine
+
+        Args:
+            time_zone: IANA time zone all events are normalized to
+            window_days: Number of days after the current date to include
+            work_start: Start of the working day for free-slot detection
+            work_end: End of the working day for free-slot detection
+            min_free_minutes: Minimum length of a reported free slot
+        """
+        self.tz = ZoneInfo(time_zone)
+        self.window_days = window_days
+        self.work_start = work_start
+        self.work_end = work_end
+        self.min_free_minutes = min_free_minutes
+
+    def window(self, current_date: str) -> tuple[datetime, datetime]:
+        """Return the [start, end) window for a YYYY-MM-DD date"""
+        start = datetime.combine(date.fromisoformat(current_date), time(0, 0), tzinfo=self.tz)
+        return start, start + timedelta(days=self.window_days + 1)
+
+    def _parse_time(self, value: Dict[str, Any], default_tz: ZoneInfo) -> tuple[datetime, bool]:
+        """Parse a Google Calendar start/end object into (datetime, all_day)"""
+        if value.get("dateTime"):
+            parsed = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=ZoneInfo(value["timeZone"]) if value.get("timeZone") else default_tz)
+            return parsed, False
+        return datetime.combine(date.fromisoformat(value["date"]), time(0, 0), tzinfo=self.tz), True
+
+    def occurrences(self, events: List[Dict[str, Any]], window_start: datetime, window_end: datetime) -> List[Occurrence]:
+        """Expand and normalize raw events into occurrences inside the window"""
+        result = []
+        for event in events:
+            if event.get("status") == "cancelled" or event.get("eventType") == "workingLocation":
+                continue
+            if any(a.get("self") and a.get("responseStatus") == "declined" for a in event.get("attendees") or []):
+                continue
+            if not event.get("start"):
+                continue
+
+            event_tz = ZoneInfo(event["start"]["timeZone"]) if event["start"].get("timeZone") else self.tz
+            start, all_day = self._parse_time(event["start"], event_tz)
+            end, _ = self._parse_time(event.get("end") or event["start"], event_tz)
+            if not all_day:
+                start = start.astimezone(event_tz)
+            duration = max(end - start, timedelta(0))
+
+            recurrence = event.get("recurrence") or []
+            for occurrence_start in expand_recurrence(start, recurrence, window_end, window_start):
+                occurrence_end = occurrence_start + duration
+                if all_day:
+                    # All-day events keep their calendar date in every time zone
+                    occurrence_start = occurrence_start.replace(tzinfo=self.tz)
+                    occurrence_end = occurrence_start + max(duration, timedelta(days=1))
+                else:
+                    occurrence_start = occurrence_start.astimezone(self.tz)
+                    occurrence_end = occurrence_end.astimezone(self.tz)
+                if occurrence_end > window_start and occurrence_start < window_end:
+                    result.append(Occurrence(event, occurrence_start, occurrence_end, all_day))
+
+        return sorted(result, key=lambda o: (o.start, o.end))
+
+    def is_birthday(self, event: Dict[str, Any]) -> bool:
+        """Recognize birthday events"""
+        if event.get("eventType") == "birthday":
+            return True
+        organizer = (event.get("organizer") or {}).get("email", "")
+        return "#contacts@" in organizer or bool(_BIRTHDAY_RE.search(event.get("summary") or ""))
+
+    def to_calendar_event(self, occurrence: Occurrence) -> CalendarEvent:
+        """Convert an occurrence into the CalendarEvent output model"""
+        event = occurrence.event
+        attendees = [a for a in event.get("attendees") or [] if not a.get("resource")]
+        if occurrence.all_day:
+            date_time = occurrence.start.strftime("%Y-%m-%d (all day)")
+        else:
+            date_time = (
+                f"{occurrence.start:%Y-%m-%d %H:%M}-{occurrence.end:%H:%M} {self.tz.key}"
+            )
+
+        if self.is_birthday(event):
+            event_type = "birthday"
+        elif occurrence.all_day or _SPECIAL_RE.search(event.get("summary") or ""):
+            event_type = "special event"
+        elif len(attendees) > 1 or event.get("hangoutLink") or event.get("conferenceData"):
+            event_type = "meeting"
+        else:
+            event_type = event.get("eventType") if event.get("eventType") not in (None, "default") else "event"
+
+        return CalendarEvent(
+            title=event.get("summary") or "(no title)",
+            date_time=date_time,
+            participants=[a.get("displayName") or a.get("email") for a in attendees] or None,
+            agenda=(event.get("description") or "").strip()[:300] or None,
+            location=event.get("location") or event.get("hangoutLink"),
+            event_type=event_type,
+        )
+
+    def analyze(self, events: List[Dict[str, Any]], current_date: str) -> Dict[str, Any]:
+        """
+        Analyze raw events for the window starting at current_date
+
+        Args:
+            events: Raw Google Calendar event payloads
+            current_date: First day of the window (YYYY-MM-DD)
+
+        Returns:
+            Dictionary with 'events', 'special_events' (CalendarEvent models),
+            'conflicts' and 'free_slots' (human-readable strings)
+        """
+        window_start, window_end = self.window(current_date)
+        occurrences = self.occurrences(events, window_start, window_end)
+
+        timed = [o for o in occurrences if not o.all_day]
+        index = IntervalIndex(timed)
+
+        regular, special = [], []
+        for occurrence in occurrences:
+            calendar_event = self.to_calendar_event(occurrence)
+            is_special = calendar_event.event_type in ("birthday", "special event")
+            (special if is_special else regular).append(calendar_event)
+
+        conflicts = [
+            f"{a.event.get('summary') or '(no title)'} overlaps {b.event.get('summary') or '(no title)'} "
+            f"on {b.start:%Y-%m-%d} {max(a.start, b.start):%H:%M}-{min(a.end, b.end):%H:%M}"
+            for a, b in index.conflicts()
+        ]
+
+        free_slots = []
+        for day in range(self.window_days + 1):
+            day_date = window_start.date() + timedelta(days=day)
+            day_start = datetime.combine(day_date, self.work_start, tzinfo=self.tz)
+            day_end = datetime.combine(day_date, self.work_end, tzinfo=self.tz)
+            for slot_start, slot_end in index.free_slots(day_start, day_end, self.min_free_minutes):
+                free_slots.append(f"{slot_start:%Y-%m-%d %H:%M}-{slot_end:%H:%M}")
+
+        return {
+            "events": regular,
+            "special_events": special,
+            "conflicts": conflicts,
+            "free_slots": free_slots,
+        }
+
+    def render_context(self, analysis: Dict[str, Any]) -> str:
+        """Render an analysis as compact text for the agent prompt"""
+        def describe(event: CalendarEvent) -> str:
+            details = [event.date_time, event.title]
+            if event.participants:
+                details.append("with " + ", ".join(event.participants[:8]))
+            if event.location:
+                details.append(f"at {event.location}")
+            return " | ".join(d for d in details if d)
+
+        lines = ["Events:"]
+        lines += [f"- {describe(e)}" for e in analysis["events"]] or ["- none"]
+        lines.append("Birthdays and special events:")
+        lines += [f"- {describe(e)}" for e in analysis["special_events"]] or ["- none"]
+        lines.append("Conflicts:")
+        lines += [f"- {c}" for c in analysis["conflicts"]] or ["- none"]
+        lines.append("Free slots (working hours):")
+        lines += [f"- {s}" for s in analysis["free_slots"]] or ["- none"]
+        return "\n".join(lines)
+
+    @staticmethod
+    def dump_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """JSON-serializable form of an analysis, read back with load_analysis"""
+        return {
+            key: [item.model_dump() if isinstance(item, CalendarEvent) else item for item in analysis[key]]
+            for key in ("events", "special_events", "conflicts", "free_slots")
+        }
+
+    @staticmethod
+    def load_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild an analysis saved with dump_analysis"""
+        return {
+            "events": [CalendarEvent.model_validate(event) for event in data["events"]],
+            "special_events": [CalendarEvent.model_validate(event) for event in data["special_events"]],
+            "conflicts": list(data["conflicts"]),
+            "free_slots": list(data["free_slots"]),
+        }
+
+    def to_output(self, analysis: Dict[str, Any], summary: str = "", todo_list: Optional[List[str]] = None) -> DailyCalendarOutput:
+        """Build the DailyCalendarOutput, with the narrative summary supplied by the LLM"""
+        return DailyCalendarOutput(
+            events=analysis["events"],
+            special_events=analysis["special_events"],
+            todo_list=todo_list,
+            summary=summary,
+        )
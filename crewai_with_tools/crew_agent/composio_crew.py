@@ -1,22 +1,34 @@
 import os
-import agentops
+import threading
+from typing import Optional
 from crewai import Process, LLM
 from crewai.project import CrewBase, agent, crew, task
 from crewai import Agent, Task, Crew
 from composio_crewai import Action, ComposioToolSet
+from crew_runtime.instrumentation import instrument_llm
+from crew_runtime.model_router import ModelRouter
+from crew_runtime.task_budget import TaskBudgets
+from crew_runtime.prompt_cache import cache_prompts
+from crew_runtime.streaming import stream_llm
+from crew_runtime.telemetry import VERBOSE
+from crew_runtime.structured_output import structured_output_converter
+from crew_runtime.rate_limiter import limit_llm, limit_toolset
 from crew_agent.output_models import (
-    DailyCalendarOutput,
+    CalendarSummaryOutput,
     EmailExtractionOutput,
     SummaryGeneratorOutput
 )
+from crew_agent.email_classifier import preclassify_emails
+from crew_agent.tool_compaction import ToolOutputCompactor
+from crew_agent.calendar_engine import CalendarEngine, extract_events
 
 
 def load_llm(model_name: str) -> LLM | None:
     try:
-        return LLM(
+        return limit_llm(instrument_llm(cache_prompts(stream_llm(LLM(
             model=model_name,
             api_key=os.getenv('OPENROUTER_API_KEY'),
-            base_url='https://openrouter.ai/api/v1',
+            base_url=os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
             temperature=0.7,
             additional_params={
                 "default_headers": {
@@ -24,7 +36,7 @@ def load_llm(model_name: str) -> LLM | None:
                     "X-Title": "CrewAI App"
                 }
             }
-        )
+        )))))
     except Exception as e:
         print(f"Error loading LLM for model {model_name}: {str(e)}")
         return None
@@ -44,7 +56,13 @@ Anthropic Model
 CLAUDE_MODEL = 'openrouter/anthropic/claude-sonnet-4-5-20250929'
 # CLAUDE_MODEL = 'openrouter/anthropic/claude-opus-4.5'
 claude = load_llm(CLAUDE_MODEL)
-claude_base = LLM(model='claude-sonnet-4-5-20250929', api_key=os.getenv('ANTHROPIC_API_KEY'))
+claude_base = limit_llm(instrument_llm(cache_prompts(stream_llm(LLM(
+    model='claude-sonnet-4-5-20250929',
+    api_key=os.getenv('ANTHROPIC_API_KEY'),
+    base_url=os.getenv('ANTHROPIC_BASE_URL'),
+    # 429s and transient errors are retried by the shared rate limiter
+    max_retries=0
+)))))
 
 """
 Gemini Model
@@ -54,53 +72,176 @@ GEMINI_MODEL = 'openrouter/google/gemini-2.5-pro'
 # GEMINI_MODEL = 'openrouter/google/gemini-2.5-flash'
 gemini = load_llm(GEMINI_MODEL)
 
-# Initialize AgentOps
-agentops.init()
+# Cheaper and faster route for lightweight tasks (see `routing` in tasks.yaml)
+GEMINI_FLASH_MODEL = 'openrouter/google/gemini-2.5-flash'
+gemini_flash = load_llm(GEMINI_FLASH_MODEL)
+
+"""
+Model Routing
+"""
+# Agents keep their LLM; each call is dispatched by the task's routing policy
+router = ModelRouter(
+    routes={
+        "claude_base": claude_base,
+        "claude": claude,
+        "gemini": gemini,
+        "gemini_flash": gemini_flash,
+        "openai": openai,
+    },
+    # Claude through Anthropic and through OpenRouter serve the same model
+    equivalents={"claude_base": ["claude"], "claude": ["claude_base"]},
+)
+
+"""
+Task Budgets
+"""
+# Tool call, token and deadline limits per task (see `budget` in tasks.yaml)
+budgets = TaskBudgets(router.routes)
 
 toolset = ComposioToolSet(
     api_key=os.getenv("COMPOSIO_API_KEY"),
+    base_url=os.getenv("COMPOSIO_BASE_URL"),
     # entity_id='pg-test-e525fc15-0c7d-4daa-bc45-4a90667f4493'
-    entity_id='purvesh62@gmail.com'
+    entity_id=os.getenv("COMPOSIO_ENTITY_ID", 'purvesh62@gmail.com')
 )
+# Agent tools and direct executions share the Composio quota
+limit_toolset(toolset, "composio", os.getenv("COMPOSIO_API_KEY"))
+
+# Tool responses are compacted before they reach the agent context
+compactor = ToolOutputCompactor(body_budget=1500, agenda_budget=300)
+
+TOOL_ACTIONS = [
+    # Google Calendar (fetched and analyzed locally, see load_calendar)
+    # Action.GOOGLECALENDAR_FIND_EVENT,
+    # Action.GOOGLECALENDAR_GET_CALENDAR,
+
+    # Gmail
+    Action.GMAIL_FETCH_EMAILS,
+
+    # Notion
+    # Action.NOTION_ADD_PAGE_CONTENT,
+    # Action.NOTION_CREATE_COMMENT,
+    # Action.NOTION_DELETE_BLOCK,
+    # Action.NOTION_INSERT_ROW_DATABASE,
+
+    # Google Docs (published after the run, see doc_publisher.py)
+    # Action.GOOGLEDOCS_CREATE_DOCUMENT,
+    # Action.GOOGLEDOCS_CREATE_DOCUMENT_MARKDOWN,
+    # Action.GOOGLEDOCS_UPDATE_DOCUMENT_MARKDOWN,
+    # Action.GOOGLEDOCS_UPDATE_EXISTING_DOCUMENT,
+    # Action.GOOGLEDOCS_GET_DOCUMENT_BY_ID
+]
 
 tools = toolset.get_tools(
-    actions=[
-        # Google Calendar
-        Action.GOOGLECALENDAR_FIND_EVENT,
-        Action.GOOGLECALENDAR_GET_CALENDAR,
-
-        # Gmail
-        Action.GMAIL_FETCH_EMAILS,
-
-        # Notion
-        # Action.NOTION_ADD_PAGE_CONTENT,
-        # Action.NOTION_CREATE_COMMENT,
-        # Action.NOTION_DELETE_BLOCK,
-        # Action.NOTION_INSERT_ROW_DATABASE,
-
-        # Google Docs
-        Action.GOOGLEDOCS_CREATE_DOCUMENT,
-        Action.GOOGLEDOCS_CREATE_DOCUMENT_MARKDOWN,
-        # Action.GOOGLEDOCS_UPDATE_DOCUMENT_MARKDOWN,
-        # Action.GOOGLEDOCS_UPDATE_EXISTING_DOCUMENT,
-        # Action.GOOGLEDOCS_GET_DOCUMENT_BY_ID
-    ]
+    actions=TOOL_ACTIONS,
+    processors={
+        # Classify newsletters and promotions locally, then project every
+        # response to the fields declared by the output models
+        "post": {
+            Action.GMAIL_FETCH_EMAILS: compactor.processor("GMAIL_FETCH_EMAILS", preclassify_emails),
+        }
+    }
 )
 
 
+# Action schemas are fetched once and shared by the tool bindings of every entity
+_tool_schemas = None
+_tool_schemas_lock = threading.Lock()
+
+
+def load_tool_schemas() -> list:
+    """Fetch the action schemas on first use; later calls return the cached ones"""
+    global _tool_schemas
+    with _tool_schemas_lock:
+        if _tool_schemas is None:
+            _tool_schemas = [
+                schema.model_dump(exclude_none=True)
+                for schema in toolset.get_action_schemas(actions=TOOL_ACTIONS, check_connected_accounts=False)
+            ]
+    return _tool_schemas
+
+
+def get_entity_tools(entity_id: Optional[str] = None) -> list:
+    """
+    Build tools bound to a Composio entity from the shared cached schemas
+
+    Args:
+        entity_id: Composio entity to execute actions for (default: toolset entity)
+
+    Returns:
+        List of CrewAI tools
+    """
+    if entity_id is None or entity_id == toolset.entity_id:
+        return tools
+    return [toolset._wrap_tool(schema=schema, entity_id=entity_id) for schema in load_tool_schemas()]
+
+
+def load_calendar(
+    current_date: str,
+    window_days: int = 3,
+    entity_id: Optional[str] = None
+) -> tuple[CalendarEngine, dict]:
+    """
+    Fetch calendar events and analyze them locally
+
+    Args:
+        current_date: First day of the window (YYYY-MM-DD)
+        window_days: Number of following days to include
+        entity_id: Composio entity whose calendar is read (default: toolset entity)
+
+    Returns:
+        Tuple of (calendar engine, analysis with events, special events,
+        conflicts and free slots)
+    """
+    time_zone = os.getenv("CALENDAR_TIME_ZONE")
+    if not time_zone:
+        calendar = toolset.execute_action(
+            action=Action.GOOGLECALENDAR_GET_CALENDAR,
+            params={"calendar_id": "primary"},
+            entity_id=entity_id,
+        )
+        data = calendar.get("data") or {}
+        time_zone = (data.get("calendar") or data).get("timeZone") or "UTC"
+
+    engine = CalendarEngine(time_zone=time_zone, window_days=window_days)
+    window_start, window_end = engine.window(current_date)
+    response = toolset.execute_action(
+        action=Action.GOOGLECALENDAR_FIND_EVENT,
+        params={
+            "calendar_id": "primary",
+            "timeMin": window_start.isoformat(),
+            "timeMax": window_end.isoformat(),
+            "single_events": True,
+            "max_results": 250,
+        },
+        entity_id=entity_id,
+    )
+    return engine, engine.analyze(extract_events(response) or [], current_date)
+
+
 @CrewBase
 class ComposioAgentCrew:
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
 
+    def __init__(self, entity_id: Optional[str] = None):
+        """
+        Initialize the crew
+
+        Args:
+            entity_id: Composio entity the tools act for (default: toolset entity)
+        """
+        self.entity_id = entity_id
+        self.tools = get_entity_tools(entity_id)
+
     @agent
     def personal_assistant(self) -> Agent:
         return Agent(
             config=self.agents_config['personal_assistant'],
             llm=claude_base,
-            verbose=True,
+            verbose=VERBOSE,
             memory=False,
-            tools=tools,
+            tools=self.tools,
         )
 
     @agent
@@ -108,9 +249,9 @@ class ComposioAgentCrew:
         return Agent(
             config=self.agents_config['email_manager'],
             llm=claude_base,
-            verbose=True,
+            verbose=VERBOSE,
             memory=False,
-            tools=tools,
+            tools=self.tools,
         )
 
     @task
@@ -118,7 +259,8 @@ class ComposioAgentCrew:
         return Task(
             config=self.tasks_config['daily_calendar_tasks'],
             agent=self.personal_assistant(),
-            output_pydantic=DailyCalendarOutput,
+            output_pydantic=CalendarSummaryOutput,
+            converter_cls=structured_output_converter(),
         )
 
     @task
@@ -128,6 +270,7 @@ class ComposioAgentCrew:
             agent=self.email_manager(),
             context=[self.daily_calendar_tasks()],
             output_pydantic=EmailExtractionOutput,
+            converter_cls=structured_output_converter(),
         )
 
     @task
@@ -137,14 +280,17 @@ class ComposioAgentCrew:
             agent=self.personal_assistant(),
             context=[self.email_extraction_task()],
             output_pydantic=SummaryGeneratorOutput,
+            converter_cls=structured_output_converter(),
         )
 
     @crew
     def crew(self) -> Crew:
+        router.configure_tasks(self.tasks, self.tasks_config)
+        budgets.configure_tasks(self.tasks, self.tasks_config)
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            verbose=VERBOSE,
             memory=False,
         )
@@ -0,0 +1,179 @@
+import json
+import hashlib
+from pathlib import Path
+from datetime import date, datetime
+from typing import Optional, Dict, Any
+
+from composio_crewai import Action
+
+from crew_runtime.files import atomic_write
+from crew_agent.output_models import SummaryGeneratorOutput
+
+
+DOC_URL = "https://docs.google.com/document/d/{document_id}/edit"
+
+
+def _find_value(data: Any, keys: tuple) -> Optional[str]:
+    """Recursively find the first value stored under one of keys"""
+    if isinstance(data, dict):
+        for key in keys:
+            if data.get(key):
+                return data[key]
+        for value in data.values():
+            found = _find_value(value, keys)
+            if found:
+                return found
+    return None
+
+
+def render_summary(summary: SummaryGeneratorOutput, generated_at: Optional[datetime] = None) -> str:
+    """
+    Render a daily summary as a plain-text section of the briefing document
+
+    Args:
+        summary: Output of summary_generator_task
+        generated_at: Time of the briefing (default: now)
+
+    Returns:
+        Rendered section, starting with a heading line
+    """
+    generated_at = generated_at or datetime.now()
+    lines = [f"Briefing {generated_at:%Y-%m-%d %H:%M}", "", summary.full_summary.strip(), ""]
+
+    sections = [
+        ("Key meetings", summary.key_meetings),
+        ("Important emails", summary.important_emails),
+        ("Action items", summary.action_items),
+        ("Personal events", summary.personal_events),
+        ("Newsletters", summary.newsletter_summaries),
+    ]
+    for title, items in sections:
+        if items:
+            lines.append(title)
+            lines.extend(f"• {item}" for item in items)
+            lines.append("")
+
+    return "\n".join(lines) + "\n"
+
+
+class DocPublisher:
+    """Publishes daily summaries to one cached Google Doc per day or week"""
+
+    def __init__(
+        self,
+        toolset,
+        base_dir: str = "outputs/published",
+        period: str = "day",
+        entity_id: Optional[str] = None
+    ):
+        """
+        Initialize the publisher
+
+        Args:
+            toolset: Composio toolset used to call the Google Docs actions
+            base_dir: Directory for the local copies and the document ID cache
+            period: 'day' for one document per day, 'week' for one per ISO week
+            entity_id: Composio entity that owns the documents (default: toolset entity)
+        """
+        if period not in ("day", "week"):
+            raise ValueError(f"Unsupported period: {period}")
+        self.toolset = toolset
+        self.period = period
+        self.entity_id = entity_id
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_path = self.base_dir / "doc_cache.json"
+
+    def period_key(self, current_date: str) -> str:
+        """Return the document key for a YYYY-MM-DD date"""
+        day = date.fromisoformat(current_date)
+        if self.period == "week":
+            year, week, _ = day.isocalendar()
+            return f"{year}-W{week:02d}"
+        return day.isoformat()
+
+    def _load_cache(self) -> Dict[str, Any]:
+        """Load the document ID cache; a missing or unreadable cache is treated as empty"""
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable document cache {self.cache_path}: {e}")
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def _save_cache(self, cache: Dict[str, Any]):
+        """Save the document ID cache atomically, so an interrupted save never corrupts it"""
+        atomic_write(self.cache_path, json.dumps(cache, indent=2).encode('utf-8'))
+
+    def cached_url(self, current_date: str) -> Optional[str]:
+        """Return the URL of the period's document from the cache, if it was published before"""
+        return self._load_cache().get(self.period_key(current_date), {}).get("url")
+
+    def publish(self, summary: SummaryGeneratorOutput, current_date: str) -> Optional[str]:
+        """
+        Append the summary to the period's document
+
+        The rendered section is compared with the last published section for the
+        period; unchanged content is not published again. A new document is
+        created on the first briefing of a period, later briefings are appended
+        with a single batch update.
+
+        Args:
+            summary: Output of summary_generator_task
+            current_date: Date of the briefing (YYYY-MM-DD)
+
+        Returns:
+            URL of the Google Doc; if publishing failed, the URL of the period's
+            document from an earlier briefing, or None if there is none
+        """
+        key = self.period_key(current_date)
+        cache = self._load_cache()
+        entry = cache.get(key, {})
+        local_path = self.base_dir / f"{key}.md"
+
+        section = render_summary(summary)
+        # Ignore the timestamped heading when checking for changes
+        section_hash = hashlib.sha256(section.split("\n", 1)[1].encode("utf-8")).hexdigest()
+        if entry.get("document_id") and entry.get("last_section_hash") == section_hash:
+            print(f"📄 Summary unchanged, skipping publish to {entry['url']}")
+            return entry["url"]
+
+        published = local_path.read_text(encoding='utf-8') if local_path.exists() else ""
+        separator = "\n" if published else ""
+
+        if entry.get("document_id"):
+            response = self.toolset.execute_action(
+                action=Action.GOOGLEDOCS_UPDATE_EXISTING_DOCUMENT,
+                params={
+                    "document_id": entry["document_id"],
+                    "editDocs": [{
+                        "insertText": {
+                            "text": separator + section,
+                            "endOfSegmentLocation": {},
+                        }
+                    }],
+                },
+                entity_id=self.entity_id,
+            )
+        else:
+            response = self.toolset.execute_action(
+                action=Action.GOOGLEDOCS_CREATE_DOCUMENT,
+                params={"title": f"Daily Briefing {key}", "text": section},
+                entity_id=self.entity_id,
+            )
+            entry["document_id"] = _find_value(response.get("data"), ("documentId", "document_id", "id"))
+
+        if not response.get("successful", response.get("successfull")) or not entry.get("document_id"):
+            print(f"❌ Failed to publish summary: {response.get('error')}")
+            return cache.get(key, {}).get("url")
+
+        local_path.write_text(published + separator + section, encoding='utf-8')
+        entry["url"] = DOC_URL.format(document_id=entry["document_id"])
+        entry["last_section_hash"] = section_hash
+        entry["updated_at"] = datetime.now().isoformat()
+        cache[key] = entry
+        self._save_cache(cache)
+        return entry["url"]
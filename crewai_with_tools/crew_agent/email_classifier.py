@@ -0,0 +1,260 @@
+import re
+from pathlib import Path
+from datetime import datetime
+from email.utils import parseaddr
+from typing import Optional, Dict, Any, List
+
+import yaml
+
+from crew_agent.output_models import Email
+from crew_agent.summarizer import summarize_batch
+
+
+RULES_PATH = Path(__file__).parent / "config" / "email_rules.yaml"
+
+NEWSLETTER = "newsletter"
+PROMOTIONAL = "promotional"
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def load_rules(rules_path: Path = RULES_PATH) -> Dict[str, Any]:
+    """Load the classification rules from YAML"""
+    with open(rules_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def _header_map(message: Dict[str, Any]) -> Dict[str, str]:
+    """Return lower-cased message headers from a Gmail payload"""
+    payload = message.get("payload") or {}
+    headers = payload.get("headers") or message.get("headers") or []
+    if isinstance(headers, dict):
+        return {str(k).lower(): str(v) for k, v in headers.items()}
+    return {
+        str(h.get("name", "")).lower(): str(h.get("value", ""))
+        for h in headers
+        if isinstance(h, dict)
+    }
+
+
+def _sender_domain(sender: str) -> str:
+    """Extract the domain part of a sender address"""
+    _, address = parseaddr(sender or "")
+    return address.rpartition("@")[2].lower().strip("> ")
+
+
+def _domain_in(domain: str, domains: frozenset) -> bool:
+    """Check a domain and all of its parent domains against a set"""
+    while domain:
+        if domain in domains:
+            return True
+        _, _, domain = domain.partition(".")
+    return False
+
+
+def _preview_text(message: Dict[str, Any], max_chars: int = 280) -> str:
+    """Short plain-text overview of a message body"""
+    preview = message.get("preview") or {}
+    text = preview.get("body") if isinstance(preview, dict) else None
+    text = text or message.get("snippet") or message.get("messageText") or ""
+    text = _SPACE_RE.sub(" ", _TAG_RE.sub(" ", str(text))).strip()
+    return text[:max_chars]
+
+
+def _date_received(message: Dict[str, Any]) -> str:
+    """Normalize the received date of a Gmail message"""
+    timestamp = message.get("messageTimestamp") or message.get("internalDate") or ""
+    if isinstance(timestamp, (int, float)) or str(timestamp).isdigit():
+        return datetime.fromtimestamp(int(timestamp) / 1000).isoformat()
+    return str(timestamp)
+
+
+class EmailClassifier:
+    """Deterministic, rule-based email classifier that runs before the LLM"""
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the classifier
+
+        Args:
+            rules: Classification rules (default: loaded from config/email_rules.yaml)
+        """
+        rules = rules if rules is not None else load_rules()
+        self.newsletter_domains = frozenset(rules.get("newsletter_domains") or [])
+        self.promotional_domains = frozenset(rules.get("promotional_domains") or [])
+        self.important_domains = frozenset(rules.get("important_domains") or [])
+        self.newsletter_keywords = tuple(k.lower() for k in rules.get("newsletter_keywords") or [])
+        self.promotional_keywords = tuple(k.lower() for k in rules.get("promotional_keywords") or [])
+        self.important_keywords = tuple(k.lower() for k in rules.get("important_keywords") or [])
+        self.confidence_threshold = rules.get("confidence_threshold", 3)
+
+    def score(self, message: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Compute newsletter, promotional and importance scores for a raw message
+
+        Args:
+            message: Raw message dict as returned by GMAIL_FETCH_EMAILS
+
+        Returns:
+            Dictionary with 'newsletter', 'promotional' and 'important' scores
+        """
+        headers = _header_map(message)
+        labels = set(message.get("labelIds") or [])
+        sender = message.get("sender") or headers.get("from", "")
+        domain = _sender_domain(sender)
+        subject = str(message.get("subject") or headers.get("subject", "")).lower()
+
+        newsletter = promotional = important = 0
+
+        # Bulk mail headers
+        is_bulk = "list-unsubscribe" in headers or "list-id" in headers
+        if is_bulk:
+            newsletter += 2
+            promotional += 2
+        if headers.get("precedence", "").lower() in ("bulk", "list"):
+            newsletter += 1
+            promotional += 1
+
+        # Gmail category labels
+        if "CATEGORY_PROMOTIONS" in labels:
+            promotional += 3
+        if "CATEGORY_UPDATES" in labels or "CATEGORY_FORUMS" in labels:
+            newsletter += 2
+        if "CATEGORY_SOCIAL" in labels:
+            newsletter += 1
+        if "IMPORTANT" in labels or "STARRED" in labels:
+            important += 2
+        if "CATEGORY_PERSONAL" in labels and not is_bulk:
+            important += 2
+
+        # Sender reputation
+        if _domain_in(domain, self.newsletter_domains):
+            newsletter += 3
+        if _domain_in(domain, self.promotional_domains):
+            promotional += 3
+        if _domain_in(domain, self.important_domains):
+            important += 5
+
+        # Subject keywords
+        if any(k in subject for k in self.newsletter_keywords):
+            newsletter += 2
+        if any(k in subject for k in self.promotional_keywords):
+            promotional += 2
+        if any(k in subject for k in self.important_keywords):
+            important += 3
+
+        return {"newsletter": newsletter, "promotional": promotional, "important": important}
+
+    def classify(self, message: Dict[str, Any]) -> tuple[Optional[str], Dict[str, int]]:
+        """
+        Classify a raw message
+
+        Args:
+            message: Raw message dict as returned by GMAIL_FETCH_EMAILS
+
+        Returns:
+            Tuple of (email_type or None when the LLM should decide, scores)
+        """
+        scores = self.score(message)
+        if scores["important"] >= self.confidence_threshold:
+            return None, scores
+
+        newsletter, promotional = scores["newsletter"], scores["promotional"]
+        best = max(newsletter, promotional)
+        if best < self.confidence_threshold or newsletter == promotional:
+            return None, scores
+
+        return (NEWSLETTER if newsletter > promotional else PROMOTIONAL), scores
+
+    def to_email(self, message: Dict[str, Any], email_type: Optional[str], overview: Optional[str] = None) -> Email:
+        """Build an Email model from a raw message"""
+        headers = _header_map(message)
+        return Email(
+            sender=message.get("sender") or headers.get("from", "unknown"),
+            subject=message.get("subject") or headers.get("subject", ""),
+            date_received=_date_received(message),
+            content_overview=overview or _preview_text(message),
+            email_type=email_type,
+        )
+
+    def partition(self, messages: List[Dict[str, Any]], summarize_bodies: bool = True) -> Dict[str, Any]:
+        """
+        Split raw messages into locally classified emails and messages for the LLM
+
+        Args:
+            messages: Raw messages as returned by GMAIL_FETCH_EMAILS
+            summarize_bodies: Shrink newsletter/promotional bodies with the
+                local extractive summarizer instead of using the preview
+
+        Returns:
+            Dictionary with 'newsletters', 'promotional_emails' (Email models)
+            and 'needs_review' (raw messages that are ambiguous or important)
+        """
+        classified, needs_review = [], []
+        for message in messages:
+            email_type, _ = self.classify(message)
+            if email_type is None:
+                needs_review.append(message)
+            else:
+                classified.append((message, email_type))
+
+        overviews = [None] * len(classified)
+        if summarize_bodies and classified:
+            overviews = summarize_batch([
+                str(message.get("messageText") or "") for message, _ in classified
+            ])
+
+        newsletters, promotional = [], []
+        for (message, email_type), overview in zip(classified, overviews):
+            email = self.to_email(message, email_type, overview)
+            (newsletters if email_type == NEWSLETTER else promotional).append(email)
+
+        return {
+            "newsletters": newsletters,
+            "promotional_emails": promotional,
+            "needs_review": needs_review,
+        }
+
+
+def preclassify_emails(response: Dict[str, Any], classifier: Optional[EmailClassifier] = None) -> Dict[str, Any]:
+    """
+    Composio post-processor for GMAIL_FETCH_EMAILS
+
+    Classifies the fetched messages locally and replaces the raw message list
+    with the pre-classified newsletters/promotions plus the messages the LLM
+    still needs to read.
+
+    Args:
+        response: Raw action response
+        classifier: Classifier to use (default: a new EmailClassifier)
+
+    Returns:
+        The response with the message list replaced
+    """
+    if not isinstance(response, dict):
+        return response
+    if not isinstance(response.get("messages"), list):
+        if isinstance(response.get("data"), dict):
+            return {**response, "data": preclassify_emails(response["data"], classifier)}
+        return response
+
+    result = (classifier or _default_classifier()).partition(response["messages"])
+    processed = {k: v for k, v in response.items() if k != "messages"}
+    processed["pre_classified"] = {
+        "newsletters": [email.model_dump() for email in result["newsletters"]],
+        "promotional_emails": [email.model_dump() for email in result["promotional_emails"]],
+    }
+    processed["needs_review"] = result["needs_review"]
+    return processed
+
+
+_classifier: Optional[EmailClassifier] = None
+
+
+def _default_classifier() -> EmailClassifier:
+    """Lazily build a shared classifier so the rules are parsed once"""
+    global _classifier
+    if _classifier is None:
+        _classifier = EmailClassifier()
+    return _classifier
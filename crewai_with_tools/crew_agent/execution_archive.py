@@ -0,0 +1,480 @@
+"""
+Compacted long-term archive for execution outputs
+
+Execution folders older than a cutoff are rolled into one append-only segment
+per month (outputs/archive/YYYY-MM.jsonl.zst). Each compaction appends
+compressed frames of JSON lines; every line is a payload (one output file) or
+an execution record listing the payloads of its files. Payloads are stored once
+per segment by content hash, and the task outputs embedded in
+complete_execution_result.json are stored as references to the per-task
+payloads. The offset index lives in the execution catalog database.
+
+Usage (from the crewai_with_tools directory):
+    python -m crew_agent.execution_archive compact --older-than-days 30 --retention-days 365
+    python -m crew_agent.execution_archive show <execution_id>
+    python -m crew_agent.execution_archive stats
+"""
+import os
+import gzip
+import json
+import base64
+import shutil
+import hashlib
+import argparse
+from pathlib import Path
+from contextlib import closing
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - fall back to gzip members
+    zstandard = None
+
+from crew_agent.execution_catalog import ExecutionCatalog, CATALOG_FILENAME
+
+
+ARCHIVE_DIRNAME = "archive"
+SEGMENT_SUFFIX = ".jsonl.zst" if zstandard else ".jsonl.gz"
+
+# Frames are compressed independently so a payload can be read with one seek
+MAX_FRAME_RECORDS = 256
+MAX_FRAME_BYTES = 4 * 1024 * 1024
+FRAME_CACHE_SIZE = 32
+
+RESULT_FILENAME = "complete_execution_result.json"
+TASK_OUTPUT_SUFFIX = "_output.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_payloads (
+    segment TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    frame_offset INTEGER NOT NULL,
+    frame_length INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    PRIMARY KEY (segment, hash)
+);
+CREATE TABLE IF NOT EXISTS archive_files (
+    execution_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (execution_id, filename)
+);
+CREATE TABLE IF NOT EXISTS archived_executions (
+    execution_id TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    timestamp TEXT,
+    archived_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_archived_executions_segment ON archived_executions(segment);
+"""
+
+
+def _compress(data: bytes) -> bytes:
+    """Compress one frame"""
+    if zstandard:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data)
+
+
+def _decompress(segment: str, data: bytes) -> bytes:
+    """Decompress one frame of a segment"""
+    if segment.endswith(".gz"):
+        return gzip.decompress(data)
+    if zstandard is None:
+        raise RuntimeError(f"zstandard is required to read {segment}")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _canonical(data: Any) -> bytes:
+    """Canonical JSON encoding used for content hashing"""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _content_hash(kind: str, data: Any) -> str:
+    """Content hash of a payload"""
+    return hashlib.sha256(kind.encode("utf-8") + b"\0" + _canonical(data)).hexdigest()
+
+
+def _read_payload(path: Path) -> Tuple[str, Any]:
+    """Read an output file as (kind, data)"""
+    raw = path.read_bytes()
+    if path.suffix == ".json":
+        try:
+            return "json", json.loads(raw)
+        except ValueError:
+            pass
+    try:
+        return "text", raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return "base64", base64.b64encode(raw).decode("ascii")
+
+
+def _execution_timestamp(folder_path: Path) -> str:
+    """Timestamp of a saved execution, falling back to the folder modification time"""
+    for filename in ("execution_metadata.json", RESULT_FILENAME):
+        path = folder_path / filename
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    timestamp = json.load(f).get("timestamp")
+                if timestamp:
+                    return str(timestamp).replace(" ", "T")
+            except (OSError, ValueError):
+                pass
+    return datetime.fromtimestamp(folder_path.stat().st_mtime).isoformat()
+
+
+class ExecutionArchive:
+    """Month segments of archived execution folders, indexed in the execution catalog"""
+
+    def __init__(self, catalog: ExecutionCatalog, archive_dir: Optional[str] = None):
+        """
+        Initialize the archive
+
+        Args:
+            catalog: Execution catalog whose database holds the archive index
+            archive_dir: Directory for the segment files (default: archive/ next to the catalog)
+        """
+        self.catalog = catalog
+        self.archive_dir = Path(archive_dir) if archive_dir else catalog.db_path.parent / ARCHIVE_DIRNAME
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._frames: OrderedDict = OrderedDict()
+        with closing(self.catalog.connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def is_archived(self, execution_id: str) -> bool:
+        """Return True if the execution has been moved into the archive"""
+        with closing(self.catalog.connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM archived_executions WHERE execution_id = ?", (execution_id,)
+            ).fetchone()
+        return row is not None
+
+    def _read_frame(self, segment: str, offset: int, length: int) -> List[Dict[str, Any]]:
+        """Read and decode one frame, keeping recently used frames in memory"""
+        key = (segment, offset)
+        if key in self._frames:
+            self._frames.move_to_end(key)
+            return self._frames[key]
+        with open(self.archive_dir / segment, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        records = [json.loads(line) for line in _decompress(segment, data).splitlines()]
+        self._frames[key] = records
+        if len(self._frames) > FRAME_CACHE_SIZE:
+            self._frames.popitem(last=False)
+        return records
+
+    def _resolve(self, value: Any, payloads: Dict[str, Any]) -> Any:
+        """Replace payload references with their content"""
+        if isinstance(value, dict):
+            if set(value) == {"$payload"}:
+                return payloads[value["$payload"]]
+            return {k: self._resolve(v, payloads) for k, v in value.items()}
+        return value
+
+    def load_files(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load every archived file of an execution
+
+        Args:
+            execution_id: ID of the execution
+
+        Returns:
+            Mapping of filename to parsed JSON (for .json files) or text,
+            or None if the execution is not archived
+        """
+        with closing(self.catalog.connect()) as conn:
+            rows = conn.execute(
+                "SELECT f.filename, f.hash, p.segment, p.frame_offset, p.frame_length, p.line "
+                "FROM archive_files f "
+                "JOIN archived_executions e ON e.execution_id = f.execution_id "
+                "JOIN archive_payloads p ON p.segment = e.segment AND p.hash = f.hash "
+                "WHERE f.execution_id = ?",
+                (execution_id,)
+            ).fetchall()
+        if not rows:
+            return None
+
+        payloads = {}
+        files = {}
+        for row in rows:
+            record = self._read_frame(row["segment"], row["frame_offset"], row["frame_length"])[row["line"]]
+            data = record["data"]
+            if record["kind"] == "base64":
+                data = base64.b64decode(data)
+            payloads[row["hash"]] = data
+            files[row["filename"]] = data
+
+        return {filename: self._resolve(data, payloads) for filename, data in files.items()}
+
+    def load_file(self, execution_id: str, filename: str) -> Optional[Any]:
+        """Load a single archived file of an execution"""
+        files = self.load_files(execution_id)
+        return files.get(filename) if files else None
+
+    def _collect(self, base_output_dir: Path, cutoff: str) -> Dict[str, List[Tuple[Path, str]]]:
+        """Find execution folders older than the cutoff, grouped by segment"""
+        segments: Dict[str, List[Tuple[Path, str]]] = {}
+        with os.scandir(base_output_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir() or entry.name == self.archive_dir.name:
+                    continue
+                folder_path = Path(entry.path)
+                if not (folder_path / RESULT_FILENAME).exists():
+                    continue
+                timestamp = _execution_timestamp(folder_path)
+                if timestamp < cutoff:
+                    segments.setdefault(f"{timestamp[:7]}{SEGMENT_SUFFIX}", []).append((folder_path, timestamp))
+        return segments
+
+    def _execution_records(self, folder_path: Path) -> Tuple[str, Dict[str, str], List[Tuple[str, str, Any]]]:
+        """Build the payloads and file map of one execution folder"""
+        files = {path.name: _read_payload(path) for path in sorted(folder_path.iterdir()) if path.is_file()}
+        payloads = []
+        file_hashes = {}
+        task_refs = {}
+
+        for filename, (kind, data) in files.items():
+            if filename == RESULT_FILENAME and kind == "json":
+                continue
+            content_hash = _content_hash(kind, data)
+            payloads.append((content_hash, kind, data))
+            file_hashes[filename] = content_hash
+            if filename.endswith(TASK_OUTPUT_SUFFIX) and kind == "json":
+                task_refs[filename.removesuffix(TASK_OUTPUT_SUFFIX) + "_output"] = (data, content_hash)
+
+        execution_id = folder_path.name.rsplit("_", 1)[-1]
+        if RESULT_FILENAME in files:
+            kind, data = files[RESULT_FILENAME]
+            if kind == "json":
+                execution_id = data.get("execution_id", execution_id)
+                # Task outputs are stored once and referenced from the combined result
+                data = {
+                    key: {"$payload": task_refs[key][1]}
+                    if key in task_refs and _canonical(task_refs[key][0]) == _canonical(value) else value
+                    for key, value in data.items()
+                }
+            content_hash = _content_hash(kind, data)
+            payloads.append((content_hash, kind, data))
+            file_hashes[RESULT_FILENAME] = content_hash
+
+        metadata = files.get("execution_metadata.json")
+        if metadata and metadata[0] == "json":
+            execution_id = metadata[1].get("execution_id", execution_id)
+        return execution_id, file_hashes, payloads
+
+    def _append_frames(self, segment: str, records: List[Dict[str, Any]]) -> List[Tuple[int, int, int]]:
+        """Append records to a segment, returning (offset, length, line) per record"""
+        locations = []
+        path = self.archive_dir / segment
+        with open(path, 'ab') as f:
+            frame: List[bytes] = []
+            frame_bytes = 0
+
+            def write_frame():
+                offset = f.tell()
+                compressed = _compress(b"\n".join(frame))
+                f.write(compressed)
+                locations.extend((offset, len(compressed), line) for line in range(len(frame)))
+
+            for record in records:
+                line = json.dumps(record, separators=(",", ":"), default=str).encode("utf-8")
+                if frame and (len(frame) >= MAX_FRAME_RECORDS or frame_bytes + len(line) > MAX_FRAME_BYTES):
+                    write_frame()
+                    frame, frame_bytes = [], 0
+                frame.append(line)
+                frame_bytes += len(line)
+            if frame:
+                write_frame()
+            f.flush()
+            os.fsync(f.fileno())
+        return locations
+
+    def compact(
+        self,
+        base_output_dir: str,
+        older_than_days: int = 30,
+        delete_folders: bool = True,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Roll execution folders older than a cutoff into the month segments
+
+        Segments are appended and indexed before any folder is removed, so an
+        interrupted compaction never loses an execution.
+
+        Args:
+            base_output_dir: Directory containing the execution folders
+            older_than_days: Archive executions older than this many days
+            delete_folders: Remove the folders once they are indexed
+            now: Reference time for the cutoff (default: now)
+
+        Returns:
+            Compaction report with file, byte and deduplication counts
+        """
+        cutoff = ((now or datetime.now()) - timedelta(days=older_than_days)).isoformat()
+        report = {"executions": 0, "files": 0, "payloads_written": 0, "duplicates": 0,
+                  "bytes_before": 0, "bytes_after": 0, "segments": []}
+
+        for segment, folders in sorted(self._collect(Path(base_output_dir), cutoff).items()):
+            with closing(self.catalog.connect()) as conn:
+                known = {row[0] for row in conn.execute(
+                    "SELECT hash FROM archive_payloads WHERE segment = ?", (segment,)
+                )}
+                done = {row[0] for row in conn.execute(
+                    "SELECT execution_id FROM archived_executions WHERE segment = ?", (segment,)
+                )}
+
+            records, hashes, executions = [], [], []
+            for folder_path, timestamp in folders:
+                execution_id, file_hashes, payloads = self._execution_records(folder_path)
+                report["bytes_before"] += sum(p.stat().st_size for p in folder_path.iterdir() if p.is_file())
+                executions.append((folder_path, execution_id, timestamp, file_hashes))
+                if execution_id in done:
+                    continue
+                for content_hash, kind, data in payloads:
+                    if content_hash in known:
+                        report["duplicates"] += 1
+                        continue
+                    known.add(content_hash)
+                    records.append({"hash": content_hash, "kind": kind, "data": data})
+                    hashes.append(content_hash)
+                records.append({"execution_id": execution_id, "timestamp": timestamp, "files": file_hashes})
+                hashes.append(None)
+                report["files"] += len(file_hashes)
+
+            segment_path = self.archive_dir / segment
+            size_before = segment_path.stat().st_size if segment_path.exists() else 0
+            locations = self._append_frames(segment, records) if records else []
+            report["bytes_after"] += (segment_path.stat().st_size if segment_path.exists() else 0) - size_before
+
+            archived_at = datetime.now().isoformat()
+            with closing(self.catalog.connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO archive_payloads VALUES (?, ?, ?, ?, ?)",
+                    [(segment, h, *loc) for h, loc in zip(hashes, locations) if h is not None]
+                )
+                for folder_path, execution_id, timestamp, file_hashes in executions:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO archived_executions VALUES (?, ?, ?, ?)",
+                        (execution_id, segment, timestamp, archived_at)
+                    )
+                    conn.execute("DELETE FROM archive_files WHERE execution_id = ?", (execution_id,))
+                    conn.executemany(
+                        "INSERT INTO archive_files VALUES (?, ?, ?)",
+                        [(execution_id, filename, h) for filename, h in file_hashes.items()]
+                    )
+
+            if delete_folders:
+                for folder_path, *_ in executions:
+                    shutil.rmtree(folder_path)
+
+            report["executions"] += len(executions)
+            report["payloads_written"] += sum(h is not None for h in hashes)
+            report["segments"].append(segment)
+
+        return report
+
+    def apply_retention(self, retention_days: int, now: Optional[datetime] = None) -> List[str]:
+        """
+        Drop archived months that are entirely older than the retention period
+
+        The segment files, their index entries and the catalog rows of their
+        executions are removed.
+
+        Args:
+            retention_days: Number of days archived executions are kept
+            now: Reference time for the cutoff (default: now)
+
+        Returns:
+            Names of the removed segments
+        """
+        cutoff_month = ((now or datetime.now()) - timedelta(days=retention_days)).strftime("%Y-%m")
+        removed = []
+        for path in sorted(self.archive_dir.glob("*.jsonl.*")):
+            month = path.name.split(".", 1)[0]
+            if month >= cutoff_month:
+                continue
+            with closing(self.catalog.connect()) as conn, conn:
+                conn.execute(
+                    "DELETE FROM executions WHERE execution_id IN "
+                    "(SELECT execution_id FROM archived_executions WHERE segment = ?)",
+                    (path.name,)
+                )
+                conn.execute(
+                    "DELETE FROM archive_files WHERE execution_id IN "
+                    "(SELECT execution_id FROM archived_executions WHERE segment = ?)",
+                    (path.name,)
+                )
+                conn.execute("DELETE FROM archived_executions WHERE segment = ?", (path.name,))
+                conn.execute("DELETE FROM archive_payloads WHERE segment = ?", (path.name,))
+            path.unlink()
+            removed.append(path.name)
+        self._frames.clear()
+        return removed
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-segment execution, payload and size statistics"""
+        with closing(self.catalog.connect()) as conn:
+            executions = dict(conn.execute(
+                "SELECT segment, COUNT(*) FROM archived_executions GROUP BY segment"
+            ).fetchall())
+            payloads = dict(conn.execute(
+                "SELECT segment, COUNT(*) FROM archive_payloads GROUP BY segment"
+            ).fetchall())
+            files = dict(conn.execute(
+                "SELECT e.segment, COUNT(*) FROM archive_files f "
+                "JOIN archived_executions e USING (execution_id) GROUP BY e.segment"
+            ).fetchall())
+        return [
+            {
+                "segment": path.name,
+                "executions": executions.get(path.name, 0),
+                "files": files.get(path.name, 0),
+                "payloads": payloads.get(path.name, 0),
+                "bytes": path.stat().st_size,
+            }
+            for path in sorted(self.archive_dir.glob("*.jsonl.*"))
+        ]
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line interface for the execution archive"""
+    parser = argparse.ArgumentParser(description="Compact and query archived executions")
+    parser.add_argument("--output-dir", default="outputs", help="StorageManager output directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser("compact", help="Archive old execution folders")
+    compact.add_argument("--older-than-days", type=int, default=30)
+    compact.add_argument("--retention-days", type=int, help="Drop archived months older than this")
+    compact.add_argument("--keep-folders", action="store_true", help="Do not delete archived folders")
+
+    show = commands.add_parser("show", help="List the archived files of an execution")
+    show.add_argument("execution_id")
+
+    commands.add_parser("stats", help="Per-segment statistics")
+
+    args = parser.parse_args(argv)
+    archive = ExecutionArchive(ExecutionCatalog(Path(args.output_dir) / CATALOG_FILENAME))
+
+    if args.command == "compact":
+        report = archive.compact(args.output_dir, args.older_than_days, delete_folders=not args.keep_folders)
+        if args.retention_days is not None:
+            report["removed_segments"] = archive.apply_retention(args.retention_days)
+        print(json.dumps(report, indent=2))
+    elif args.command == "show":
+        files = archive.load_files(args.execution_id)
+        if files is None:
+            print(f"Execution {args.execution_id} is not archived")
+            return
+        for filename, data in sorted(files.items()):
+            print(f"{filename}: {len(_canonical(data))} bytes")
+    else:
+        print(json.dumps(archive.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+Indexed catalog of saved crew executions
+
+Every execution saved by StorageManager is upserted into a SQLite database in
+the output directory, so past runs can be found by date, status or token usage
+without walking the execution folders.
+
+Usage (from the crewai_with_tools directory):
+    python -m crew_agent.execution_catalog last -n 10
+    python -m crew_agent.execution_catalog date 2025-11-25
+    python -m crew_agent.execution_catalog tokens --by day --since 2025-11-01
+    python -m crew_agent.execution_catalog rebuild
+"""
+import json
+import sqlite3
+import argparse
+from pathlib import Path
+from contextlib import closing
+from typing import Optional, Dict, Any, List
+
+from crew_agent.output_models import CrewExecutionResult, TokenUsage
+
+
+CATALOG_FILENAME = "catalog.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    execution_id TEXT PRIMARY KEY,
+    folder_path TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    run_date TEXT,
+    status TEXT,
+    entity_id TEXT,
+    model_name TEXT,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    output_paths TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_executions_timestamp ON executions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_executions_run_date ON executions(run_date, timestamp);
+CREATE INDEX IF NOT EXISTS idx_executions_status ON executions(status, timestamp);
+
+CREATE TABLE IF NOT EXISTS task_tokens (
+    execution_id TEXT NOT NULL REFERENCES executions(execution_id) ON DELETE CASCADE,
+    task_name TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (execution_id, task_name)
+);
+CREATE INDEX IF NOT EXISTS idx_task_tokens_task ON task_tokens(task_name);
+"""
+
+EXECUTION_COLUMNS = (
+    "execution_id", "folder_path", "timestamp", "run_date", "status", "entity_id",
+    "model_name", "prompt_tokens", "completion_tokens", "total_tokens", "output_paths"
+)
+
+# Expressions used to group token aggregates
+GROUP_BY = {
+    "day": "substr(e.timestamp, 1, 10)",
+    "month": "substr(e.timestamp, 1, 7)",
+    "date": "e.run_date",
+    "status": "e.status",
+    "entity": "e.entity_id",
+    "model": "e.model_name",
+}
+
+
+class ExecutionCatalog:
+    """SQLite index over the executions saved by StorageManager"""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the catalog, creating the database if needed
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self.connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection; one per call keeps the catalog safe to share across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def upsert(
+        self,
+        execution_id: str,
+        folder_path: str,
+        execution_result: CrewExecutionResult,
+        output_paths: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[str] = None
+    ):
+        """
+        Insert or replace the catalog row of an execution
+
+        Args:
+            execution_id: ID of the execution folder
+            folder_path: Path to the execution folder
+            execution_result: Saved execution result
+            output_paths: Paths of the files written for the execution
+            timestamp: ISO timestamp of the execution (default: result timestamp)
+        """
+        self.upsert_many([(execution_id, folder_path, execution_result, output_paths, timestamp)])
+
+    def upsert_many(self, entries: List[tuple]):
+        """
+        Insert or replace many executions in a single transaction
+
+        Args:
+            entries: Tuples of upsert() arguments
+                (execution_id, folder_path, execution_result, output_paths, timestamp)
+        """
+        rows, task_rows = [], []
+        for execution_id, folder_path, execution_result, output_paths, timestamp in entries:
+            metadata = execution_result.metadata or {}
+            usage = execution_result.total_token_usage
+            rows.append((
+                execution_id,
+                str(folder_path),
+                timestamp or execution_result.timestamp.isoformat(),
+                metadata.get("current_date"),
+                metadata.get("status"),
+                metadata.get("entity_id"),
+                usage.model_name,
+                usage.prompt_tokens,
+                usage.completion_tokens,
+                usage.total_tokens,
+                json.dumps(output_paths or {}),
+            ))
+            for task_name, task_usage in execution_result.task_token_usage.items():
+                # task_token_usage is an untyped dict; results loaded from JSON hold plain dicts
+                u = TokenUsage.model_validate(task_usage)
+                task_rows.append((execution_id, task_name, u.prompt_tokens, u.completion_tokens, u.total_tokens))
+
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                "DELETE FROM task_tokens WHERE execution_id = ?",
+                [(row[0],) for row in rows]
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO executions ({', '.join(EXECUTION_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(EXECUTION_COLUMNS))})",
+                rows
+            )
+            conn.executemany("INSERT INTO task_tokens VALUES (?, ?, ?, ?, ?)", task_rows)
+
+    def _rows(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """Run a query and return rows as dictionaries"""
+        with closing(self.connect()) as conn:
+            rows = [dict(row) for row in conn.execute(query, params)]
+        for row in rows:
+            if "output_paths" in row:
+                row["output_paths"] = json.loads(row["output_paths"] or "{}")
+        return rows
+
+    def get(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single execution with its per-task token usage
+
+        Args:
+            execution_id: ID of the execution
+
+        Returns:
+            Execution row, or None if it is not in the catalog
+        """
+        rows = self._rows("SELECT * FROM executions WHERE execution_id = ?", (execution_id,))
+        if not rows:
+            return None
+        execution = rows[0]
+        execution["task_tokens"] = self._rows(
+            "SELECT task_name, prompt_tokens, completion_tokens, total_tokens "
+            "FROM task_tokens WHERE execution_id = ? ORDER BY task_name",
+            (execution_id,)
+        )
+        return execution
+
+    def last_runs(self, n: int = 10, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the most recent executions
+
+        Args:
+            n: Number of executions to return
+            status: Only return executions with this status
+
+        Returns:
+            Executions, newest first
+        """
+        if status:
+            return self._rows(
+                "SELECT * FROM executions WHERE status = ? ORDER BY timestamp DESC LIMIT ?",
+                (status, n)
+            )
+        return self._rows("SELECT * FROM executions ORDER BY timestamp DESC LIMIT ?", (n,))
+
+    def runs_for_date(self, current_date: str) -> List[Dict[str, Any]]:
+        """
+        Get the executions for a briefing date
+
+        Args:
+            current_date: Date the crew was run for (YYYY-MM-DD)
+
+        Returns:
+            Executions, oldest first
+        """
+        return self._rows(
+            "SELECT * FROM executions WHERE run_date = ? ORDER BY timestamp",
+            (current_date,)
+        )
+
+    def token_totals(
+        self,
+        group_by: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate token usage over executions
+
+        Args:
+            group_by: One of GROUP_BY, or 'task' for per-task totals (default: no grouping)
+            since: Only include executions with timestamp >= since (ISO date or datetime)
+            until: Only include executions with timestamp < until (ISO date or datetime)
+
+        Returns:
+            One row per group with run count and token sums
+        """
+        conditions, params = [], []
+        if since:
+            conditions.append("e.timestamp >= ?")
+            params.append(since)
+        if until:
+            conditions.append("e.timestamp < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        if group_by == "task":
+            return self._rows(
+                "SELECT t.task_name AS grp, COUNT(*) AS runs, SUM(t.prompt_tokens) AS prompt_tokens, "
+                "SUM(t.completion_tokens) AS completion_tokens, SUM(t.total_tokens) AS total_tokens "
+                # CROSS JOIN keeps executions as the outer loop so the timestamp index is used
+                f"FROM executions e CROSS JOIN task_tokens t ON t.execution_id = e.execution_id {where} "
+                "GROUP BY grp ORDER BY grp",
+                tuple(params)
+            )
+
+        if group_by is not None and group_by not in GROUP_BY:
+            raise ValueError(f"Unsupported grouping: {group_by}")
+        group_expr = GROUP_BY.get(group_by, "'all'")
+        return self._rows(
+            f"SELECT {group_expr} AS grp, COUNT(*) AS runs, SUM(e.prompt_tokens) AS prompt_tokens, "
+            "SUM(e.completion_tokens) AS completion_tokens, SUM(e.total_tokens) AS total_tokens "
+            f"FROM executions e {where} GROUP BY grp ORDER BY grp",
+            tuple(params)
+        )
+
+    def delete(self, execution_id: str):
+        """Remove an execution from the catalog"""
+        with closing(self.connect()) as conn, conn:
+            conn.execute("DELETE FROM executions WHERE execution_id = ?", (execution_id,))
+
+    def rebuild(self, base_output_dir: str) -> int:
+        """
+        Index execution folders that were saved before the catalog existed
+
+        Args:
+            base_output_dir: Directory containing the execution folders
+
+        Returns:
+            Number of executions indexed
+        """
+        entries = []
+        for result_path in sorted(Path(base_output_dir).glob("*/complete_execution_result.json")):
+            folder_path = result_path.parent
+            metadata_path = folder_path / "execution_metadata.json"
+            try:
+                with open(result_path, 'r', encoding='utf-8') as f:
+                    execution_result = CrewExecutionResult.model_validate(json.load(f))
+                metadata = {}
+                if metadata_path.exists():
+                    with open(metadata_path, 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping {folder_path}: {e}")
+                continue
+
+            # Same layout as the paths recorded by StorageManager.save_crew_execution_result
+            output_paths = {"complete_result": str(result_path)}
+            for json_path in folder_path.glob("*_output.json"):
+                task_paths = {"json": str(json_path)}
+                md_path = json_path.with_suffix(".md")
+                if md_path.exists():
+                    task_paths["markdown"] = str(md_path)
+                output_paths[json_path.stem.removesuffix("_output")] = task_paths
+
+            entries.append((
+                metadata.get("execution_id", execution_result.execution_id),
+                str(folder_path),
+                execution_result,
+                output_paths,
+                metadata.get("timestamp")
+            ))
+
+        for i in range(0, len(entries), 1000):
+            self.upsert_many(entries[i:i + 1000])
+        return len(entries)
+
+
+def _print_rows(rows: List[Dict[str, Any]], columns: tuple):
+    """Print rows as an aligned table"""
+    if not rows:
+        print("No executions found")
+        return
+    table = [[str(row.get(c) if row.get(c) is not None else "-") for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in table)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in table:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line interface for the execution catalog"""
+    parser = argparse.ArgumentParser(description="Query the execution catalog")
+    parser.add_argument("--output-dir", default="outputs", help="StorageManager output directory")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    last = commands.add_parser("last", help="Most recent executions")
+    last.add_argument("-n", type=int, default=10)
+    last.add_argument("--status")
+
+    by_date = commands.add_parser("date", help="Executions for a briefing date")
+    by_date.add_argument("current_date", help="YYYY-MM-DD")
+
+    show = commands.add_parser("show", help="One execution with per-task tokens")
+    show.add_argument("execution_id")
+
+    tokens = commands.add_parser("tokens", help="Token usage aggregates")
+    tokens.add_argument("--by", choices=[*GROUP_BY, "task"])
+    tokens.add_argument("--since")
+    tokens.add_argument("--until")
+
+    commands.add_parser("rebuild", help="Index existing execution folders")
+
+    args = parser.parse_args(argv)
+    catalog = ExecutionCatalog(Path(args.output_dir) / CATALOG_FILENAME)
+    run_columns = ("execution_id", "timestamp", "run_date", "status", "total_tokens")
+
+    if args.command == "rebuild":
+        print(f"Indexed {catalog.rebuild(args.output_dir)} executions")
+        return
+
+    if args.command == "last":
+        rows, columns = catalog.last_runs(args.n, args.status), run_columns
+    elif args.command == "date":
+        rows, columns = catalog.runs_for_date(args.current_date), run_columns
+    elif args.command == "show":
+        execution = catalog.get(args.execution_id)
+        rows, columns = ([execution] if execution else []), run_columns
+    else:
+        rows = catalog.token_totals(args.by, args.since, args.until)
+        columns = ("grp", "runs", "prompt_tokens", "completion_tokens", "total_tokens")
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_rows(rows, columns)
+        if args.command == "show" and rows:
+            print()
+            _print_rows(rows[0]["task_tokens"], ("task_name", "prompt_tokens", "completion_tokens", "total_tokens"))
+
+
+if __name__ == "__main__":
+    main()
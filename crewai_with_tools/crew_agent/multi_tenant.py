@@ -0,0 +1,141 @@
+import re
+import json
+import time
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Callable
+
+from crew_runtime.instrumentation import _percentile
+from crew_runtime.rate_limiter import limiter
+from crew_agent.tool_compaction import current_entity
+
+
+def entity_slug(entity_id: str) -> str:
+    """Filesystem-safe folder name for an entity"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", entity_id).strip("_") or "default"
+
+
+class MultiTenantRunner:
+    """Runs the daily assistant for many Composio entities concurrently"""
+
+    def __init__(
+        self,
+        run_user: Callable[[str, str], Any],
+        base_output_dir: str = "outputs/users",
+        max_workers: int = 16,
+        latency_slo_s: Optional[float] = None,
+        priority: str = "batch"
+    ):
+        """
+        Initialize the runner
+
+        Args:
+            run_user: Callable taking (entity_id, output_dir) and returning the
+                user's CrewExecutionResult (or any object with total_token_usage)
+            base_output_dir: Directory containing one output folder per user
+            max_workers: Maximum number of users processed at the same time
+            latency_slo_s: Per-user latency objective in seconds; slower runs are
+                counted as slow (they are not interrupted and still succeed)
+            priority: Rate limiter priority of the users' LLM and tool calls; batch
+                runs queue behind interactive ones sharing the same keys
+        """
+        self.run_user = run_user
+        self.base_output_dir = Path(base_output_dir)
+        self.max_workers = max_workers
+        self.latency_slo_s = latency_slo_s
+        self.priority = priority
+        self._lock = threading.Lock()
+        self.results: List[Dict[str, Any]] = []
+
+    def _run_one(self, entity_id: str, queued_at: float) -> Dict[str, Any]:
+        """Run a single user in isolation and record latency and token usage"""
+        token = current_entity.set(entity_id)
+        started_at = time.perf_counter()
+        record = {
+            "entity_id": entity_id,
+            "queue_wait_s": round(started_at - queued_at, 3),
+            "status": "success",
+            "error": None,
+            "total_tokens": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+        try:
+            output_dir = self.base_output_dir / entity_slug(entity_id)
+            with limiter.priority(self.priority):
+                result = self.run_user(entity_id, str(output_dir))
+            usage = getattr(result, "total_token_usage", None)
+            if usage is not None:
+                record["total_tokens"] = usage.total_tokens
+                record["prompt_tokens"] = usage.prompt_tokens
+                record["completion_tokens"] = usage.completion_tokens
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            current_entity.reset(token)
+
+        record["latency_s"] = round(time.perf_counter() - started_at, 3)
+        record["slow"] = bool(self.latency_slo_s and record["latency_s"] > self.latency_slo_s)
+        with self._lock:
+            self.results.append(record)
+        return record
+
+    def run(self, entity_ids: List[str]) -> Dict[str, Any]:
+        """
+        Run the assistant for every entity
+
+        Each entity runs at most once per call and gets its own crew, tool
+        bindings and output folder; a failing user never affects the others.
+        Users are started in the given order, so every user waits for at most
+        len(entity_ids) / max_workers runs ahead of it.
+
+        Args:
+            entity_ids: Composio entity IDs to run
+
+        Returns:
+            Summary with per-user records and latency/token aggregates
+        """
+        unique_ids = list(dict.fromkeys(entity_ids))
+        self.results = []
+        started_at = time.perf_counter()
+        queued_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tenant") as executor:
+            futures = [executor.submit(self._run_one, entity_id, queued_at) for entity_id in unique_ids]
+            for future in as_completed(futures):
+                record = future.result()
+                icon = "✅" if record["status"] == "success" else "❌"
+                slow = " (over the latency SLO)" if record["slow"] else ""
+                print(f"{icon} {record['entity_id']}: {record['status']} in {record['latency_s']}s{slow}")
+
+        return self.summary(time.perf_counter() - started_at)
+
+    def summary(self, wall_time_s: float) -> Dict[str, Any]:
+        """Aggregate the recorded per-user results"""
+        latencies = [r["latency_s"] for r in self.results]
+        return {
+            "users": len(self.results),
+            "succeeded": sum(r["status"] == "success" for r in self.results),
+            "failed": sum(r["status"] != "success" for r in self.results),
+            "slow": sum(r["slow"] for r in self.results),
+            "latency_slo_s": self.latency_slo_s,
+            "wall_time_s": round(wall_time_s, 3),
+            "throughput_users_per_min": round(len(self.results) / wall_time_s * 60, 2) if wall_time_s else None,
+            "latency_p50_s": _percentile(latencies, 0.5),
+            "latency_p95_s": _percentile(latencies, 0.95),
+            "latency_max_s": max(latencies, default=None),
+            "total_tokens": sum(r["total_tokens"] for r in self.results),
+            "rate_limits": limiter.stats(),
+            "per_user": sorted(self.results, key=lambda r: r["entity_id"]),
+        }
+
+    def save_report(self, report: Dict[str, Any]) -> Path:
+        """Save a run report next to the per-user output folders"""
+        self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        report_path = self.base_output_dir / f"multi_tenant_report_{datetime.now():%Y%m%dT%H%M%S}.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report_path
@@ -23,6 +23,12 @@ class DailyCalendarOutput(BaseModel):
     summary: str
 
 
+class CalendarSummaryOutput(BaseModel):
+    """Output model for daily_calendar_tasks (events are extracted locally)"""
+    summary: str
+    todo_list: Optional[List[str]] = None
+
+
 class Email(BaseModel):
     """Model for a single email"""
     sender: str
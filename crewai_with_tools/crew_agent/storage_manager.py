@@ -1,11 +1,19 @@
-import os
 import json
+import time
 import uuid
+import queue
+import atexit
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union, Callable
 from pydantic import BaseModel
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with crewai, fall back to the stdlib
+    orjson = None
+
 from crew_agent.output_models import (
     CrewExecutionResult,
     DailyCalendarOutput,
@@ -14,32 +22,107 @@ from crew_agent.output_models import (
     TokenUsage,
     ExecutionMetadata
 )
+from crew_agent.execution_catalog import ExecutionCatalog, CATALOG_FILENAME
+from crew_agent.execution_archive import ExecutionArchive
+from crew_runtime.files import atomic_write
+
+
+def dump_json(data: Any) -> bytes:
+    """Serialize data as indented JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
+
+
+class BackgroundWriter:
+    """Single thread that performs queued file writes off the caller's critical path"""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self.errors: list[str] = []
+        self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job()
+            except Exception as e:
+                self.errors.append(f"{type(e).__name__}: {e}")
+                print(f"❌ Background write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, job: Callable[[], None]):
+        """Queue a write job"""
+        self._queue.put(job)
+
+    def flush(self):
+        """Block until all queued writes are on disk"""
+        self._queue.join()
+
+
+_shared_writer: Optional[BackgroundWriter] = None
+_shared_writer_lock = threading.Lock()
+
+
+def get_background_writer() -> BackgroundWriter:
+    """Return the process-wide background writer, starting it on first use"""
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = BackgroundWriter()
+        return _shared_writer
 
 
 class StorageManager:
     """Manages storage of CrewAI execution outputs"""
 
-    def __init__(self, base_output_dir: str = "outputs"):
+    def __init__(
+        self,
+        base_output_dir: str = "outputs",
+        use_catalog: bool = True,
+        background: bool = False,
+        catalog_path: Optional[str] = None
+    ):
         """
         Initialize the storage manager
 
         Args:
             base_output_dir: Base directory for storing outputs (default: "outputs")
+            use_catalog: Index saved executions in the SQLite execution catalog
+            background: Hand file writes to the shared background writer thread;
+                call flush() before reading the outputs back
+            catalog_path: Execution catalog database (default: catalog.db in
+                base_output_dir); storage managers of several users can share one
         """
         self.base_output_dir = Path(base_output_dir)
-        self.base_output_dir.mkdir(exist_ok=True)
-
-    def create_execution_folder(self, folder_name: str) -> tuple[str, Path]:
+        self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        catalog_path = Path(catalog_path) if catalog_path else self.base_output_dir / CATALOG_FILENAME
+        self.catalog = ExecutionCatalog(catalog_path) if use_catalog else None
+        self.archive = ExecutionArchive(self.catalog) if use_catalog else None
+        self.writer = get_background_writer() if background else None
+        self.last_save_stats: Dict[str, Any] = {}
+
+    def flush(self):
+        """Wait for pending background writes to complete"""
+        if self.writer:
+            self.writer.flush()
+
+    def create_execution_folder(self, folder_name: str, execution_id: Optional[str] = None) -> tuple[str, Path]:
         """
         Create a unique folder for an execution with UUID
 
         Args:
             folder_name: Name prefix for the folder
+            execution_id: ID to use for the folder (default: new UUID)
 
         Returns:
             Tuple of (execution_id, folder_path)
         """
-        execution_id = str(uuid.uuid4())
+        execution_id = execution_id or str(uuid.uuid4())
         folder_path = self.base_output_dir / f"{folder_name}_{execution_id}"
         folder_path.mkdir(parents=True, exist_ok=True)
         return execution_id, folder_path
@@ -48,7 +131,7 @@ class StorageManager:
         self,
         folder_path: Path,
         task_name: str,
-        output_data: BaseModel,
+        output_data: Union[BaseModel, Dict[str, Any]],
         raw_output: Optional[str] = None
     ) -> Dict[str, str]:
         """
@@ -57,40 +140,45 @@ class StorageManager:
         Args:
             folder_path: Path to the execution folder
             task_name: Name of the task
-            output_data: Pydantic model containing the structured output
+            output_data: Pydantic model containing the structured output,
+                or its already dumped dictionary
             raw_output: Raw string output from the task
 
         Returns:
             Dictionary with paths to saved files
         """
-        saved_files = {}
-
-        # Save JSON output
-        json_path = folder_path / f"{task_name}_output.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data.model_dump(), f, indent=2, default=str)
-        saved_files['json'] = str(json_path)
-
-        # Save Markdown output
-        md_path = folder_path / f"{task_name}_output.md"
-        with open(md_path, 'w', encoding='utf-8') as f:
-            f.write(f"# {task_name.replace('_', ' ').title()}\n\n")
-            f.write(f"**Generated at:** {datetime.now().isoformat()}\n\n")
-            f.write("---\n\n")
+        files = self._render_task_output(folder_path, task_name, output_data, raw_output)
+        for path, data in files.items():
+            atomic_write(path, data)
+        json_path, md_path = files.keys()
+        return {'json': str(json_path), 'markdown': str(md_path)}
 
+    def _render_task_output(
+        self,
+        folder_path: Path,
+        task_name: str,
+        output_data: Union[BaseModel, Dict[str, Any]],
+        raw_output: Optional[str] = None
+    ) -> Dict[Path, bytes]:
+        """Render the JSON and Markdown files of a task output from a single dump"""
+        data = output_data.model_dump() if isinstance(output_data, BaseModel) else output_data
+
+        md_parts = [
+            f"# {task_name.replace('_', ' ').title()}\n\n",
+            f"**Generated at:** {datetime.now().isoformat()}\n\n",
+            "---\n\n",
             # Write structured data
-            f.write("## Structured Output\n\n")
-            f.write(self._format_model_as_markdown(output_data))
-
-            # Write raw output if available
-            if raw_output:
-                f.write("\n\n---\n\n")
-                f.write("## Raw Output\n\n")
-                f.write(raw_output)
-
-        saved_files['markdown'] = str(md_path)
-
-        return saved_files
+            "## Structured Output\n\n",
+            self._format_data_as_markdown(data),
+        ]
+        # Write raw output if available
+        if raw_output:
+            md_parts.extend(["\n\n---\n\n", "## Raw Output\n\n", raw_output])
+
+        return {
+            folder_path / f"{task_name}_output.json": dump_json(data),
+            folder_path / f"{task_name}_output.md": "".join(md_parts).encode('utf-8'),
+        }
 
     def save_token_usage(
         self,
@@ -106,19 +194,22 @@ class StorageManager:
             task_token_usage: Dictionary mapping task names to their token usage
             total_token_usage: Total token usage across all tasks
         """
-        token_data = {
-            "total_usage": total_token_usage.model_dump(),
-            "task_usage": {
-                task_name: usage.model_dump()
+        atomic_write(folder_path / "token_usage.json", dump_json(self._token_usage_data(
+            total_token_usage.model_dump(),
+            {
+                task_name: TokenUsage.model_validate(usage).model_dump()
                 for task_name, usage in task_token_usage.items()
-            },
+            }
+        )))
+
+    def _token_usage_data(self, total_usage: Dict[str, Any], task_usage: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the token_usage.json document"""
+        return {
+            "total_usage": total_usage,
+            "task_usage": task_usage,
             "timestamp": datetime.now().isoformat()
         }
 
-        token_path = folder_path / "token_usage.json"
-        with open(token_path, 'w', encoding='utf-8') as f:
-            json.dump(token_data, f, indent=2)
-
     def save_execution_metadata(
         self,
         folder_path: Path,
@@ -133,82 +224,161 @@ class StorageManager:
             execution_id: Unique execution ID
             metadata: Dictionary containing execution metadata
         """
-        metadata_data = {
+        atomic_write(folder_path / "execution_metadata.json", dump_json(self._metadata_data(execution_id, metadata)))
+
+    def _metadata_data(self, execution_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the execution_metadata.json document"""
+        return {
             "execution_id": execution_id,
             "timestamp": datetime.now().isoformat(),
             **metadata
         }
 
-        metadata_path = folder_path / "execution_metadata.json"
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata_data, f, indent=2, default=str)
-
     def save_crew_execution_result(
         self,
         folder_name: str,
         execution_result: CrewExecutionResult,
-        raw_outputs: Optional[Dict[str, str]] = None
+        raw_outputs: Optional[Dict[str, str]] = None,
+        on_saved: Optional[Callable[[], None]] = None
     ) -> Path:
         """
         Complete workflow to save all execution results
 
+        The result is dumped once and every file is rendered from that dump,
+        then written atomically (synchronously, or by the background writer).
+        Serialization time and bytes written are kept in last_save_stats.
+
         Args:
             folder_name: Name prefix for the output folder
             execution_result: Complete execution result with all outputs
             raw_outputs: Dictionary mapping task names to raw string outputs
+            on_saved: Called once every file is written and the execution is
+                indexed; not called if the save fails
 
         Returns:
             Path to the created folder
         """
-        execution_id, folder_path = self.create_execution_folder(folder_name)
+        start = time.perf_counter()
+        execution_id, folder_path = self.create_execution_folder(folder_name, execution_result.execution_id)
         raw_outputs = raw_outputs or {}
 
-        # Save individual task outputs
-        if execution_result.daily_calendar_output:
-            self.save_task_output(
-                folder_path,
-                "daily_calendar",
-                execution_result.daily_calendar_output,
-                raw_outputs.get("daily_calendar")
-            )
-
-        if execution_result.email_extraction_output:
-            self.save_task_output(
-                folder_path,
-                "email_extraction",
-                execution_result.email_extraction_output,
-                raw_outputs.get("email_extraction")
-            )
+        # Dump the result once; every file below is rendered from this dictionary
+        result_data = execution_result.model_dump()
+        files: Dict[Path, bytes] = {}
+        output_paths = {}
 
-        if execution_result.summary_generator_output:
-            self.save_task_output(
-                folder_path,
-                "summary_generator",
-                execution_result.summary_generator_output,
-                raw_outputs.get("summary_generator")
-            )
+        # Save individual task outputs
+        for task_name in ("daily_calendar", "email_extraction", "summary_generator"):
+            task_data = result_data.get(f"{task_name}_output")
+            if task_data:
+                task_files = self._render_task_output(folder_path, task_name, task_data, raw_outputs.get(task_name))
+                files.update(task_files)
+                json_path, md_path = task_files.keys()
+                output_paths[task_name] = {'json': str(json_path), 'markdown': str(md_path)}
 
         # Save token usage
-        self.save_token_usage(
-            folder_path,
-            execution_result.task_token_usage,
-            execution_result.total_token_usage
-        )
+        files[folder_path / "token_usage.json"] = dump_json(self._token_usage_data(
+            result_data["total_token_usage"],
+            {
+                task_name: usage.model_dump() if isinstance(usage, BaseModel) else usage
+                for task_name, usage in result_data["task_token_usage"].items()
+            }
+        ))
 
         # Save execution metadata
-        self.save_execution_metadata(
-            folder_path,
-            execution_id,
-            execution_result.metadata
+        files[folder_path / "execution_metadata.json"] = dump_json(
+            self._metadata_data(execution_id, result_data["metadata"])
         )
 
         # Save complete execution result
         complete_result_path = folder_path / "complete_execution_result.json"
-        with open(complete_result_path, 'w', encoding='utf-8') as f:
-            json.dump(execution_result.model_dump(), f, indent=2, default=str)
+        files[complete_result_path] = dump_json(result_data)
+        output_paths["complete_result"] = str(complete_result_path)
+        serialize_ms = (time.perf_counter() - start) * 1000
+
+        self.last_save_stats = {
+            "execution_id": execution_id,
+            "files": len(files),
+            "bytes_written": sum(len(data) for data in files.values()),
+            "serialize_ms": round(serialize_ms, 3),
+        }
+
+        def write_files():
+            write_start = time.perf_counter()
+            for path, data in files.items():
+                atomic_write(path, data)
+            # Index the execution in the catalog
+            if self.catalog:
+                self.catalog.upsert(execution_id, str(folder_path), execution_result, output_paths)
+            self.last_save_stats["write_ms"] = round((time.perf_counter() - write_start) * 1000, 3)
+            if on_saved:
+                on_saved()
+
+        if self.writer:
+            self.writer.submit(write_files)
+        else:
+            write_files()
 
         return folder_path
 
+    def find_execution_folder(self, execution_id: str) -> Optional[Path]:
+        """
+        Find the folder of a saved execution
+
+        Args:
+            execution_id: ID of the execution
+
+        Returns:
+            Path to the execution folder, or None if it no longer exists
+        """
+        if self.catalog:
+            execution = self.catalog.get(execution_id)
+            if execution and Path(execution["folder_path"]).is_dir():
+                return Path(execution["folder_path"])
+        return next((path for path in self.base_output_dir.glob(f"*_{execution_id}") if path.is_dir()), None)
+
+    def read_execution_file(self, execution_id: str, filename: str) -> Optional[bytes]:
+        """
+        Read an output file of an execution, from its folder or from the archive
+
+        Args:
+            execution_id: ID of the execution
+            filename: Name of the file (e.g. "summary_generator_output.json")
+
+        Returns:
+            File content, or None if the execution or file is not found
+        """
+        self.flush()
+        folder_path = self.find_execution_folder(execution_id)
+        if folder_path:
+            path = folder_path / filename
+            return path.read_bytes() if path.exists() else None
+
+        if self.archive:
+            data = self.archive.load_file(execution_id, filename)
+            if isinstance(data, bytes):
+                return data
+            if isinstance(data, str):
+                return data.encode('utf-8')
+            if data is not None:
+                return dump_json(data)
+        return None
+
+    def load_execution_result(self, execution_id: str) -> Optional[CrewExecutionResult]:
+        """
+        Load a saved execution result, resolving archived executions through the index
+
+        Args:
+            execution_id: ID of the execution
+
+        Returns:
+            The execution result, or None if it is not found
+        """
+        content = self.read_execution_file(execution_id, "complete_execution_result.json")
+        if content is None:
+            return None
+        return CrewExecutionResult.model_validate_json(content)
+
     def _format_model_as_markdown(self, model: BaseModel, indent: int = 0) -> str:
         """
         Format a Pydantic model as Markdown
@@ -217,13 +387,26 @@ class StorageManager:
             model: Pydantic model to format
             indent: Indentation level
 
+        Returns:
+            Formatted Markdown string
+        """
+        return self._format_data_as_markdown(model.model_dump(), indent)
+
+    def _format_data_as_markdown(self, data: Dict[str, Any], indent: int = 0) -> str:
+        """
+        Format a dumped Pydantic model as Markdown
+
+        Args:
+            data: Output of model_dump()
+            indent: Indentation level
+
         Returns:
             Formatted Markdown string
         """
         lines = []
         indent_str = "  " * indent
 
-        for field_name, field_value in model.model_dump().items():
+        for field_name, field_value in data.items():
             formatted_name = field_name.replace('_', ' ').title()
 
             if isinstance(field_value, list):
@@ -0,0 +1,151 @@
+import os
+import re
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List
+
+import numpy as np
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])|\n{2,}")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_TAG_RE = re.compile(r"<[^>]+>")
+_URL_RE = re.compile(r"https?://\S+")
+_SPACE_RE = re.compile(r"[ \t\r\f\v]+")
+
+_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just me more most my
+myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with you your
+yours yourself yourselves
+""".split())
+
+# Inboxes smaller than this are summarized in-process; spinning up workers costs more
+MIN_BATCH_FOR_POOL = 8
+
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def clean_text(text: str) -> str:
+    """Strip HTML tags, URLs and redundant whitespace from an email body"""
+    text = _URL_RE.sub(" ", _TAG_RE.sub(" ", text or ""))
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def split_sentences(text: str, min_words: int = 4) -> List[str]:
+    """Split text into sentences, dropping fragments shorter than min_words"""
+    sentences = []
+    for chunk in _SENTENCE_RE.split(text):
+        sentence = " ".join(chunk.split())
+        if len(sentence.split()) >= min_words:
+            sentences.append(sentence)
+    return sentences
+
+
+def _sentence_vectors(sentences: List[str]) -> np.ndarray:
+    """Build L2-normalized TF-IDF vectors for a list of sentences"""
+    tokenized = [
+        [w for w in _WORD_RE.findall(s.lower()) if w not in _STOPWORDS]
+        for s in sentences
+    ]
+    vocabulary = {w: i for i, w in enumerate(sorted({w for words in tokenized for w in words}))}
+    if not vocabulary:
+        return np.zeros((len(sentences), 0))
+
+    matrix = np.zeros((len(sentences), len(vocabulary)))
+    for row, words in enumerate(tokenized):
+        for word, count in Counter(words).items():
+            matrix[row, vocabulary[word]] = count
+
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def textrank(sentences: List[str], damping: float = 0.85, iterations: int = 50, tolerance: float = 1e-6) -> np.ndarray:
+    """
+    Score sentences with TextRank over cosine similarity of sentence vectors
+
+    Args:
+        sentences: Sentences to rank
+        damping: PageRank damping factor
+        iterations: Maximum number of power iterations
+        tolerance: Convergence threshold
+
+    Returns:
+        Array with one score per sentence
+    """
+    count = len(sentences)
+    vectors = _sentence_vectors(sentences)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1 / count), where=row_sums > 0)
+
+    scores = np.full(count, 1 / count)
+    for _ in range(iterations):
+        updated = (1 - damping) / count + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(text: str, max_sentences: int = 3, max_chars: int = 600) -> str:
+    """
+    Extractive summary of an email body
+
+    Args:
+        text: Raw email body (HTML or plain text)
+        max_sentences: Maximum number of sentences to keep
+        max_chars: Hard limit for the summary length
+
+    Returns:
+        The highest ranked sentences in their original order
+    """
+    sentences = split_sentences(clean_text(text))
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)[:max_chars]
+
+    # Slight preference for early sentences, where newsletters put the lede
+    position_bias = 1 + 1 / np.sqrt(np.arange(1, len(sentences) + 1))
+    scores = textrank(sentences) * position_bias
+    selected = sorted(np.argsort(-scores)[:max_sentences])
+    return " ".join(sentences[i] for i in selected)[:max_chars]
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Lazily create the shared worker pool"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+    return _executor
+
+
+def summarize_batch(texts: List[str], max_sentences: int = 3, max_chars: int = 600) -> List[str]:
+    """
+    Summarize many email bodies, using a process pool for larger batches
+
+    Args:
+        texts: Raw email bodies
+        max_sentences: Maximum number of sentences per summary
+        max_chars: Hard limit for each summary
+
+    Returns:
+        Summaries in the same order as texts
+    """
+    if len(texts) < MIN_BATCH_FOR_POOL:
+        return [summarize(text, max_sentences, max_chars) for text in texts]
+
+    chunksize = max(1, math.ceil(len(texts) / (4 * MAX_WORKERS)))
+    return list(_get_executor().map(
+        summarize, texts, [max_sentences] * len(texts), [max_chars] * len(texts), chunksize=chunksize
+    ))
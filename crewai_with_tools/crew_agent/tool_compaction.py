@@ -0,0 +1,206 @@
+import re
+import json
+import html
+import time
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Callable
+
+from crew_agent.output_models import CalendarEvent, Email
+from crew_agent.calendar_engine import extract_events
+from crew_runtime.instrumentation import current_run
+
+
+_SCRIPT_RE = re.compile(r"<(script|style|head)[^>]*>.*?</\1>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+# Entity whose run is executing in the current context, used to attribute metrics
+current_entity: ContextVar[Optional[str]] = ContextVar("current_entity", default=None)
+
+# Calls made outside a run are kept up to this count, for ad-hoc inspection
+MAX_UNSCOPED_CALLS = 1000
+
+# Fields the agent is allowed to see, declared by the task output models
+CALENDAR_EVENT_FIELDS = tuple(CalendarEvent.model_fields)
+EMAIL_FIELDS = tuple(Email.model_fields)
+
+
+def strip_html(text: str) -> str:
+    """Convert an HTML (or plain text) body into compact plain text"""
+    text = _SCRIPT_RE.sub(" ", text or "")
+    text = html.unescape(_TAG_RE.sub(" ", text))
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def truncate(text: str, budget: int) -> str:
+    """Truncate text to a character budget on a word boundary"""
+    if len(text) <= budget:
+        return text
+    return text[:budget].rsplit(" ", 1)[0] + " …"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def _serialize(payload: Any) -> str:
+    """Serialize a payload the way it is rendered into the agent context"""
+    return json.dumps(payload, default=str, separators=(",", ":"))
+
+
+def _headers(message: Dict[str, Any]) -> Dict[str, str]:
+    """Return lower-cased message headers from a Gmail payload"""
+    headers = (message.get("payload") or {}).get("headers") or []
+    return {
+        str(h.get("name", "")).lower(): str(h.get("value", ""))
+        for h in headers
+        if isinstance(h, dict)
+    }
+
+
+def _event_time(value: Any) -> Optional[str]:
+    """Read a Google Calendar start/end value"""
+    if isinstance(value, dict):
+        return value.get("dateTime") or value.get("date")
+    return value
+
+
+class ToolOutputCompactor:
+    """Projects Composio tool responses to the fields the agents actually need"""
+
+    def __init__(self, body_budget: int = 1500, agenda_budget: int = 300, max_items: int = 50):
+        """
+        Initialize the compactor
+
+        Args:
+            body_budget: Maximum characters kept from an email body
+            agenda_budget: Maximum characters kept from an event description
+            max_items: Maximum number of emails or events passed to the agent
+        """
+        self.body_budget = body_budget
+        self.agenda_budget = agenda_budget
+        self.max_items = max_items
+        # Call records per run ID (None: outside a run), dropped by forget() once a run is saved
+        self.calls: Dict[Optional[str], Any] = {None: deque(maxlen=MAX_UNSCOPED_CALLS)}
+        self._lock = threading.Lock()
+
+    def project_email(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Project a raw Gmail message onto the Email fields"""
+        headers = _headers(message)
+        body = message.get("messageText") or (message.get("preview") or {}).get("body") or ""
+        projected = {
+            "sender": message.get("sender") or headers.get("from"),
+            "subject": message.get("subject") or headers.get("subject"),
+            "date_received": message.get("messageTimestamp") or headers.get("date"),
+            "content_overview": truncate(strip_html(str(body)), self.body_budget),
+            "email_type": message.get("email_type"),
+        }
+        return {k: v for k, v in projected.items() if k in EMAIL_FIELDS and v}
+
+    def project_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Project a raw Google Calendar event onto the CalendarEvent fields"""
+        attendees = event.get("attendees") or []
+        projected = {
+            "title": event.get("summary") or event.get("title") or "(no title)",
+            "date_time": _event_time(event.get("start")),
+            "participants": [
+                a.get("displayName") or a.get("email")
+                for a in attendees
+                if isinstance(a, dict)
+            ] or None,
+            "agenda": truncate(strip_html(str(event.get("description") or "")), self.agenda_budget) or None,
+            "location": event.get("location"),
+            "event_type": event.get("eventType"),
+        }
+        return {k: v for k, v in projected.items() if k in CALENDAR_EVENT_FIELDS and v}
+
+    def dedupe_threads(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep only the most recent message of each thread"""
+        latest: Dict[str, Dict[str, Any]] = {}
+        for message in messages:
+            thread_id = message.get("threadId") or message.get("messageId") or id(message)
+            current = latest.get(thread_id)
+            if current is None or str(message.get("messageTimestamp", "")) > str(current.get("messageTimestamp", "")):
+                latest[thread_id] = message
+        return list(latest.values())
+
+    def compact_emails(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Compact a GMAIL_FETCH_EMAILS payload (raw or pre-classified)"""
+        compacted = {k: v for k, v in data.items() if k in ("pre_classified", "nextPageToken")}
+        for key in ("messages", "needs_review"):
+            if isinstance(data.get(key), list):
+                messages = self.dedupe_threads(data[key])[:self.max_items]
+                compacted[key] = [self.project_email(m) for m in messages]
+        return compacted
+
+    def compact_events(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Compact a GOOGLECALENDAR_FIND_EVENT payload"""
+        events = extract_events(data)
+        if events is None:
+            return data
+        return {"events": [self.project_event(e) for e in events[:self.max_items]]}
+
+    def processor(self, action_name: str, inner: Optional[Callable[[Dict], Dict]] = None) -> Callable[[Dict], Dict]:
+        """
+        Build a Composio post-processor that compacts one action's responses
+
+        Args:
+            action_name: Name of the Composio action
+            inner: Optional processor applied to the raw response first
+                (e.g. the email pre-classifier)
+
+        Returns:
+            Post-processor callable
+        """
+        compact = {
+            "GMAIL_FETCH_EMAILS": self.compact_emails,
+            "GOOGLECALENDAR_FIND_EVENT": self.compact_events,
+        }.get(action_name)
+
+        def process(response: Dict[str, Any]) -> Dict[str, Any]:
+            start = time.perf_counter()
+            before = _serialize(response)
+            processed = inner(response) if inner else response
+            data = processed.get("data") if isinstance(processed, dict) else None
+            if compact and isinstance(data, dict):
+                processed = {**processed, "data": compact(data)}
+            after = _serialize(processed)
+            record = {
+                "action": action_name,
+                "entity_id": current_entity.get(),
+                "bytes_before": len(before.encode("utf-8")),
+                "bytes_after": len(after.encode("utf-8")),
+                "tokens_before": estimate_tokens(before),
+                "tokens_after": estimate_tokens(after),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            }
+            with self._lock:
+                self.calls.setdefault(current_run.get(), []).append(record)
+            return processed
+
+        process.__name__ = f"compact_{action_name.lower()}"
+        return process
+
+    def summary(self, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregate the compaction statistics of one run per action (None: calls outside a run)"""
+        with self._lock:
+            calls = list(self.calls.get(run_id, []))
+        per_action: Dict[str, Dict[str, int]] = {}
+        for call in calls:
+            stats = per_action.setdefault(call["action"], {
+                "calls": 0, "bytes_before": 0, "bytes_after": 0, "tokens_before": 0, "tokens_after": 0
+            })
+            stats["calls"] += 1
+            for key in ("bytes_before", "bytes_after", "tokens_before", "tokens_after"):
+                stats[key] += call[key]
+        return per_action
+
+    def forget(self, run_id: Optional[str]):
+        """Drop the call records of a run once its statistics are saved"""
+        if run_id is None:
+            return
+        with self._lock:
+            self.calls.pop(run_id, None)
@@ -0,0 +1,59 @@
+import sys
+import argparse
+from pathlib import Path
+from app import run_crew_agent
+from crew_agent.execution_catalog import CATALOG_FILENAME
+from crew_agent.multi_tenant import MultiTenantRunner
+from crew_runtime.rate_limiter import limiter, PRIORITIES
+
+
+def read_users(filename: str) -> list[str]:
+    """Read one Composio entity ID per line, ignoring blanks and comments"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def run_multi_tenant():
+    """Produce the daily briefing for every user in a user list"""
+    parser = argparse.ArgumentParser(description="Run the daily assistant for many users")
+    parser.add_argument("users_file", help="File with one Composio entity ID per line")
+    parser.add_argument("--workers", type=int, default=16, help="Users processed concurrently")
+    parser.add_argument("--latency-slo", type=float, default=None, help="Per-user latency objective in seconds; slower users are reported as slow")
+    parser.add_argument("--output-dir", default="outputs/users", help="Base directory for per-user outputs")
+    parser.add_argument("--priority", choices=sorted(PRIORITIES), default="batch", help="Rate limiter priority")
+    args = parser.parse_args()
+
+    users = read_users(args.users_file)
+    if not users:
+        sys.exit("No users found")
+
+    print("\n" + "=" * 60)
+    print(f"🚀 Running daily assistant for {len(users)} users with {args.workers} workers")
+    print("=" * 60 + "\n")
+
+    # Every user has its own output folder; all executions are indexed in one catalog, by entity ID
+    catalog_path = str(Path(args.output_dir) / CATALOG_FILENAME)
+    runner = MultiTenantRunner(
+        run_user=lambda entity_id, output_dir: run_crew_agent(
+            entity_id=entity_id, base_output_dir=output_dir, catalog_path=catalog_path
+        ),
+        base_output_dir=args.output_dir,
+        max_workers=args.workers,
+        latency_slo_s=args.latency_slo,
+        priority=args.priority
+    )
+    report = runner.run(users)
+    report_path = runner.save_report(report)
+
+    print("\n" + "=" * 60)
+    print(f"✅ {report['succeeded']}/{report['users']} users succeeded in {report['wall_time_s']}s")
+    print(f"⏱️  p50 {report['latency_p50_s']}s, p95 {report['latency_p95_s']}s"
+          + (f", {report['slow']} over the {report['latency_slo_s']}s latency SLO" if report['latency_slo_s'] else ""))
+    print(f"🔢 Total tokens: {report['total_tokens']}")
+    limiter.print_stats()
+    print(f"📄 Report saved to: {report_path}")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    run_multi_tenant()
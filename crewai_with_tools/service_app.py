@@ -0,0 +1,55 @@
+import os
+import argparse
+from app import run_crew_agent
+from crew_agent.composio_crew import ComposioAgentCrew, load_tool_schemas
+from crew_agent.multi_tenant import entity_slug
+from crew_runtime.service import CrewService, cache_configs
+from crew_agent.tool_compaction import current_entity
+
+
+cache_configs(ComposioAgentCrew)
+
+# Per-entity outputs go to outputs/users/<entity>, like multi_tenant_app.py
+OUTPUT_DIR = "outputs"
+
+
+def run_daily_assistant(inputs: dict, job_id: str) -> dict:
+    """Run the daily assistant for the job's entity_id (default: toolset entity), with the job ID as execution ID"""
+    entity_id = inputs.get("entity_id")
+    output_dir = os.path.join(OUTPUT_DIR, "users", entity_slug(entity_id)) if entity_id else OUTPUT_DIR
+    token = current_entity.set(entity_id)
+    try:
+        result = run_crew_agent(entity_id=entity_id, base_output_dir=output_dir, execution_id=job_id)
+    finally:
+        current_entity.reset(token)
+    return result.model_dump(mode="json")
+
+
+def warm_up():
+    """Build a crew and fetch the tool schemas once, before the first job"""
+    ComposioAgentCrew().crew()
+    load_tool_schemas()
+
+
+def run_service():
+    """Serve daily assistant runs from warm workers"""
+    parser = argparse.ArgumentParser(description="Serve the daily assistant over a local HTTP API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8702, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Jobs running at the same time")
+    parser.add_argument("--queue-size", type=int, default=64, help="Jobs waiting before submissions are rejected")
+    parser.add_argument("--processes", action="store_true", help="Run each worker in its own process")
+    args = parser.parse_args()
+
+    service = CrewService(
+        runners={"daily_assistant": run_daily_assistant},
+        workers=args.workers,
+        queue_size=args.queue_size,
+        processes=args.processes,
+        warmup=warm_up
+    )
+    service.run(args.host, args.port)
+
+
+if __name__ == "__main__":
+    run_service()
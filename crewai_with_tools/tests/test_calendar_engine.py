@@ -0,0 +1,115 @@
+from datetime import datetime, time
+from zoneinfo import ZoneInfo
+
+from crew_agent.calendar_engine import CalendarEngine, IntervalIndex, Occurrence, expand_recurrence
+
+
+TORONTO = ZoneInfo("America/Toronto")
+
+
+def at(day: int, hour: int, minute: int = 0, month: int = 3, year: int = 2026, tz: ZoneInfo = TORONTO) -> datetime:
+    return datetime(year, month, day, hour, minute, tzinfo=tz)
+
+
+def timed_event(summary: str, start: str, end: str, **fields) -> dict:
+    return {
+        "summary": summary,
+        "start": {"dateTime": start, "timeZone": "America/Toronto"},
+        "end": {"dateTime": end, "timeZone": "America/Toronto"},
+        **fields,
+    }
+
+
+def test_no_rule_returns_the_start():
+    assert expand_recurrence(at(2, 9), [], at(10, 0)) == [at(2, 9)]
+
+
+def test_daily_with_interval_and_count():
+    starts = expand_recurrence(at(2, 9), ["RRULE:FREQ=DAILY;INTERVAL=2;COUNT=3"], at(31, 0))
+    assert starts == [at(2, 9), at(4, 9), at(6, 9)]
+
+
+def test_weekly_byday_stops_at_window_end():
+    # 2026-03-02 is a Monday
+    starts = expand_recurrence(at(2, 9), ["RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR"], at(9, 0))
+    assert starts == [at(2, 9), at(4, 9), at(6, 9)]
+
+
+def test_until_and_exdate():
+    recurrence = [
+        "RRULE:FREQ=DAILY;UNTIL=20260305T235959Z",
+        "EXDATE;TZID=America/Toronto:20260303T090000",
+    ]
+    assert expand_recurrence(at(2, 9), recurrence, at(31, 0)) == [at(2, 9), at(4, 9), at(5, 9)]
+
+
+def test_exdate_counts_towards_count():
+    recurrence = ["RRULE:FREQ=DAILY;COUNT=3", "EXDATE;TZID=America/Toronto:20260303T090000"]
+    assert expand_recurrence(at(2, 9), recurrence, at(31, 0)) == [at(2, 9), at(4, 9)]
+
+
+def test_wall_clock_time_is_kept_across_dst():
+    # Toronto switches to daylight time on 2026-03-08
+    starts = expand_recurrence(at(6, 9), ["RRULE:FREQ=DAILY"], at(10, 0))
+    assert [s.hour for s in starts] == [9, 9, 9, 9]
+    assert starts[0].utcoffset() != starts[-1].utcoffset()
+
+
+def test_monthly_skips_missing_days():
+    start = at(31, 10, month=1)
+    starts = expand_recurrence(start, ["RRULE:FREQ=MONTHLY;COUNT=3"], at(1, 0, month=12))
+    assert starts == [start, at(31, 10, month=3), at(31, 10, month=5)]
+
+
+def test_window_start_skips_ahead_without_losing_occurrences():
+    # Wednesdays since 2020; only a step before the window is expanded, not six years
+    start = at(1, 9, month=1, year=2020)
+    starts = expand_recurrence(start, ["RRULE:FREQ=WEEKLY"], at(16, 0), window_start=at(2, 0))
+    assert [s for s in starts if s >= at(2, 0)] == [at(4, 9), at(11, 9)]
+    assert len(starts) <= 4
+
+
+def test_free_slots_between_busy_intervals():
+    index = IntervalIndex([
+        Occurrence({}, at(2, 10), at(2, 11), False),
+        Occurrence({}, at(2, 10, 30), at(2, 12), False),
+        Occurrence({}, at(2, 12, 15), at(2, 13), False),
+        Occurrence({}, at(2, 16, 45), at(2, 19), False),
+    ])
+    assert index.free_slots(at(2, 9), at(2, 18), min_minutes=30) == [
+        (at(2, 9), at(2, 10)),
+        (at(2, 13), at(2, 16, 45)),
+    ]
+
+
+def test_free_slots_of_an_empty_day():
+    assert IntervalIndex([]).free_slots(at(2, 9), at(2, 18)) == [(at(2, 9), at(2, 18))]
+
+
+def test_conflicts_are_overlapping_pairs():
+    first = Occurrence({"summary": "A"}, at(2, 10), at(2, 11), False)
+    second = Occurrence({"summary": "B"}, at(2, 10, 30), at(2, 11, 30), False)
+    back_to_back = Occurrence({"summary": "C"}, at(2, 11, 30), at(2, 12), False)
+    assert IntervalIndex([back_to_back, second, first]).conflicts() == [(first, second)]
+
+
+def test_analyze_expands_recurring_events_and_reports_free_slots():
+    engine = CalendarEngine(time_zone="America/Toronto", window_days=1, work_start=time(9), work_end=time(17))
+    events = [
+        timed_event("Standup", "2026-02-02T09:00:00", "2026-02-02T09:30:00",
+                    recurrence=["RRULE:FREQ=WEEKLY;BYDAY=MO,TU"]),
+        timed_event("Review", "2026-03-02T13:00:00", "2026-03-02T14:00:00"),
+        timed_event("Declined", "2026-03-02T15:00:00", "2026-03-02T16:00:00",
+                    attendees=[{"email": "me@example.com", "self": True, "responseStatus": "declined"}]),
+        {"summary": "Ana's birthday", "start": {"date": "2026-03-03"}, "end": {"date": "2026-03-04"}},
+    ]
+    analysis = engine.analyze(events, "2026-03-02")
+
+    assert [e.title for e in analysis["events"]] == ["Standup", "Review", "Standup"]
+    assert [(e.title, e.event_type) for e in analysis["special_events"]] == [("Ana's birthday", "birthday")]
+    assert analysis["conflicts"] == []
+    assert analysis["free_slots"] == [
+        "2026-03-02 09:30-13:00",
+        "2026-03-02 14:00-17:00",
+        "2026-03-03 09:30-17:00",
+    ]
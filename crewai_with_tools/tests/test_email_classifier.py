@@ -0,0 +1,121 @@
+import pytest
+
+from crew_agent.email_classifier import (
+    EmailClassifier,
+    NEWSLETTER,
+    PROMOTIONAL,
+    preclassify_emails,
+)
+
+
+RULES = {
+    "newsletter_domains": ["substack.com"],
+    "promotional_domains": ["shop.example"],
+    "important_domains": ["acme.com"],
+    "newsletter_keywords": ["digest"],
+    "promotional_keywords": ["% off"],
+    "important_keywords": ["invoice"],
+    "confidence_threshold": 3,
+}
+
+
+def message(sender="Someone <someone@example.org>", subject="Hello", labels=(), headers=(), text="Body"):
+    """Raw message in the GMAIL_FETCH_EMAILS shape"""
+    return {
+        "sender": sender,
+        "subject": subject,
+        "labelIds": list(labels),
+        "messageTimestamp": "1764061260000",
+        "messageText": text,
+        "payload": {"headers": [{"name": name, "value": value} for name, value in headers]},
+    }
+
+
+@pytest.fixture
+def classifier():
+    return EmailClassifier(RULES)
+
+
+def test_plain_message_scores_zero(classifier):
+    assert classifier.score(message()) == {"newsletter": 0, "promotional": 0, "important": 0}
+
+
+def test_bulk_headers_count_for_both_bulk_categories(classifier):
+    scores = classifier.score(message(headers=[("List-Unsubscribe", "<mailto:u@x>"), ("Precedence", "bulk")]))
+    assert scores == {"newsletter": 3, "promotional": 3, "important": 0}
+
+
+def test_gmail_labels(classifier):
+    scores = classifier.score(message(labels=["CATEGORY_PROMOTIONS", "CATEGORY_UPDATES", "STARRED"]))
+    assert scores == {"newsletter": 2, "promotional": 3, "important": 2}
+
+
+def test_personal_label_is_important_unless_bulk(classifier):
+    assert classifier.score(message(labels=["CATEGORY_PERSONAL"]))["important"] == 2
+    bulk = message(labels=["CATEGORY_PERSONAL"], headers=[("List-Id", "list.example")])
+    assert classifier.score(bulk)["important"] == 0
+
+
+def test_sender_domain_matches_parent_domains(classifier):
+    scores = classifier.score(message(sender="Writer <writer@mail.substack.com>"))
+    assert scores["newsletter"] == 3
+    assert classifier.score(message(sender="x@notsubstack.com"))["newsletter"] == 0
+
+
+def test_subject_keywords_are_case_insensitive(classifier):
+    scores = classifier.score(message(subject="Weekly DIGEST: 20% OFF and your Invoice"))
+    assert scores == {"newsletter": 2, "promotional": 2, "important": 3}
+
+
+def test_headers_are_used_when_sender_and_subject_are_missing(classifier):
+    raw = message(headers=[("From", "deals@shop.example"), ("Subject", "50% off today")])
+    raw["sender"] = raw["subject"] = None
+    assert classifier.score(raw)["promotional"] == 5
+
+
+def test_classify_confident_newsletter(classifier):
+    email_type, scores = classifier.classify(message(sender="a@substack.com", subject="Monday digest"))
+    assert email_type == NEWSLETTER
+    assert scores["newsletter"] == 5
+
+
+def test_classify_confident_promotion(classifier):
+    email_type, _ = classifier.classify(message(labels=["CATEGORY_PROMOTIONS"]))
+    assert email_type == PROMOTIONAL
+
+
+def test_classify_below_threshold_goes_to_llm(classifier):
+    assert classifier.classify(message(subject="Monday digest"))[0] is None
+
+
+def test_classify_tie_goes_to_llm(classifier):
+    assert classifier.classify(message(headers=[("List-Unsubscribe", "<mailto:u@x>")]))[0] is None
+
+
+def test_classify_important_overrides_bulk_signals(classifier):
+    raw = message(sender="billing@acme.com", labels=["CATEGORY_PROMOTIONS"])
+    assert classifier.classify(raw)[0] is None
+
+
+def test_partition_splits_classified_and_review(classifier):
+    messages = [
+        message(sender="a@substack.com", subject="Monday digest"),
+        message(labels=["CATEGORY_PROMOTIONS"], subject="Sale"),
+        message(subject="Lunch tomorrow?"),
+    ]
+    result = classifier.partition(messages, summarize_bodies=False)
+    assert [e.email_type for e in result["newsletters"]] == [NEWSLETTER]
+    assert [e.subject for e in result["promotional_emails"]] == ["Sale"]
+    assert result["needs_review"] == [messages[2]]
+
+
+def test_preclassify_unwraps_data_and_replaces_messages(classifier):
+    response = {"successful": True, "data": {"messages": [
+        message(sender="a@substack.com", subject="Monday digest", text="Issue one."),
+        message(subject="Lunch tomorrow?"),
+    ]}}
+    data = preclassify_emails(response, classifier)["data"]
+    assert "messages" not in data
+    assert len(data["pre_classified"]["newsletters"]) == 1
+    assert data["pre_classified"]["promotional_emails"] == []
+    assert [m["subject"] for m in data["needs_review"]] == ["Lunch tomorrow?"]
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+
+from crew_agent.execution_archive import ExecutionArchive, RESULT_FILENAME, SEGMENT_SUFFIX
+from crew_agent.execution_catalog import ExecutionCatalog, CATALOG_FILENAME
+from crew_agent.storage_manager import StorageManager, create_sample_execution_result
+
+
+NOW = datetime(2026, 3, 15)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return StorageManager(base_output_dir=str(tmp_path))
+
+
+@pytest.fixture
+def archive(storage):
+    return ExecutionArchive(ExecutionCatalog(storage.base_output_dir / CATALOG_FILENAME))
+
+
+def save(storage, execution_id, timestamp):
+    """Save the sample execution under its own ID and run time, returning the folder"""
+    result = create_sample_execution_result()
+    # The archive dates executions by their metadata timestamp
+    result = result.model_copy(update={
+        "execution_id": execution_id,
+        "timestamp": datetime.fromisoformat(timestamp),
+        "metadata": {**result.metadata, "timestamp": timestamp},
+    })
+    return storage.save_crew_execution_result("daily_assistant", result)
+
+
+def test_compact_moves_old_folders_into_month_segments(storage, archive):
+    old = save(storage, "e1", "2025-11-24T08:00:00")
+    recent = save(storage, "e2", "2026-03-10T08:00:00")
+
+    report = archive.compact(str(storage.base_output_dir), older_than_days=30, now=NOW)
+
+    assert report["executions"] == 1
+    assert report["segments"] == [f"2025-11{SEGMENT_SUFFIX}"]
+    assert not old.exists() and recent.exists()
+    assert archive.is_archived("e1") and not archive.is_archived("e2")
+
+
+def test_archived_files_read_back_unchanged(storage, archive):
+    folder = save(storage, "e1", "2025-11-24T08:00:00")
+    originals = {path.name: path.read_bytes() for path in folder.iterdir()}
+    archive.compact(str(storage.base_output_dir), now=NOW)
+
+    files = archive.load_files("e1")
+    assert set(files) == set(originals)
+    # Task outputs embedded in the combined result are resolved from their references
+    assert files[RESULT_FILENAME]["summary_generator_output"] == files["summary_generator_output.json"]
+    assert files["daily_calendar_output.md"] == originals["daily_calendar_output.md"].decode("utf-8")
+    assert archive.load_file("e1", "missing.json") is None
+    assert archive.load_files("unknown") is None
+
+
+def test_identical_payloads_are_stored_once_per_segment(storage, archive):
+    save(storage, "e1", "2025-11-24T08:00:00")
+    save(storage, "e2", "2025-11-25T08:00:00")
+
+    report = archive.compact(str(storage.base_output_dir), now=NOW)
+
+    # The second execution only adds its own metadata and combined result
+    assert report["executions"] == 2
+    assert report["duplicates"] == report["files"] - report["payloads_written"]
+    assert report["duplicates"] > 0
+    [stats] = archive.stats()
+    assert stats["payloads"] == report["payloads_written"]
+    assert archive.load_files("e1")["execution_metadata.json"]["execution_id"] == "e1"
+    assert archive.load_files("e2")["execution_metadata.json"]["execution_id"] == "e2"
+
+
+def test_recompacting_a_kept_folder_writes_nothing(storage, archive):
+    save(storage, "e1", "2025-11-24T08:00:00")
+    archive.compact(str(storage.base_output_dir), delete_folders=False, now=NOW)
+    [before] = archive.stats()
+
+    report = archive.compact(str(storage.base_output_dir), delete_folders=False, now=NOW)
+
+    assert report["payloads_written"] == 0
+    assert archive.stats() == [before]
+    assert archive.load_files("e1") is not None
+
+
+def test_retention_drops_old_months_and_their_catalog_rows(storage, archive):
+    save(storage, "e1", "2025-01-10T08:00:00")
+    save(storage, "e2", "2025-11-24T08:00:00")
+    archive.compact(str(storage.base_output_dir), now=NOW)
+
+    removed = archive.apply_retention(retention_days=365, now=NOW)
+
+    assert removed == [f"2025-01{SEGMENT_SUFFIX}"]
+    assert not (archive.archive_dir / removed[0]).exists()
+    assert not archive.is_archived("e1") and archive.load_files("e1") is None
+    assert archive.catalog.get("e1") is None
+    assert archive.catalog.get("e2") is not None
+    assert archive.load_files("e2") is not None
+    assert [s["segment"] for s in archive.stats()] == [f"2025-11{SEGMENT_SUFFIX}"]
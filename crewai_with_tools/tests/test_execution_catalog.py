@@ -0,0 +1,120 @@
+from datetime import datetime
+
+import pytest
+
+from crew_agent.execution_catalog import ExecutionCatalog, CATALOG_FILENAME
+from crew_agent.output_models import TokenUsage
+from crew_agent.storage_manager import StorageManager, create_sample_execution_result
+
+
+def execution(execution_id, timestamp, run_date, status="success", entity_id="a@example.com", tokens=100):
+    """Sample execution result with its own ID, time, metadata and token usage"""
+    result = create_sample_execution_result()
+    return result.model_copy(update={
+        "execution_id": execution_id,
+        "timestamp": datetime.fromisoformat(timestamp),
+        "metadata": {"current_date": run_date, "status": status, "entity_id": entity_id},
+        "total_token_usage": TokenUsage(
+            prompt_tokens=tokens - 10, completion_tokens=10, total_tokens=tokens, model_name="claude"
+        ),
+        "task_token_usage": {
+            "daily_calendar": TokenUsage(prompt_tokens=tokens - 20, completion_tokens=5, total_tokens=tokens - 15),
+            "summary_generator": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        },
+    })
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ExecutionCatalog(tmp_path / CATALOG_FILENAME)
+    catalog.upsert_many([
+        ("e1", tmp_path / "e1", execution("e1", "2025-11-24T08:00:00", "2025-11-24", tokens=100), {"x": "1"}, None),
+        ("e2", tmp_path / "e2", execution("e2", "2025-11-25T08:00:00", "2025-11-25", "failed", tokens=200), None, None),
+        ("e3", tmp_path / "e3", execution("e3", "2025-11-25T09:00:00", "2025-11-25", entity_id="b@example.com",
+                                          tokens=300), None, None),
+        ("e4", tmp_path / "e4", execution("e4", "2025-12-01T08:00:00", "2025-12-01", tokens=400), None, None),
+    ])
+    return catalog
+
+
+def test_get_returns_row_with_task_tokens(catalog, tmp_path):
+    row = catalog.get("e1")
+    assert row["folder_path"] == str(tmp_path / "e1")
+    assert row["run_date"] == "2025-11-24"
+    assert row["total_tokens"] == 100
+    assert row["output_paths"] == {"x": "1"}
+    assert [t["task_name"] for t in row["task_tokens"]] == ["daily_calendar", "summary_generator"]
+    assert catalog.get("missing") is None
+
+
+def test_upsert_replaces_the_row_and_its_task_tokens(catalog, tmp_path):
+    updated = execution("e1", "2025-11-24T08:00:00", "2025-11-24", tokens=150)
+    updated.task_token_usage = {"daily_calendar": TokenUsage(prompt_tokens=1, completion_tokens=1, total_tokens=2)}
+    catalog.upsert("e1", str(tmp_path / "e1"), updated)
+    row = catalog.get("e1")
+    assert row["total_tokens"] == 150
+    assert [t["task_name"] for t in row["task_tokens"]] == ["daily_calendar"]
+    assert len(catalog.last_runs(10)) == 4
+
+
+def test_last_runs_newest_first_with_status_filter(catalog):
+    assert [r["execution_id"] for r in catalog.last_runs(3)] == ["e4", "e3", "e2"]
+    assert [r["execution_id"] for r in catalog.last_runs(10, status="failed")] == ["e2"]
+
+
+def test_runs_for_date_oldest_first(catalog):
+    assert [r["execution_id"] for r in catalog.runs_for_date("2025-11-25")] == ["e2", "e3"]
+    assert catalog.runs_for_date("2025-01-01") == []
+
+
+def test_token_totals_grouped_and_filtered(catalog):
+    assert catalog.token_totals() == [
+        {"grp": "all", "runs": 4, "prompt_tokens": 960, "completion_tokens": 40, "total_tokens": 1000}
+    ]
+    by_month = {r["grp"]: r["total_tokens"] for r in catalog.token_totals("month")}
+    assert by_month == {"2025-11": 600, "2025-12": 400}
+    by_entity = {r["grp"]: r["runs"] for r in catalog.token_totals("entity", since="2025-11-25")}
+    assert by_entity == {"a@example.com": 2, "b@example.com": 1}
+    by_task = {r["grp"]: r["total_tokens"] for r in catalog.token_totals("task", until="2025-11-25")}
+    assert by_task == {"daily_calendar": 85, "summary_generator": 15}
+
+
+def test_token_totals_rejects_unknown_grouping(catalog):
+    with pytest.raises(ValueError):
+        catalog.token_totals("weekday")
+
+
+def test_delete_removes_task_tokens(catalog):
+    catalog.delete("e1")
+    assert catalog.get("e1") is None
+    assert {r["grp"] for r in catalog.token_totals("task", until="2025-11-25")} == set()
+
+
+def test_rebuild_indexes_saved_folders(tmp_path):
+    result = execution("e9", "2025-11-26T08:00:00", "2025-11-26")
+    folder = tmp_path / "daily_assistant_e9"
+    folder.mkdir()
+    (folder / "complete_execution_result.json").write_text(result.model_dump_json(), encoding='utf-8')
+    (folder / "summary_generator_output.json").write_text("{}", encoding='utf-8')
+    (tmp_path / "broken").mkdir()
+    (tmp_path / "broken" / "complete_execution_result.json").write_text("{", encoding='utf-8')
+
+    catalog = ExecutionCatalog(tmp_path / CATALOG_FILENAME)
+    assert catalog.rebuild(str(tmp_path)) == 1
+    row = catalog.get("e9")
+    assert row["run_date"] == "2025-11-26"
+    assert set(row["output_paths"]) == {"complete_result", "summary_generator"}
+
+
+def test_storage_managers_share_one_catalog(tmp_path):
+    catalog_path = str(tmp_path / CATALOG_FILENAME)
+    for entity_id in ("a@example.com", "b@example.com"):
+        storage = StorageManager(base_output_dir=str(tmp_path / entity_id), catalog_path=catalog_path)
+        result = execution(f"run-{entity_id}", "2025-11-25T08:00:00", "2025-11-25", entity_id=entity_id)
+        storage.save_crew_execution_result("daily_assistant", result)
+
+    assert not list(tmp_path.glob(f"*/{CATALOG_FILENAME}"))
+    rows = ExecutionCatalog(catalog_path).token_totals("entity")
+    assert {r["grp"]: r["runs"] for r in rows} == {"a@example.com": 1, "b@example.com": 1}
+    row = ExecutionCatalog(catalog_path).get("run-b@example.com")
+    assert row["folder_path"].startswith(str(tmp_path / "b@example.com"))
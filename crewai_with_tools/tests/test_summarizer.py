@@ -0,0 +1,72 @@
+import numpy as np
+
+from crew_agent.summarizer import clean_text, split_sentences, textrank, summarize, summarize_batch
+
+
+BODY = (
+    "<p>Our product launch moved to Friday after the security review.</p> "
+    "The security review found two issues in the product launch checklist. "
+    "Lunch is on the third floor today. "
+    "Both issues in the launch checklist are fixed and the review is closed. "
+    "Parking passes are available from reception. "
+    "Read more at https://example.com/launch?utm=1"
+)
+
+
+def test_clean_text_strips_tags_urls_and_spaces():
+    assert clean_text("<b>Hello</b>\t  world https://x.io/a?b=1  now") == "Hello world now"
+    assert clean_text(None) == ""
+
+
+def test_split_sentences_drops_short_fragments():
+    text = "This is the first sentence. Too short. The second sentence is here!\n\nA new paragraph starts now"
+    assert split_sentences(text) == [
+        "This is the first sentence.",
+        "The second sentence is here!",
+        "A new paragraph starts now",
+    ]
+
+
+def test_textrank_scores_form_a_distribution():
+    scores = textrank([
+        "the launch review is done",
+        "the launch moved to friday",
+        "lunch is served upstairs",
+    ])
+    assert scores.shape == (3,)
+    assert np.isclose(scores.sum(), 1.0)
+
+
+def test_textrank_ranks_central_sentences_higher():
+    scores = textrank([
+        "product launch review scheduled",
+        "product launch review finished",
+        "product launch review delayed",
+        "parking passes at reception",
+    ])
+    assert scores[3] < scores[:3].min()
+
+
+def test_textrank_without_shared_words_is_uniform():
+    scores = textrank(["alpha beta gamma", "delta epsilon zeta", "eta theta iota"])
+    assert np.allclose(scores, 1 / 3)
+
+
+def test_summarize_keeps_top_sentences_in_original_order():
+    summary = summarize(BODY, max_sentences=2)
+    sentences = split_sentences(clean_text(BODY))
+    kept = [s for s in sentences if s in summary]
+    assert len(kept) == 2
+    assert kept == sorted(kept, key=sentences.index)
+    assert "Parking" not in summary and "Lunch" not in summary
+
+
+def test_summarize_short_text_and_char_limit():
+    assert summarize("One short email body here.") == "One short email body here."
+    assert len(summarize(BODY, max_chars=40)) == 40
+    assert summarize("") == ""
+
+
+def test_summarize_batch_matches_summarize_in_process():
+    texts = [BODY, "Short note for you today.", ""]
+    assert summarize_batch(texts, max_sentences=2) == [summarize(t, max_sentences=2) for t in texts]